@@ -2,18 +2,38 @@
 
 This module defines a custom reasoning and action agent graph.
 It invokes tools in a simple loop.
+
+The public API is loaded lazily: `import react_agent` does not compile the
+graphs or import the tool dependencies until an attribute is first accessed.
 """
 
-from react_agent.graph import graph
-from react_agent.gaia_runner import run_all_gaia_tasks
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING, Any, Dict
 
-# V2 System
-from react_agent.graph_v2 import tracked_graph
-from react_agent.gaia_runner_v2 import CleanGAIARunner
-from react_agent.state_v2 import GAIAInputState, GAIAInternalState, GAIAOutputState
+if TYPE_CHECKING:
+    from react_agent.gaia_runner import run_all_gaia_tasks
+    from react_agent.gaia_runner_v2 import CleanGAIARunner
+    from react_agent.graph import graph
+    from react_agent.graph_v2 import tracked_graph
+    from react_agent.run_gaia_benchmark_v2 import run_gaia_benchmark_v2
+    from react_agent.state_v2 import GAIAInputState, GAIAInternalState, GAIAOutputState
 
-# Convenience function for V2
-from react_agent.run_gaia_benchmark_v2 import run_gaia_benchmark_v2
+# Exported name -> module that defines it
+_LAZY_EXPORTS: Dict[str, str] = {
+    # V1 System
+    "graph": "react_agent.graph",
+    "run_all_gaia_tasks": "react_agent.gaia_runner",
+    # V2 System
+    "tracked_graph": "react_agent.graph_v2",
+    "CleanGAIARunner": "react_agent.gaia_runner_v2",
+    "GAIAInputState": "react_agent.state_v2",
+    "GAIAInternalState": "react_agent.state_v2",
+    "GAIAOutputState": "react_agent.state_v2",
+    # Convenience function for V2
+    "run_gaia_benchmark_v2": "react_agent.run_gaia_benchmark_v2",
+}
 
 __all__ = [
     # V1 System
@@ -27,3 +47,33 @@ __all__ = [
     "GAIAOutputState",
     "run_gaia_benchmark_v2"
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the module defining `name` on first access and cache the value."""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(__all__)
+
+
+class _LazyPackage(types.ModuleType):
+    """Keep exports whose name matches a submodule (e.g. `graph`) pointing at the export.
+
+    Importing `react_agent.graph` would otherwise replace the package attribute
+    `graph` with the submodule, as the eager import in this file used to prevent.
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _LAZY_EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyPackage
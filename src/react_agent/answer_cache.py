@@ -0,0 +1,201 @@
+"""Cache delle risposte complete per task, persistente in SQLite.
+
+Una voce vale finché restano identici tutti i componenti della chiave: task_id,
+testo della domanda, contenuto dell'allegato, Configuration e set di tool.
+Ogni componente è una colonna, quindi si può invalidare per componente
+(es. tutte le risposte prodotte con una vecchia configurazione).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Sequence
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from react_agent.configuration import Configuration
+from react_agent.prompts import (
+    ARTIFACT_PROMPT,
+    FORCE_FINAL_ANSWER_PROMPT,
+    TASK_CONTEXT_PROMPT,
+    WIKI_DUMP_PROMPT,
+)
+from react_agent.state_v2 import GAIAOutputState
+
+# Campi della Configuration che non cambiano la risposta: percorsi, timeout,
+# concorrenza e dimensione dei pool. Ogni altro campo (anche uno nuovo) invalida la cache.
+NON_SEMANTIC_FIELDS = frozenset({
+    "local_search_index",
+    "wiki_dump_path",
+    "artifact_dir",
+    "deadline_reserve_seconds",
+    "tool_timeouts",
+    "default_tool_timeout",
+    "provider_concurrency",
+    "executor_workers",
+})
+
+# Prompt aggiunti dal grafo al system prompt configurato o al contesto di ogni passo
+AGENT_PROMPTS = (ARTIFACT_PROMPT, WIKI_DUMP_PROMPT, FORCE_FINAL_ANSWER_PROMPT, TASK_CONTEXT_PROMPT)
+
+# Valore di attachment_hash per le task senza allegato
+NO_ATTACHMENT = "none"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    task_id TEXT NOT NULL,
+    question_hash TEXT NOT NULL,
+    attachment_hash TEXT NOT NULL,
+    config_fingerprint TEXT NOT NULL,
+    tools_fingerprint TEXT NOT NULL,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (task_id, question_hash, attachment_hash, config_fingerprint, tools_fingerprint)
+);
+"""
+
+
+class AnswerCacheKey(NamedTuple):
+    """Componenti della chiave; ognuno è invalidabile separatamente."""
+
+    task_id: str
+    question_hash: str
+    attachment_hash: str
+    config_fingerprint: str
+    tools_fingerprint: str
+
+
+def content_hash(content: Any) -> str:
+    """SHA-256 di testo o bytes."""
+    data = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """Hash SHA-256 del contenuto di un file, letto a blocchi."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_fingerprint(configuration: Configuration) -> str:
+    """Impronta dell'agente: campi della Configuration e prompt che influenzano la risposta."""
+    values: Dict[str, Any] = {
+        f.name: getattr(configuration, f.name)
+        for f in fields(configuration)
+        if f.name not in NON_SEMANTIC_FIELDS
+    }
+    # Il percorso dell'indice locale non conta, ma usarlo o no cambia i risultati di `search`
+    values["local_search_enabled"] = bool(configuration.local_search_index)
+    values["prompts"] = AGENT_PROMPTS
+    return content_hash(json.dumps(values, sort_keys=True, default=str))
+
+
+def tools_fingerprint(tools: Sequence[Callable[..., Any]]) -> str:
+    """Impronta dei tool: nomi, descrizioni e schema degli argomenti."""
+    schemas = sorted(
+        (convert_to_openai_tool(tool) for tool in tools),
+        key=lambda schema: schema["function"]["name"],
+    )
+    return content_hash(json.dumps(schemas, sort_keys=True, default=str))
+
+
+def output_to_json(output: GAIAOutputState) -> str:
+    """Serializza un output (messaggi compresi) in JSON."""
+    data = {f.name: getattr(output, f.name) for f in fields(output)}
+    data["messages"] = messages_to_dict(list(output.messages))
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def output_from_json(payload: str) -> GAIAOutputState:
+    """Ricostruisce un output da JSON, ignorando i campi non più esistenti."""
+    data = json.loads(payload)
+    data["messages"] = messages_from_dict(data.get("messages", []))
+    known = {f.name for f in fields(GAIAOutputState)}
+    return GAIAOutputState(**{key: value for key, value in data.items() if key in known})
+
+
+def is_cacheable(output: GAIAOutputState) -> bool:
+    """Solo le risposte effettive: niente errori né risposte vuote."""
+    answer = output.submitted_answer.strip()
+    return bool(answer) and answer != "ERROR"
+
+
+class AnswerCache:
+    """Cache persistente GAIAOutputState per chiave completa."""
+
+    def __init__(self, path: str) -> None:
+        """Apre (o crea) il database SQLite in `path`."""
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Chiude la connessione al database."""
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: AnswerCacheKey) -> GAIAOutputState | None:
+        """Output salvato per la chiave, o None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output FROM answers WHERE task_id = ? AND question_hash = ? "
+                "AND attachment_hash = ? AND config_fingerprint = ? AND tools_fingerprint = ?",
+                tuple(key),
+            ).fetchone()
+        return output_from_json(row[0]) if row else None
+
+    def put(self, key: AnswerCacheKey, output: GAIAOutputState) -> None:
+        """Salva (o sostituisce) l'output per la chiave."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, output_to_json(output), time.time()),
+            )
+
+    def invalidate(self, **components: str) -> int:
+        """Elimina le voci che corrispondono a tutti i componenti indicati (nessuno = tutte).
+
+        Esempio: `cache.invalidate(config_fingerprint=old)` oppure `cache.invalidate(task_id="...")`.
+        """
+        unknown = set(components) - set(AnswerCacheKey._fields)
+        if unknown:
+            raise ValueError(f"Unknown cache key components: {sorted(unknown)}")
+        where = " AND ".join(f"{name} = ?" for name in components) or "1 = 1"
+        with self._lock, self._conn:
+            cursor = self._conn.execute(f"DELETE FROM answers WHERE {where}", tuple(components.values()))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        """Numero di risposte salvate."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+
+def build_key(
+    task_id: str,
+    question: str,
+    attachment_hash: str,
+    configuration: Configuration,
+    tools: Sequence[Callable[..., Any]],
+) -> AnswerCacheKey:
+    """Chiave della cache per una domanda e la configurazione che la risolve."""
+    return AnswerCacheKey(
+        task_id=task_id,
+        question_hash=content_hash(question),
+        attachment_hash=attachment_hash,
+        config_fingerprint=config_fingerprint(configuration),
+        tools_fingerprint=tools_fingerprint(tools),
+    )
+
@@ -0,0 +1,211 @@
+"""Artifact store per-task per gli output lunghi dei tool.
+
+Un risultato oltre la soglia viene scritto su disco e il modello riceve solo
+un'anteprima con l'handle dell'artifact; `search_artifact` (passaggi BM25),
+`grep_artifact` e `read_artifact` ne leggono poi solo la parte utile. Così la dimensione del prompt resta limitata
+qualunque sia la lunghezza della pagina, trascrizione o tabella di partenza.
+"""
+
+import hashlib
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from react_agent.passages import Passage, PassageIndex, byte_offsets
+
+# Limiti dei tool di lettura: il singolo risultato resta comunque piccolo
+MAX_READ_CHARS = 8000
+MAX_GREP_MATCHES = 20
+MAX_GREP_CONTEXT = 500
+
+# Indici dei passaggi tenuti in memoria, per tutte le task: oltre il limite i meno
+# usati vengono scartati e ricostruiti dal file alla ricerca successiva
+MAX_PASSAGE_INDEXES = 64
+
+_HANDLE_RE = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+# percorso dell'artifact → (indice senza testo, offset in byte dei bordi delle finestre)
+_INDEXES: "OrderedDict[Path, Tuple[PassageIndex, Dict[int, int]]]" = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+def _build_index(content: str) -> Tuple[PassageIndex, Dict[int, int]]:
+    index = PassageIndex(content, keep_text=False)
+    return index, byte_offsets(content, index.spans)
+
+
+def _remember_index(path: Path, entry: Tuple[PassageIndex, Dict[int, int]]) -> None:
+    with _INDEXES_LOCK:
+        _INDEXES[path] = entry
+        _INDEXES.move_to_end(path)
+        while len(_INDEXES) > MAX_PASSAGE_INDEXES:
+            _INDEXES.popitem(last=False)
+
+
+def _forget_indexes(root: Path) -> None:
+    with _INDEXES_LOCK:
+        for path in [path for path in _INDEXES if path.parent == root]:
+            del _INDEXES[path]
+
+
+class ArtifactStore:
+    """Artifact testuali di una task, salvati in una sua directory."""
+
+    def __init__(self, root: str) -> None:
+        """Store con gli artifact nella directory `root` (creata al primo salvataggio)."""
+        self.root = Path(root)
+        self._lengths: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def put(self, tool_name: str, content: str) -> str:
+        """Salva il contenuto e restituisce l'handle (stesso contenuto → stesso handle)."""
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+        handle = f"{tool_name}-{digest}"
+        with self._lock:
+            if handle in self._lengths:
+                return handle
+        entry = _build_index(content)
+        with self._lock:
+            if handle not in self._lengths:
+                self.root.mkdir(parents=True, exist_ok=True)
+                # newline="" così gli offset in byte corrispondono al file scritto
+                self._path(handle).write_text(content, encoding="utf-8", newline="")
+                self._lengths[handle] = len(content)
+                _remember_index(self._path(handle).resolve(), entry)
+        return handle
+
+    def get(self, handle: str) -> str:
+        """Contenuto completo; KeyError se l'handle non esiste."""
+        with open(self.path(handle), encoding="utf-8", newline="") as file:
+            return file.read()
+
+    def path(self, handle: str) -> Path:
+        """Percorso assoluto del file (es. per leggerlo con pandas in `python_repl`)."""
+        path = self._path(handle)
+        if not _HANDLE_RE.match(handle) or not path.exists():
+            raise KeyError(handle)
+        return path.resolve()
+
+    def read(self, handle: str, offset: int = 0, length: int = MAX_READ_CHARS) -> Tuple[str, int]:
+        """Porzione [offset, offset+length) e lunghezza totale dell'artifact."""
+        content = self.get(handle)
+        offset = max(0, offset)
+        length = max(0, min(length, MAX_READ_CHARS))
+        return content[offset:offset + length], len(content)
+
+    def grep(
+        self,
+        handle: str,
+        pattern: str,
+        context_chars: int = 200,
+        max_matches: int = 10,
+    ) -> Iterator[Tuple[int, str]]:
+        """Occorrenze del pattern (regex, o testo letterale se la regex non è valida) con contesto."""
+        content = self.get(handle)
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error:
+            regex = re.compile(re.escape(pattern), re.IGNORECASE)
+        context_chars = max(0, min(context_chars, MAX_GREP_CONTEXT))
+        max_matches = max(1, min(max_matches, MAX_GREP_MATCHES))
+
+        count = 0
+        for match in regex.finditer(content):
+            start = max(0, match.start() - context_chars)
+            yield match.start(), content[start:match.end() + context_chars]
+            count += 1
+            if count >= max_matches:
+                break
+
+    def search(self, query: str, handle: str = "", top_k: int = 3) -> List[Tuple[str, Passage]]:
+        """Passaggi più rilevanti per la query, in un artifact o in tutti quelli della task."""
+        results: List[Tuple[str, Passage]] = []
+        for name in [handle] if handle else self.handles():
+            index, offsets = self._passage_index(name)
+            path = self.path(name)
+            with open(path, "rb") as file:
+
+                def read(start: int, end: int) -> str:
+                    file.seek(offsets[start])
+                    return file.read(offsets[end] - offsets[start]).decode("utf-8")
+
+                results.extend((name, passage) for passage in index.search(query, top_k, read))
+        results.sort(key=lambda item: item[1].score, reverse=True)
+        return results[:max(1, top_k)]
+
+    def _passage_index(self, handle: str) -> Tuple[PassageIndex, Dict[int, int]]:
+        path = self.path(handle)
+        with _INDEXES_LOCK:
+            entry = _INDEXES.get(path)
+            if entry is not None:
+                _INDEXES.move_to_end(path)
+                return entry
+        # Indice scartato dalla LRU o artifact scritto da un'altra istanza (es. run ripresa)
+        entry = _build_index(self.get(handle))
+        _remember_index(path, entry)
+        return entry
+
+    def handles(self) -> List[str]:
+        """Handle degli artifact salvati da questo store."""
+        with self._lock:
+            return list(self._lengths)
+
+    def clear(self) -> None:
+        """Rimuove gli artifact, i loro indici e la directory."""
+        with self._lock:
+            self._lengths.clear()
+            _forget_indexes(self.root.resolve())
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def _path(self, handle: str) -> Path:
+        return self.root / f"{handle}.txt"
+
+
+def make_preview(handle: str, tool_name: str, content: str, preview_chars: int) -> str:
+    """Messaggio per il modello al posto dell'output completo."""
+    return (
+        f"[artifact {handle}: {len(content)} chars from {tool_name}, "
+        f"showing the first {preview_chars}]\n"
+        f"{content[:preview_chars]}\n"
+        f"[... truncated. Use search_artifact(query, '{handle}') for the most relevant passages, "
+        f"grep_artifact('{handle}', pattern) for exact matches "
+        f"or read_artifact('{handle}', offset, length) to read a slice]"
+    )
+
+
+# Nessun limite sul numero di store: gli handle restano citati nei messaggi finché la
+# task è attiva, e ogni store tiene in memoria solo percorso e lunghezze (gli indici
+# sono nella LRU `_INDEXES`); gli store vengono rimossi solo con `clear_artifact_store`
+_STORES: Dict[str, ArtifactStore] = {}
+_STORES_LOCK = threading.Lock()
+
+# Store della task in esecuzione, usato dai tool *_artifact
+current_artifact_store: ContextVar[ArtifactStore | None] = ContextVar(
+    "current_artifact_store", default=None
+)
+
+
+def _task_dir(root: str, task_key: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_\-]", "_", task_key) or "default"
+    return str(Path(root) / safe)
+
+
+def get_artifact_store(task_key: str, root: str) -> ArtifactStore:
+    """Store della task indicata, creato al primo utilizzo."""
+    with _STORES_LOCK:
+        store = _STORES.get(task_key)
+        if store is None:
+            store = _STORES[task_key] = ArtifactStore(_task_dir(root, task_key))
+        return store
+
+
+def clear_artifact_store(task_key: str) -> None:
+    """Rimuove gli artifact di una task conclusa."""
+    with _STORES_LOCK:
+        store = _STORES.pop(task_key, None)
+    if store is not None:
+        store.clear()
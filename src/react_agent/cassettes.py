@@ -0,0 +1,255 @@
+"""Record/replay di tutto l'I/O dell'agente (chiamate al modello e risultati dei tool).
+
+In modalità `record` ogni richiesta al modello caricato da `load_chat_model` e ogni
+risultato dei `TOOLS` viene salvato in un file cassette JSON (scritto una volta,
+all'uscita dal blocco o dal processo); in modalità `replay` le stesse richieste
+vengono servite dal file, senza rete né API key. Una richiesta in più rispetto
+alla registrazione solleva CassetteMissError.
+
+Attivazione:
+- da codice: `with use_cassette("run.json", "replay"): ...`
+- da ambiente: `REACT_AGENT_CASSETTE=run.json REACT_AGENT_CASSETTE_MODE=record`
+"""
+
+import atexit
+import functools
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumpd, load
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from react_agent.tool_cache import canonical_args
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Parti volatili delle richieste escluse dalla chiave (timestamp di sistema)
+_VOLATILE_PATTERNS = [
+    re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[+-]\d{2}:\d{2}|Z)?"),
+    re.compile(r"\d{4}-\d{2}-\d{2}"),
+]
+
+
+class CassetteMissError(KeyError):
+    """Richiesta non presente nella cassette in modalità replay."""
+
+
+class Cassette:
+    """File JSON con le interazioni registrate, raggruppate per tipo e chiave."""
+
+    def __init__(self, path: str, mode: str) -> None:
+        """Cassetta in `path`, in modalità record o replay."""
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Cassette mode must be '{RECORD}' or '{REPLAY}', got '{mode}'")
+        self.path = Path(path)
+        self.mode = mode
+        self._entries: Dict[str, Dict[str, List[Any]]] = {"model": {}, "tool": {}}
+        # Indice di replay per chiave: richieste identiche ripetute tornano in ordine
+        self._cursor: Dict[str, int] = {}
+        self._dirty = False
+
+        if self.path.exists():
+            self._entries.update(json.loads(self.path.read_text(encoding="utf-8")))
+        elif mode == REPLAY:
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+
+    def record(self, kind: str, key: str, value: Any) -> None:
+        """Aggiunge l'interazione in memoria: il file viene scritto da `flush`."""
+        self._entries[kind].setdefault(key, []).append(value)
+        self._dirty = True
+
+    def replay(self, kind: str, key: str) -> Any:
+        """Interazione successiva per la chiave; CassetteMissError se la run diverge dalla registrazione."""
+        recorded = self._entries[kind].get(key) or []
+        index = self._cursor.get(f"{kind}:{key}", 0)
+        if index >= len(recorded):
+            raise CassetteMissError(
+                f"No recorded {kind} interaction #{index + 1} for key {key[:12]} in {self.path}"
+            )
+        self._cursor[f"{kind}:{key}"] = index + 1
+        return recorded[index]
+
+    def flush(self) -> None:
+        """Salva le interazioni registrate dall'ultimo flush (una scrittura per registrazione)."""
+        if self._dirty:
+            self.save()
+            self._dirty = False
+
+    def save(self) -> None:
+        """Scrittura atomica: un crash a metà registrazione non corrompe il file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self._entries, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+_active_cassette: ContextVar[Cassette | None] = ContextVar("active_cassette", default=None)
+_env_cassettes: Dict[str, Cassette] = {}
+
+
+@contextmanager
+def use_cassette(path: str, mode: str) -> Iterator[Cassette]:
+    """Attiva una cassette per il blocco corrente."""
+    cassette = Cassette(path, mode)
+    token = _active_cassette.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active_cassette.reset(token)
+        cassette.flush()
+
+
+def get_active_cassette() -> Cassette | None:
+    """Cassette attiva da contesto, altrimenti da REACT_AGENT_CASSETTE/REACT_AGENT_CASSETTE_MODE."""
+    cassette = _active_cassette.get()
+    if cassette is not None:
+        return cassette
+
+    path = os.environ.get("REACT_AGENT_CASSETTE")
+    if not path:
+        return None
+    if path not in _env_cassettes:
+        cassette = _env_cassettes[path] = Cassette(path, os.environ.get("REACT_AGENT_CASSETTE_MODE", REPLAY))
+        # Nessun blocco `with` da chiudere: le registrazioni si salvano all'uscita del processo
+        atexit.register(cassette.flush)
+    return _env_cassettes[path]
+
+
+def _normalize(text: str) -> str:
+    for pattern in _VOLATILE_PATTERNS:
+        text = pattern.sub("<time>", text)
+    return text
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def model_request_key(model_name: str, tool_names: Sequence[str], messages: Sequence[BaseMessage]) -> str:
+    """Chiave di una richiesta al modello: contenuto dei messaggi senza id né timestamp."""
+    normalized = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, sort_keys=True)
+        normalized.append({
+            "type": message.type,
+            "content": _normalize(content),
+            "tool_calls": [
+                {"name": call["name"], "args": call["args"]}
+                for call in getattr(message, "tool_calls", None) or []
+            ],
+            "tool_call_id": getattr(message, "tool_call_id", None),
+        })
+    return _digest({"model": model_name, "tools": list(tool_names), "messages": normalized})
+
+
+def tool_request_key(tool_name: str, args: Dict[str, Any]) -> str:
+    """Chiave di una chiamata a un tool (argomenti in forma canonica)."""
+    return _digest({"tool": tool_name, "args": _normalize(canonical_args(args))})
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model che registra o riproduce le risposte del modello reale (`inner`)."""
+
+    model_name: str
+    inner: Any = None
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "CassetteChatModel":
+        """Lega i tool al modello interno e ne registra i nomi per il replay."""
+        inner = self.inner.bind_tools(tools, **kwargs) if self.inner is not None else None
+        names = [convert_to_openai_tool(tool)["function"]["name"] for tool in tools]
+        return self.model_copy(update={"inner": inner, "tool_names": names})
+
+    def _request(self, messages: List[BaseMessage]) -> Tuple[Cassette, str]:
+        cassette = get_active_cassette()
+        if cassette is None:
+            raise RuntimeError("CassetteChatModel used without an active cassette")
+        return cassette, model_request_key(self.model_name, self.tool_names, messages)
+
+    def _replayed(self, cassette: Cassette, key: str) -> ChatResult:
+        message = load(cassette.replay("model", key))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _recorded(self, cassette: Cassette, key: str, message: BaseMessage) -> ChatResult:
+        cassette.record("model", key, dumpd(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: List[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        cassette, key = self._request(messages)
+        if cassette.mode == REPLAY:
+            return self._replayed(cassette, key)
+        return self._recorded(cassette, key, self.inner.invoke(messages, stop=stop, **kwargs))
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: List[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        cassette, key = self._request(messages)
+        if cassette.mode == REPLAY:
+            return self._replayed(cassette, key)
+        return self._recorded(cassette, key, await self.inner.ainvoke(messages, stop=stop, **kwargs))
+
+
+def wrap_chat_model(model_name: str, factory: Callable[[], BaseChatModel]) -> BaseChatModel:
+    """Restituisce il modello reale, o il suo wrapper se c'è una cassette attiva.
+
+    In replay il modello reale non viene nemmeno costruito (nessuna API key richiesta).
+    """
+    cassette = get_active_cassette()
+    if cassette is None:
+        return factory()
+    inner = None if cassette.mode == REPLAY else factory()
+    return CassetteChatModel(model_name=model_name, inner=inner)
+
+
+def recordable_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Decoratore per i tool: registra/riproduce il risultato quando c'è una cassette attiva.
+
+    Mantiene nome, docstring e firma, quindi lo schema del tool non cambia.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        cassette = get_active_cassette()
+        if cassette is None:
+            return await func(*args, **kwargs)
+
+        call_args = dict(zip(func.__code__.co_varnames, args), **kwargs)
+        key = tool_request_key(func.__name__, call_args)
+        if cassette.mode == REPLAY:
+            return cassette.replay("tool", key)
+
+        result = await func(*args, **kwargs)
+        cassette.record("tool", key, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,35 @@
+"""Checkpointer SQLite persistente per tracked_graph."""
+
+from typing import Any
+
+
+async def open_sqlite_checkpointer(path: str) -> Any:
+    """Apre (o crea) il database SQLite dei checkpoint in `path`.
+
+    Il database usa WAL con synchronous=NORMAL: i commit non attendono un fsync
+    per ogni step, ma sopravvivono al crash del processo.
+    """
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError as e:
+        raise ImportError(
+            "Persistent checkpoints require langgraph-checkpoint-sqlite: "
+            "pip install 'react-agent[sqlite]'"
+        ) from e
+
+    conn = await aiosqlite.connect(path)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+    return saver
+
+
+def thread_id_for_task(task_id: str, model: str) -> str:
+    """Thread ID stabile per una task: lo stesso task_id riprende lo stesso thread.
+
+    Il modello fa parte della chiave, così la cascade non riprende il thread
+    già concluso dal modello economico.
+    """
+    return f"gaia:{task_id}:{model}"
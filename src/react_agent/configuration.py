@@ -3,14 +3,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field, fields
-from typing import Annotated
+from typing import Annotated, Dict, Tuple
 
-from langchain_core.runnables import ensure_config
+from langchain_core.runnables import RunnableConfig, ensure_config
 from langgraph.config import get_config
 
 
 from react_agent import prompts
 
+# Workers per executor class, used for the classes missing from `executor_workers`
+DEFAULT_EXECUTOR_WORKERS: Dict[str, int] = {"io": 16, "cpu": 2, "download": 8}
 
 @dataclass(kw_only=True)
 class Configuration:
@@ -32,6 +34,23 @@ class Configuration:
         },
     )
 
+    cascade_model: str = field(
+        default="",
+        metadata={
+            "description": "Optional cheaper/faster model tried first, in the form provider/model-name. "
+            "The task is re-run on `model` only when the cheap answer is missing, forced by the step/time "
+            "budget, not agreed on by the self-consistency quorum, or low-confidence. "
+            "Empty disables the cascade."
+        },
+    )
+
+    cascade_confidence_threshold: float = field(
+        default=0.7,
+        metadata={
+            "description": "Minimum confidence for accepting the cascade model's answer without escalating."
+        },
+    )
+
     max_search_results: int = field(
         default=10,
         metadata={
@@ -39,14 +58,177 @@ class Configuration:
         },
     )
 
+    local_search_index: str = field(
+        default="",
+        metadata={
+            "description": "Path of the on-disk BM25 index of fetched pages and past search results, "
+            "consulted by `search` before Tavily. Empty (the default) disables the local index; "
+            "run_gaia_benchmark_v2 enables it with --local-search-index."
+        },
+    )
+
+    local_search_min_coverage: float = field(
+        default=0.75,
+        metadata={
+            "description": "Minimum fraction of the query terms the best local document must contain "
+            "for `search` to answer locally instead of calling Tavily."
+        },
+    )
+
+    wiki_dump_path: str = field(
+        default="",
+        metadata={
+            "description": "Path of an uncompressed MediaWiki XML dump (e.g. enwiki pages-articles.xml) "
+            "read offline by wikipedia_lookup. Its title index must be built first with "
+            "`python -m react_agent.wiki_dump <path>`. Empty disables the tool."
+        },
+    )
+
+    artifact_threshold_chars: int = field(
+        default=6000,
+        metadata={
+            "description": "Tool outputs longer than this are saved to the per-task artifact store and "
+            "the model receives a preview plus a handle for read_artifact/grep_artifact. "
+            "0 disables the artifact store."
+        },
+    )
+
+    artifact_preview_chars: int = field(
+        default=1500,
+        metadata={"description": "Characters of a stored artifact shown to the model as preview."},
+    )
+
+    artifact_dir: str = field(
+        default=".cache/react_agent/artifacts",
+        metadata={"description": "Directory of the per-task artifact stores (removed when a task ends)."},
+    )
+
+    slim_output: bool = field(
+        default=False,
+        metadata={
+            "description": "Return a compact transcript in GAIAOutputState: tool message bodies are cut "
+            "to a short preview once the answer has been extracted, so finished tasks do not keep "
+            "every fetched page alive until submission. The checkpoint, if any, keeps the full text."
+        },
+    )
+
+    step_budget_by_level: Dict[int, int] = field(
+        default_factory=lambda: {1: 8, 2: 14, 3: 20},
+        metadata={
+            "description": "Maximum number of model steps per task, keyed by GAIA level. "
+            "When the budget runs out the agent is forced to give its best FINAL ANSWER."
+        },
+    )
+
+    time_budget_by_level: Dict[int, float] = field(
+        default_factory=lambda: {1: 120.0, 2: 240.0, 3: 420.0},
+        metadata={
+            "description": "Wall-clock budget in seconds per task, keyed by GAIA level."
+        },
+    )
+
+    deadline_reserve_seconds: float = field(
+        default=20.0,
+        metadata={
+            "description": "Seconds reserved before the deadline for the final answer turn."
+        },
+    )
+
+    tool_timeouts: Dict[str, float] = field(
+        default_factory=lambda: {
+            "search": 30.0,
+            "extract_text_from_url": 45.0,
+            "download_gaia_file": 60.0,
+            "python_repl": 30.0,
+            "get_youtube_transcript": 30.0,
+            "transcribe_audio": 180.0,
+            "analyze_youtube_video": 300.0,
+        },
+        metadata={
+            "description": "Time budget in seconds per tool. On expiry the tool is cancelled "
+            "(subprocesses are killed) and the model receives a timeout result."
+        },
+    )
+
+    default_tool_timeout: float = field(
+        default=90.0,
+        metadata={"description": "Time budget in seconds for tools not listed in `tool_timeouts`."},
+    )
+
+    provider_concurrency: Dict[str, int] = field(
+        default_factory=lambda: {"openai": 8, "anthropic": 4},
+        metadata={
+            "description": "Maximum concurrent direct requests per provider from multimodal tools "
+            "(Whisper, vision), shared by all tasks in the process. The first value used in an event loop "
+            "is kept for that loop."
+        },
+    )
+
+    executor_workers: Dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_EXECUTOR_WORKERS),
+        metadata={
+            "description": "Workers per executor class: `io` threads for short blocking I/O, "
+            "`cpu` processes for spreadsheet parsing, `download` threads for slow transfers. "
+            "Classes left out keep their default. Read when each pool is first created."
+        },
+    )
+
+    self_consistency_runs: int = field(
+        default=1,
+        metadata={
+            "description": "Number of independent concurrent runs per question whose answers are "
+            "voted on. 1 disables self-consistency."
+        },
+    )
+
+    self_consistency_quorum: int = field(
+        default=0,
+        metadata={
+            "description": "Number of agreeing answers that stops the remaining runs early. "
+            "0 means a simple majority of `self_consistency_runs`."
+        },
+    )
+
+    self_consistency_min_level: int = field(
+        default=1,
+        metadata={
+            "description": "Lowest GAIA level that uses self-consistency; easier questions run once."
+        },
+    )
+
     @classmethod
     def from_context(cls) -> Configuration:
-        """Create a Configuration instance from a RunnableConfig object."""
+        """Create a Configuration instance from the current runnable context."""
         try:
             config = get_config()
         except RuntimeError:
             config = None
+        return cls.from_runnable_config(config)
+
+    @classmethod
+    def from_runnable_config(cls, config: RunnableConfig | None = None) -> Configuration:
+        """Create a Configuration instance from a RunnableConfig object."""
         config = ensure_config(config)
         configurable = config.get("configurable") or {}
         _fields = {f.name for f in fields(cls) if f.init}
         return cls(**{k: v for k, v in configurable.items() if k in _fields})
+
+    def step_budget_for(self, level: int) -> int:
+        """Return the model step budget for a GAIA level."""
+        return self.step_budget_by_level.get(level, max(self.step_budget_by_level.values()))
+
+    def self_consistency_for(self, level: int) -> Tuple[int, int]:
+        """Return the number of voting runs and the quorum for a GAIA level."""
+        runs = max(1, self.self_consistency_runs)
+        if level < self.self_consistency_min_level:
+            runs = 1
+        quorum = self.self_consistency_quorum or runs // 2 + 1
+        return runs, min(quorum, runs)
+
+    def executor_workers_for(self, workload: str) -> int:
+        """Return the worker count for an executor class, falling back to its default."""
+        return {**DEFAULT_EXECUTOR_WORKERS, **self.executor_workers}[workload]
+
+    def time_budget_for(self, level: int) -> float:
+        """Return the wall-clock budget (seconds) for a GAIA level."""
+        return self.time_budget_by_level.get(level, max(self.time_budget_by_level.values()))
@@ -0,0 +1,138 @@
+"""Deadline per i tool: budget di tempo, propagazione e lavoro bloccante interrompibile.
+
+- ogni tool ha un budget (Configuration.tool_timeouts); allo scadere restituisce
+  un risultato di timeout pulito invece di restare appeso
+- la deadline corrente è in una contextvar: le chiamate annidate (HTTP, retry,
+  subprocess) usano il tempo rimasto invece di un timeout proprio
+- il lavoro bloccante che non si può cancellare in un thread (yt-dlp, codice
+  utente) gira in un subprocess, terminato allo scadere della deadline
+- il lavoro già avviato nei pool di `executors` viene abbandonato, non terminato:
+  le fetch che vi girano (es. sottotitoli YouTube) ricevono un timeout HTTP dal
+  tempo rimasto, così il worker si libera poco dopo la deadline
+"""
+
+import asyncio
+import functools
+import os
+import signal
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Sequence, Tuple
+
+from react_agent.configuration import Configuration
+
+# Deadline assoluta (time.monotonic) del lavoro in corso
+current_deadline: ContextVar[float | None] = ContextVar("current_deadline", default=None)
+
+# Attesa concessa a un subprocess dopo SIGTERM prima del SIGKILL
+KILL_GRACE_SECONDS = 2.0
+
+
+class ToolTimeoutError(TimeoutError):
+    """Deadline scaduta durante l'esecuzione di un tool."""
+
+
+def remaining(default: float | None = None) -> float | None:
+    """Secondi rimasti alla deadline corrente (`default` se non c'è una deadline)."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return default
+    left = max(0.0, deadline - time.monotonic())
+    return left if default is None else min(left, default)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[float | None]:
+    """Restringe la deadline corrente a `seconds` da adesso (mai la allunga)."""
+    if seconds is None:
+        yield remaining()
+        return
+    deadline = time.monotonic() + max(0.0, seconds)
+    outer = current_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline - time.monotonic()
+    finally:
+        current_deadline.reset(token)
+
+
+def tool_timeout(tool_name: str, configuration: Configuration) -> float:
+    """Timeout del tool, o quello di default se non configurato."""
+    return configuration.tool_timeouts.get(tool_name, configuration.default_tool_timeout)
+
+
+def timeout_result(tool_name: str, seconds: float) -> str:
+    """Risultato restituito al modello quando un tool supera il suo budget."""
+    return (f"Error: {tool_name} timed out after {seconds:.0f}s. "
+            f"Try a different source or a narrower request.")
+
+
+def with_deadline(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Decoratore per i tool: applica il budget del tool e restituisce un timeout pulito.
+
+    Mantiene nome, docstring e firma, quindi lo schema del tool non cambia.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        budget = tool_timeout(name, Configuration.from_context())
+        with deadline_scope(budget) as seconds:
+            try:
+                async with asyncio.timeout(seconds):
+                    return await func(*args, **kwargs)
+            except TimeoutError:
+                print(f"⏱️ [DEADLINE] {name} timed out after {seconds:.1f}s")  # noqa: T201
+                return timeout_result(name, seconds)
+
+    return wrapper
+
+
+async def run_subprocess(
+    args: Sequence[str],
+    input_data: bytes | None = None,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> Tuple[int, bytes, bytes]:
+    """Esegue un comando entro la deadline; allo scadere (o se cancellato) lo termina.
+
+    Il processo parte in una nuova sessione: SIGTERM/SIGKILL raggiungono anche i figli
+    (es. ffmpeg lanciato da yt-dlp). Solleva ToolTimeoutError alla scadenza.
+    """
+    seconds = remaining(timeout)
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE if input_data is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+        **kwargs,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(input_data), seconds)
+    except TimeoutError:
+        await _terminate(process)
+        raise ToolTimeoutError(f"{args[0]} exceeded {seconds:.0f}s") from None
+    except asyncio.CancelledError:
+        await _terminate(process)
+        raise
+    return process.returncode or 0, stdout, stderr
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    """SIGTERM al gruppo del processo, poi SIGKILL se non esce."""
+    if process.returncode is not None:
+        return
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), KILL_GRACE_SECONDS)
+            return
+        except TimeoutError:
+            continue
@@ -0,0 +1,136 @@
+"""Executor dedicati per classe di carico, al posto del pool di default di `asyncio.to_thread`.
+
+- "io": thread per I/O bloccante breve (file, SQLite, indici locali)
+- "cpu": processi per il parsing CPU-bound (pandas, Excel), fuori dal GIL
+- "download": thread per trasferimenti lenti (sottotitoli YouTube, scrittura dei download)
+
+Pochi download lenti non occupano più i worker che servono al parsing di altre
+task. Ogni pool espone metriche di coda (vedi `executor_stats`).
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, TypeVar
+
+from react_agent.configuration import Configuration
+
+T = TypeVar("T")
+
+IO = "io"
+CPU = "cpu"
+DOWNLOAD = "download"
+WORKLOADS = (IO, CPU, DOWNLOAD)
+
+
+@dataclass
+class ExecutorStats:
+    """Metriche di un pool: lavori in corso, in coda e completati."""
+
+    workload: str
+    max_workers: int
+    submitted: int = 0
+    completed: int = 0
+    peak_queued: int = 0
+    # Secondi dall'invio al risultato (attesa in coda inclusa)
+    total_seconds: float = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        """Job inviati e non ancora conclusi."""
+        return self.submitted - self.completed
+
+    @property
+    def queued(self) -> int:
+        """Job in attesa di un worker libero."""
+        return max(0, self.in_flight - self.max_workers)
+
+
+_EXECUTORS: Dict[str, Executor] = {}
+_STATS: Dict[str, ExecutorStats] = {}
+_LOCK = threading.Lock()
+
+
+def _create(workload: str, workers: int) -> Executor:
+    if workload == CPU:
+        # spawn: i worker non ereditano thread, lock e connessioni del processo principale
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"react-agent-{workload}")
+
+
+def get_executor(workload: str) -> Executor:
+    """Pool della classe di carico, creato al primo utilizzo con la dimensione configurata."""
+    with _LOCK:
+        executor = _EXECUTORS.get(workload)
+        if executor is None:
+            workers = Configuration.from_context().executor_workers_for(workload)
+            executor = _EXECUTORS[workload] = _create(workload, workers)
+            _STATS[workload] = ExecutorStats(workload=workload, max_workers=workers)
+        return executor
+
+
+async def run_in(workload: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Come `asyncio.to_thread`, ma sul pool della classe di carico indicata.
+
+    Nei pool di thread il contesto (contextvars) viene propagato; nel pool di
+    processi `func` e gli argomenti devono essere serializzabili con pickle.
+
+    Se l'attesa viene cancellata (es. deadline del tool) un lavoro ancora in coda
+    non parte più, ma uno già avviato viene abbandonato, non interrotto: occupa
+    il suo worker fino alla fine. Il lavoro che deve poter essere terminato
+    va eseguito con `deadlines.run_subprocess`.
+    """
+    executor = get_executor(workload)
+    if workload == CPU:
+        call = functools.partial(func, *args, **kwargs)
+    else:
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+
+    stats = _STATS[workload]
+    start = time.perf_counter()
+
+    def _finished(_: "Future[Any]") -> None:
+        # Dal worker, a lavoro concluso: un lavoro abbandonato resta "in flight" finché gira
+        with _LOCK:
+            stats.completed += 1
+            stats.total_seconds += time.perf_counter() - start
+
+    with _LOCK:
+        stats.submitted += 1
+        stats.peak_queued = max(stats.peak_queued, stats.queued)
+    future = executor.submit(call)
+    future.add_done_callback(_finished)
+    return await asyncio.wrap_future(future)
+
+
+def executor_stats() -> Dict[str, ExecutorStats]:
+    """Copia delle metriche dei pool creati finora."""
+    with _LOCK:
+        return {name: ExecutorStats(**vars(stats)) for name, stats in _STATS.items()}
+
+
+def format_executor_stats() -> str:
+    """Riepilogo testuale delle code dei pool."""
+    lines = []
+    for stats in executor_stats().values():
+        lines.append(
+            f"🧵 [{stats.workload}] workers {stats.max_workers}, jobs {stats.completed}, "
+            f"in flight {stats.in_flight}, peak queue {stats.peak_queued}, "
+            f"avg {1000 * stats.total_seconds / max(1, stats.completed):.0f} ms"
+        )
+    return "\n".join(lines)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Chiude tutti i pool (vengono ricreati al prossimo utilizzo)."""
+    with _LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+        _STATS.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,9 +1,9 @@
 """Orchestrazione per il benchmark GAIA"""
 
-import aiohttp
 import asyncio
 from typing import List, Dict, Any
 from react_agent.graph import graph
+from react_agent.resilience import GAIA_API_URL, http_request
 import json
 from datetime import datetime
 
@@ -11,19 +11,13 @@ from dotenv import load_dotenv
 import os
 
 
-# DEBUG: Verifica che il graph sia importato correttamente
-print(f"🔧 DEBUG: Graph imported: {graph}")
-print(f"🔧 DEBUG: Graph type: {type(graph)}")
-
-
 async def fetch_all_questions() -> List[Dict[str, Any]]:
     """Fetch tutte le domande GAIA"""
-    url = "https://agents-course-unit4-scoring.hf.space/questions"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                raise Exception(f"Errore nel fetch: {response.status}")
-            return await response.json()
+    url = f"{GAIA_API_URL}/questions"
+    response = await http_request("GET", url)
+    if response.status != 200:
+        raise Exception(f"Errore nel fetch: {response.status}")
+    return response.json()
 
 
 async def solve_gaia_question(question: Dict[str, Any]) -> str:
@@ -103,19 +97,21 @@ def extract_final_answer(response: str) -> str:
 
 async def submit_answers(answers: List[Dict[str, str]], username: str = "your_username") -> Dict[str, Any]:
     """Submit delle risposte all'API GAIA"""
-    url = "https://agents-course-unit4-scoring.hf.space/submit"
+    url = f"{GAIA_API_URL}/submit"
     payload = {
         "username": username,
         "agent_code": "react_agent_v1",
         "answers": answers
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=payload) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                return {"error": f"Submit failed: {response.status}"}
+    # Retry con backoff su 429/5xx: un errore transitorio non fa perdere il run
+    try:
+        response = await http_request("POST", url, json=payload)
+    except Exception as e:
+        return {"error": f"Submit failed: {e}"}
+    if response.status == 200:
+        return response.json()
+    return {"error": f"Submit failed: {response.status}"}
 
 
 async def run_all_gaia_tasks(username: str = "your_username", max_questions: int = None) -> Dict[str, Any]:
@@ -142,11 +138,6 @@ async def run_all_gaia_tasks(username: str = "your_username", max_questions: int
         # 2. Risolvi ogni domanda
         response = await solve_gaia_question(question)
 
-        # ✅  DELAY PER LIMITI DI RATE
-        if i < len(questions):  # Non aspettare dopo l'ultima domanda
-            print("⏱️ Waiting 5 seconds to avoid rate limit...")
-            await asyncio.sleep(5)  # 5 secondi tra domande
-
         # 3. Verifica se la risposta è valida
         if is_valid_answer(response):
             final_answer = extract_final_answer(response)
@@ -1,56 +1,239 @@
 """GAIA Runner con API pulita"""
 
 import asyncio
-from datetime import datetime
-from typing import Dict, Any, List
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import AsyncIterator, Dict, Any, Iterator, List, Tuple
 
-from react_agent.graph_v2 import tracked_graph
-from react_agent.state_v2 import GAIAInputState, GAIAOutputState
+from langchain_core.messages import AIMessageChunk, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from react_agent.answer_cache import (
+    NO_ATTACHMENT,
+    AnswerCache,
+    AnswerCacheKey,
+    build_key,
+    file_hash,
+    is_cacheable,
+)
+from react_agent.artifacts import clear_artifact_store
+from react_agent.checkpointing import open_sqlite_checkpointer, thread_id_for_task
+from react_agent.configuration import Configuration
+from react_agent.executors import IO, run_in
+from react_agent.graph_v2 import create_tracked_graph, tracked_graph, tracked_tools_for
+from react_agent.state_v2 import GAIAInternalState, GAIAOutputState
+from react_agent.stream_events import (
+    FinalOutput,
+    GAIAEvent,
+    ModelStepStarted,
+    TokenDelta,
+    ToolCallIssued,
+    ToolResult,
+)
+from react_agent.tool_cache import (
+    CACHED_MARKER,
+    cached_tool_result,
+    clear_task_cache,
+    current_task_cache,
+    get_task_cache,
+)
+from react_agent.tools import TOOLS
+from react_agent.utils import get_message_text
 
 
 class CleanGAIARunner:
     """🎯 API pulita per eseguire task GAIA"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        config: RunnableConfig | None = None,
+        checkpoint_path: str | None = None,
+        answer_cache_path: str | None = None,
+    ):
+        """Crea il runner.
+
+        Con `checkpoint_path` ogni task salva i suoi step in un database SQLite:
+        un runner riavviato riprende le task interrotte dall'ultimo step completato.
+        Con `answer_cache_path` le risposte complete vengono riusate finché task,
+        domanda, allegato, Configuration e tool non cambiano.
+        """
         self.graph = tracked_graph
-    
-    async def solve_question(self, question: str, task_id: str = "", file_name: str = "") -> GAIAOutputState:
-        """Risolve una singola domanda GAIA"""
+        self.config: RunnableConfig = config or {}
+        self.configuration = Configuration.from_runnable_config(self.config)
+        self.checkpoint_path = checkpoint_path
+        self._checkpointer: Any = None
+        self.answer_cache = AnswerCache(answer_cache_path) if answer_cache_path else None
+
+    async def __aenter__(self) -> "CleanGAIARunner":
+        """Apre i checkpoint persistenti, se configurati."""
+        await self._ensure_checkpointer()
+        return self
 
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Chiude il runner."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Chiude la connessione al database dei checkpoint, se aperta."""
+        if self._checkpointer is not None:
+            await self._checkpointer.conn.close()
+            self._checkpointer = None
+            self.graph = tracked_graph
+        if self.answer_cache is not None:
+            self.answer_cache.close()
+            self.answer_cache = None
+
+    async def _ensure_checkpointer(self) -> None:
+        """Apre il checkpointer SQLite al primo utilizzo."""
+        if self.checkpoint_path and self._checkpointer is None:
+            self._checkpointer = await open_sqlite_checkpointer(self.checkpoint_path)
+            self.graph = create_tracked_graph(checkpointer=self._checkpointer)
+            print(f"💾 [RUNNER] Checkpoints persistenti in {self.checkpoint_path}")
+    
+    async def solve_question(self, question: str, task_id: str = "", file_name: str = "", level: int = 1) -> GAIAOutputState:
+        """Risolve una singola domanda GAIA entro il budget di passi e tempo del suo Level."""
         print(f"\n🔧 [RUNNER] Input ricevuto:")
         print(f"  - question: '{question[:50]}...'")
         print(f"  - task_id: '{task_id}' (len: {len(task_id)})")
         print(f"  - file_name: '{file_name}' (len: {len(file_name)})")
-        
-        # Prepara messaggio con contesto
-        enhanced_question = self._enhance_question(question, task_id, file_name)
-        
-        # Timing
+
+        # Una sola deadline per tutta la task: anche il download per la chiave della cache ne fa parte
+        deadline = datetime.now() + timedelta(seconds=self.configuration.time_budget_for(level))
+        result: GAIAOutputState | None = None
+        try:
+            # 🗄️ Risposta già calcolata con gli stessi input: nessuna esecuzione del grafo
+            result, cache_key = await self._cached_answer(question, task_id, file_name)
+            if result is not None:
+                return result
+
+            result = await self._solve_with_cascade(question, task_id, file_name, level, deadline)
+            if cache_key is not None and is_cacheable(result):
+                try:
+                    await run_in(IO, self.answer_cache.put, cache_key, result)
+                except Exception as e:
+                    print(f"\n🗄️ [RUNNER] Answer cache store failed: {e!r}")
+            return result
+
+        finally:
+            self._release_task(task_id, result)
+
+    async def _cached_answer(
+        self, question: str, task_id: str, file_name: str
+    ) -> Tuple[GAIAOutputState | None, AnswerCacheKey | None]:
+        """Risposta in cache (se c'è) e chiave per salvarla (None se la cache non si applica).
+
+        Un errore della cache (download dell'allegato, SQLite) non fa fallire la
+        task: viene registrato e la task si risolve senza cache.
+        """
+        try:
+            cache_key = await self._answer_cache_key(question, task_id, file_name)
+            if cache_key is None:
+                return None, None
+            cached = await run_in(IO, self.answer_cache.get, cache_key)
+        except Exception as e:
+            print(f"\n🗄️ [RUNNER] Answer cache unavailable, solving without it: {e!r}")
+            return None, None
+        if cached is not None:
+            print(f"\n🗄️ [RUNNER] Answer cache hit for task '{task_id}'")
+        return cached, cache_key
+
+    async def _solve_with_cascade(
+        self, question: str, task_id: str, file_name: str, level: int, deadline: datetime
+    ) -> GAIAOutputState:
+        """Modello economico prima, quello forte solo se la risposta non convince.
+
+        L'escalation usa il tempo rimasto fino a `deadline`, non un budget nuovo.
+        """
+        strong_model = self.configuration.model
+        cheap_model = self.configuration.cascade_model
+
+        if not cheap_model or cheap_model == strong_model:
+            return await self._solve_with_voting(question, task_id, file_name, level, strong_model, deadline)
+
+        # 🪜 Cascade: prima il modello economico, poi quello forte solo se serve
+        first = await self._solve_with_voting(question, task_id, file_name, level, cheap_model, deadline)
+        if not self._needs_escalation(first):
+            print(f"\n🔧 [RUNNER] Cascade: accepted {cheap_model} answer (confidence {first.confidence:.2f})")
+            return first
+
+        left = (deadline - datetime.now()).total_seconds()
+        if left <= self.configuration.deadline_reserve_seconds:
+            print(f"\n🔧 [RUNNER] Cascade: no time left to escalate ({left:.0f}s), keeping {cheap_model} answer")
+            return first
+
+        print(f"\n🔧 [RUNNER] Cascade: escalating to {strong_model} (confidence {first.confidence:.2f})")
+        # I risultati dei tool restano nella cache della task e vengono riusati
+        second = await self._solve_with_voting(question, task_id, file_name, level, strong_model, deadline)
+        second.processing_time += first.processing_time
+        return second
+
+    async def _solve_with_voting(
+        self, question: str, task_id: str, file_name: str, level: int, model: str,
+        deadline: datetime | None = None,
+    ) -> GAIAOutputState:
+        """Self-consistency: K run concorrenti, stop appena un quorum concorda sulla risposta."""
+        runs, quorum = self.configuration.self_consistency_for(level)
+        if runs == 1:
+            return await self._solve_with_model(question, task_id, file_name, level, model, deadline=deadline)
+
+        print(f"\n🗳️ [RUNNER] Self-consistency: {runs} runs, quorum {quorum}")
         start_time = datetime.now()
+        # I run condividono la cache dei tool della task: le stesse ricerche non si ripetono
+        pending = {
+            asyncio.ensure_future(
+                self._solve_with_model(question, task_id, file_name, level, model, run_index=i, deadline=deadline)
+            )
+            for i in range(runs)
+        }
+        outputs: List[GAIAOutputState] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                outputs.extend(run.result() for run in done)
+                winner, votes = vote_on_answers(outputs)
+                if winner is not None and votes >= quorum:
+                    print(f"🗳️ [RUNNER] Quorum reached ({votes}/{runs}), stopping {len(pending)} runs")
+                    break
+        finally:
+            for run in pending:
+                run.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
 
-        # ✅ Crea DIRETTAMENTE GAIAInternalState invece di dict
-        from react_agent.state_v2 import GAIAInternalState
-        
-        internal_state = GAIAInternalState(
-            messages=[("user", enhanced_question)],
-            task_id=task_id,
-            has_file=bool(file_name),
-            file_name=file_name,
-            start_time=start_time
-        )
+        winner, votes = vote_on_answers(outputs)
+        result = winner or outputs[0]
+        result.quorum_reached = votes >= quorum
+        print(f"🗳️ [RUNNER] Answer '{result.submitted_answer}' with {votes}/{len(outputs)} votes")
+        result.processing_time = (datetime.now() - start_time).total_seconds()
+        return result
 
-        print(f"\n🔧 [RUNNER] GAIAInternalState creato:")
-        print(f"  - task_id: '{internal_state.task_id}'")
-        print(f"  - has_file: {internal_state.has_file}")
-        print(f"  - file_name: '{internal_state.file_name}'")
+    async def _solve_with_model(
+        self, question: str, task_id: str, file_name: str, level: int, model: str, run_index: int = 0,
+        deadline: datetime | None = None,
+    ) -> GAIAOutputState:
+        """Esegue il grafo una volta con il modello indicato."""
+        internal_state = self._build_state(question, task_id, file_name, level, deadline)
+        start_time = internal_state.start_time
+        # Tempo rimasto fino alla deadline della task (tutto il budget del Level al primo tentativo)
+        time_budget = max(0.0, (internal_state.deadline - start_time).total_seconds())
+        config = self._graph_config(model, level, task_id, run_index)
+        print(f"  - model: '{model}'")
         
         try:
+            # 💾 Con i checkpoint persistenti riprendi la task da dove si era fermata
+            graph_input, completed = await self._resume_or_start(internal_state, config)
+            if completed is not None:
+                return completed
+
             # ✅ Passa l'oggetto stato direttamente
-            result = await self.graph.ainvoke(internal_state)
+            result = await asyncio.wait_for(
+                self.graph.ainvoke(graph_input, config, **self._durability_kwargs()),
+                timeout=time_budget + self.configuration.deadline_reserve_seconds,
+            )
             print(f"\n🔧 [RUNNER] Graph completato, result keys: {list(result.keys())}")
             
             # Gestisci output
-            if "clean_output" in result:
+            if result.get("clean_output"):
                 final_result = result["clean_output"]
                 print(f"\n🔧 [RUNNER] Using clean_output")
             else:
@@ -59,11 +242,203 @@ class CleanGAIARunner:
             
             # Debug del risultato finale
             print(f"\n🔧 [RUNNER] Final result task_id: '{final_result.task_id}'")
+            final_result.model_used = model
             return final_result
                 
+        except TimeoutError:
+            print(f"\n🔧 [RUNNER] Hard timeout after {time_budget:.0f}s")
+            return self._error_output(f"Task timed out after {time_budget:.0f}s", task_id, start_time)
+
         except Exception as e:
             print(f"\n🔧 [RUNNER] Error occurred: {e}")
             return self._error_output(str(e), task_id, start_time)
+
+    async def stream_question(
+        self, question: str, task_id: str = "", file_name: str = "", level: int = 1
+    ) -> AsyncIterator[GAIAEvent]:
+        """Risolve una domanda GAIA emettendo eventi tipizzati man mano che il grafo procede.
+
+        Usa sempre `Configuration.model` (niente cascade). L'ultimo evento è sempre
+        un `FinalOutput`; interrompere l'iterazione cancella l'esecuzione del grafo.
+        """
+        model = self.configuration.model
+        internal_state = self._build_state(question, task_id, file_name, level)
+        start_time = internal_state.start_time
+        time_budget = self.configuration.time_budget_for(level)
+        config = self._graph_config(model, level, task_id)
+        tool_names: Dict[str, str] = {}
+        last_state: Dict[str, Any] = {}
+        final_result: GAIAOutputState | None = None
+
+        try:
+            graph_input, completed = await self._resume_or_start(internal_state, config)
+            if completed is not None:
+                final_result = completed
+                yield FinalOutput(output=completed)
+                return
+
+            # La deadline vale solo per l'attesa del grafo: gli eventi escono fuori dal timeout
+            deadline = asyncio.get_running_loop().time() + time_budget + self.configuration.deadline_reserve_seconds
+            stream = self.graph.astream(
+                graph_input,
+                config,
+                stream_mode=["custom", "messages", "updates", "values"],
+                **self._durability_kwargs(),
+            )
+            async for mode, chunk in _until_deadline(stream, deadline):
+                if mode == "custom" and chunk.get("event") == "model_step_started":
+                    yield ModelStepStarted(step=chunk["step"])
+
+                elif mode == "messages":
+                    message, metadata = chunk
+                    if (
+                        isinstance(message, AIMessageChunk)
+                        and metadata.get("langgraph_node") == "call_model"
+                    ):
+                        text = get_message_text(message)
+                        if text:
+                            yield TokenDelta(text=text)
+
+                elif mode == "updates":
+                    for event in _events_from_update(chunk, tool_names):
+                        yield event
+
+                elif mode == "values":
+                    last_state = chunk
+
+            final_result = last_state.get("clean_output") or self._fallback_output(last_state, task_id, start_time)
+            final_result.model_used = model
+
+        except Exception as e:
+            print(f"\n🔧 [RUNNER] Stream error: {e!r}")
+            message = f"Task timed out after {time_budget:.0f}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            yield FinalOutput(output=self._error_output(message, task_id, start_time))
+            return
+
+        finally:
+            self._release_task(task_id, final_result)
+
+        yield FinalOutput(output=final_result)
+
+    def _release_task(self, task_id: str, result: GAIAOutputState | None) -> None:
+        """Cache dei tool e artifact valgono solo per la durata della task."""
+        if not task_id:
+            return
+        clear_task_cache(task_id)
+        # Con i checkpoint una task fallita viene ripresa e i suoi messaggi
+        # citano ancora gli handle: gli artifact restano finché non si conclude
+        if not self.checkpoint_path or (result is not None and is_cacheable(result)):
+            clear_artifact_store(task_id)
+
+    def _build_state(
+        self, question: str, task_id: str, file_name: str, level: int, deadline: datetime | None = None
+    ) -> GAIAInternalState:
+        """Stato iniziale con contesto file, timing e budget derivati dal Level (o la deadline data)."""
+        # Prepara messaggio con contesto
+        enhanced_question = self._enhance_question(question, task_id, file_name)
+
+        start_time = datetime.now()
+        internal_state = GAIAInternalState(
+            messages=[("user", enhanced_question)],
+            task_id=task_id,
+            has_file=bool(file_name),
+            file_name=file_name,
+            difficulty_level=level,
+            start_time=start_time,
+            deadline=deadline or start_time + timedelta(seconds=self.configuration.time_budget_for(level)),
+            step_budget=self.configuration.step_budget_for(level)
+        )
+
+        print("\n🔧 [RUNNER] GAIAInternalState creato:")
+        print(f"  - task_id: '{internal_state.task_id}'")
+        print(f"  - has_file: {internal_state.has_file}")
+        print(f"  - file_name: '{internal_state.file_name}'")
+        return internal_state
+
+    def _graph_config(self, model: str, level: int, task_id: str = "", run_index: int = 0) -> RunnableConfig:
+        """Config per una esecuzione del grafo con il modello indicato.
+
+        Il grafo forza la FINAL ANSWER a fine budget: recursion_limit e timeout
+        sono solo reti di sicurezza (prefetch + 2 nodi per step + output).
+        Ogni run di self-consistency (`run_index`) ha il suo thread di checkpoint.
+        """
+        configurable = {**(self.config.get("configurable") or {}), "model": model}
+        if self.checkpoint_path and task_id:
+            thread_id = thread_id_for_task(task_id, model)
+            configurable["thread_id"] = f"{thread_id}:{run_index}" if run_index else thread_id
+        return {
+            **self.config,
+            "configurable": configurable,
+            "recursion_limit": 2 * self.configuration.step_budget_for(level) + 4,
+        }
+
+    def _durability_kwargs(self) -> Dict[str, Any]:
+        """Checkpoint scritti in background mentre parte lo step successivo."""
+        return {"durability": "async"} if self.checkpoint_path else {}
+
+    async def _resume_or_start(
+        self, internal_state: GAIAInternalState, config: RunnableConfig
+    ) -> Tuple[GAIAInternalState | None, GAIAOutputState | None]:
+        """Input per il grafo: stato nuovo, None per riprendere, oppure l'output di una task già conclusa."""
+        await self._ensure_checkpointer()
+        if not (self.checkpoint_path and internal_state.task_id):
+            return internal_state, None
+
+        snapshot = await self.graph.aget_state(config)
+        if not snapshot.values:
+            return internal_state, None
+
+        if not snapshot.next:
+            completed = snapshot.values.get("clean_output")
+            if completed is not None:
+                print(f"💾 [RUNNER] Task {internal_state.task_id} già completata: uso il checkpoint")
+                return None, completed
+            return internal_state, None
+
+        # Task interrotta: nuova deadline da ora, poi riprendi dall'ultimo step completato
+        print(f"💾 [RUNNER] Resuming task {internal_state.task_id} before {snapshot.next}")
+        await self.graph.aupdate_state(config, {"deadline": internal_state.deadline})
+        return None, None
+
+    async def _answer_cache_key(self, question: str, task_id: str, file_name: str) -> AnswerCacheKey | None:
+        """Chiave della cache risposte, oppure None se la cache non si applica.
+
+        L'allegato viene scaricato tramite la cache dei tool della task: il grafo
+        riusa poi lo stesso download invece di ripeterlo.
+        """
+        if self.answer_cache is None or not task_id:
+            return None
+
+        attachment_hash = NO_ATTACHMENT
+        if file_name:
+            token = current_task_cache.set(get_task_cache(task_id))
+            try:
+                download = next(tool for tool in TOOLS if tool.__name__ == "download_gaia_file")
+                path = await cached_tool_result("download_gaia_file", {"task_id": task_id}, download)
+                try:
+                    attachment_hash = await run_in(IO, file_hash, path)
+                except (OSError, TypeError):
+                    # Allegato non disponibile: senza il suo hash la risposta non è riusabile
+                    return None
+            finally:
+                # La cache della task non deve restare visibile al chiamante
+                current_task_cache.reset(token)
+
+        tools = await tracked_tools_for(self.configuration)
+        return build_key(task_id, question, attachment_hash, self.configuration, tools)
+
+    def _needs_escalation(self, output: GAIAOutputState) -> bool:
+        """Il modello economico non basta.
+
+        Nessuna FINAL ANSWER o errore, risposta forzata dalla fine del budget,
+        run di self-consistency senza quorum oppure confidence bassa.
+        """
+        answer = output.submitted_answer.strip()
+        if not answer or answer == "ERROR":
+            return True
+        if output.budget_exhausted or not output.quorum_reached:
+            return True
+        return output.confidence < self.configuration.cascade_confidence_threshold
     
     def _enhance_question(self, question: str, task_id: str, file_name: str) -> str:
         """Enhancer la domanda con contesto file se necessario"""
@@ -121,4 +496,96 @@ class CleanGAIARunner:
             processing_time=processing_time,
             confidence=0.0,
             errors_encountered=1
-        )
\ No newline at end of file
+        )
+
+
+async def _until_deadline(stream: AsyncIterator[Any], deadline: float) -> AsyncIterator[Any]:
+    """Itera `stream` entro `deadline` (tempo del loop), misurando solo l'attesa dei chunk.
+
+    Il timeout non resta attivo mentre il chiamante elabora un chunk: la
+    cancellazione colpisce sempre il grafo, mai il codice del consumatore.
+    """
+    try:
+        while True:
+            async with asyncio.timeout_at(deadline):
+                try:
+                    item = await anext(stream)
+                except StopAsyncIteration:
+                    return
+            yield item
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _events_from_update(update: Dict[str, Any], tool_names: Dict[str, str]) -> Iterator[GAIAEvent]:
+    """Traduce un aggiornamento di nodo ("updates" di LangGraph) in eventi tipizzati."""
+    for node, delta in update.items():
+        if not delta:
+            continue
+
+        if node == "call_model":
+            for message in delta.get("messages", []):
+                for call in getattr(message, "tool_calls", None) or []:
+                    tool_names[call["id"]] = call["name"]
+                    yield ToolCallIssued(tool_name=call["name"], args=call["args"], tool_call_id=call["id"])
+
+        elif node == "tools":
+            for message in delta.get("messages", []):
+                if isinstance(message, ToolMessage):
+                    content = get_message_text(message)
+                    yield ToolResult(
+                        tool_name=message.name or tool_names.get(message.tool_call_id, ""),
+                        tool_call_id=message.tool_call_id,
+                        content=content,
+                        cached=content.startswith(CACHED_MARKER),
+                    )
+
+
+# Numero con separatore delle migliaia ("1,234,567"): non è una lista
+_THOUSANDS_RE = re.compile(r"^[-+]?\d{1,3}(?:,\d{3})+(?:\.\d+)?$")
+
+
+def _normalize_number(text: str) -> str | None:
+    """Forma esatta di un numero ("1,000" e "1000.0" → "1000"), None se non è un numero."""
+    number = text.replace("$", "").rstrip("%").strip()
+    if _THOUSANDS_RE.match(number):
+        number = number.replace(",", "")
+    try:
+        value = Decimal(number)
+    except InvalidOperation:
+        return None
+    if not value.is_finite():
+        return None
+    # Decimal e non float: numeri diversi non devono mai collassare nella stessa forma
+    return format(value.normalize(), "f")
+
+
+def normalize_answer(answer: str) -> str:
+    """Forma canonica di una risposta per il voto: maiuscole, spazi, punteggiatura e numeri."""
+    text = " ".join(answer.strip().strip("\"'`").split()).rstrip(".").lower()
+    number = _normalize_number(text)
+    if number is not None:
+        return number
+    # Liste: "a,b" e "a, b" sono la stessa risposta; ogni elemento è normalizzato a parte
+    parts = (part.strip() for part in text.split(","))
+    return ", ".join(_normalize_number(part) or part for part in parts)
+
+
+def vote_on_answers(outputs: List[GAIAOutputState]) -> Tuple[GAIAOutputState | None, int]:
+    """Risposta più votata (a parità, confidence totale più alta) e numero di voti.
+
+    Le run fallite o senza risposta non votano.
+    """
+    groups: Dict[str, List[GAIAOutputState]] = {}
+    for output in outputs:
+        answer = output.submitted_answer.strip()
+        if not answer or answer == "ERROR":
+            continue
+        groups.setdefault(normalize_answer(answer), []).append(output)
+    if not groups:
+        return None, 0
+
+    best = max(groups.values(), key=lambda group: (len(group), sum(o.confidence for o in group)))
+    return max(best, key=lambda output: output.confidence), len(best)
@@ -3,17 +3,21 @@
 Works with a chat model with tool calling support.
 """
 
-from datetime import UTC, datetime
-from typing import Dict, List, Literal, cast
+from typing import Any, Callable, Dict, List, Literal, Sequence, cast
 
 from langchain_core.messages import AIMessage
 from langgraph.graph import StateGraph
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode
 
 from react_agent.configuration import Configuration
 from react_agent.state import InputState, State
-from react_agent.tools import TOOLS
-from react_agent.utils import load_chat_model
+from react_agent.tools import TOOLS, tools_for
+from react_agent.utils import (
+    build_cacheable_messages,
+    format_static_system_prompt,
+    load_chat_model,
+)
 
 # Define the function that calls the model
 
@@ -33,18 +37,18 @@ async def call_model(state: State) -> Dict[str, List[AIMessage]]:
     configuration = Configuration.from_context()
 
     # Initialize the model with tool binding. Change the model or add more tools here.
-    model = load_chat_model(configuration.model).bind_tools(TOOLS)
+    model = load_chat_model(configuration.model).bind_tools(await tools_for(configuration))
 
     # Format the system prompt. Customize this to change the agent's behavior.
-    system_message = configuration.system_prompt.format(
-        system_time=datetime.now(tz=UTC).isoformat()
-    )
+    # The date (day granularity) keeps system prompt and history a stable
+    # prefix for provider prompt caching.
+    system_message = format_static_system_prompt(configuration.system_prompt)
 
     # Get the model's response
     response = cast(
         AIMessage,
         await model.ainvoke(
-            [{"role": "system", "content": system_message}, *state.messages]
+            build_cacheable_messages(system_message, state.messages, configuration.model)
         ),
     )
 
@@ -63,19 +67,6 @@ async def call_model(state: State) -> Dict[str, List[AIMessage]]:
     return {"messages": [response]}
 
 
-# Define a new graph
-
-builder = StateGraph(State, input=InputState, config_schema=Configuration)
-
-# Define the two nodes we will cycle between
-builder.add_node(call_model)
-builder.add_node("tools", ToolNode(TOOLS))
-
-# Set the entrypoint as `call_model`
-# This means that this node is the first one called
-builder.add_edge("__start__", "call_model")
-
-
 def route_model_output(state: State) -> Literal["__end__", "tools"]:
     """Determine the next node based on the model's output.
 
@@ -99,17 +90,41 @@ def route_model_output(state: State) -> Literal["__end__", "tools"]:
     return "tools"
 
 
-# Add a conditional edge to determine the next step after `call_model`
-builder.add_conditional_edges(
-    "call_model",
-    # After call_model finishes running, the next node(s) are scheduled
-    # based on the output from route_model_output
-    route_model_output,
-)
 
-# Add a normal edge from `tools` to `call_model`
-# This creates a cycle: after using tools, we always return to the model
-builder.add_edge("tools", "call_model")
+def create_graph(tools: Sequence[Callable[..., Any]] = TOOLS) -> CompiledStateGraph:
+    """Build the ReAct graph.
+
+    Args:
+        tools: The tools executed by the `tools` node. Defaults to `TOOLS`;
+            benchmarks pass offline stubs with the same names.
+
+    Returns:
+        CompiledStateGraph: The compiled agent graph.
+    """
+    builder = StateGraph(State, input=InputState, config_schema=Configuration)
+
+    # Define the two nodes we will cycle between
+    builder.add_node(call_model)
+    builder.add_node("tools", ToolNode(tools))
+
+    # Set the entrypoint as `call_model`
+    # This means that this node is the first one called
+    builder.add_edge("__start__", "call_model")
+
+    # Add a conditional edge to determine the next step after `call_model`
+    builder.add_conditional_edges(
+        "call_model",
+        # After call_model finishes running, the next node(s) are scheduled
+        # based on the output from route_model_output
+        route_model_output,
+    )
+
+    # Add a normal edge from `tools` to `call_model`
+    # This creates a cycle: after using tools, we always return to the model
+    builder.add_edge("tools", "call_model")
+
+    # Compile the builder into an executable graph
+    return builder.compile(name="ReAct Agent")
+
 
-# Compile the builder into an executable graph
-graph = builder.compile(name="ReAct Agent")
+graph = create_graph()
@@ -1,18 +1,61 @@
 """Graph con nuovo sistema di stato"""
 
-from langgraph.prebuilt import ToolNode
-from datetime import UTC, datetime
-from typing import Dict, Any, List, Literal, cast
-
-from langchain_core.messages import AIMessage
+import asyncio
+import re
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Literal,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from langchain_core.messages import AIMessage, AnyMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph
 from langgraph.prebuilt import ToolNode
 
-
+from react_agent.artifacts import (
+    ArtifactStore,
+    clear_artifact_store,
+    current_artifact_store,
+    get_artifact_store,
+    make_preview,
+)
 from react_agent.configuration import Configuration
+from react_agent.deadlines import deadline_scope
+from react_agent.executors import IO, run_in
+from react_agent.prompts import (
+    ARTIFACT_PROMPT,
+    FORCE_FINAL_ANSWER_PROMPT,
+    TASK_CONTEXT_PROMPT,
+    WIKI_DUMP_PROMPT,
+)
 from react_agent.state_v2 import GAIAInputState, GAIAInternalState, GAIAOutputState
-from react_agent.tools import TOOLS
-from react_agent.utils import load_chat_model
+from react_agent.tool_cache import (
+    CACHED_MARKER,
+    ToolCallCache,
+    clear_task_cache,
+    current_task_cache,
+    get_task_cache,
+    is_error_output,
+)
+from react_agent.tools import ARTIFACT_TOOLS, SIDE_EFFECT_TOOLS, TOOLS, tools_for
+from react_agent.utils import (
+    build_cacheable_messages,
+    format_static_system_prompt,
+    get_message_text,
+    get_prompt_token_usage,
+    load_chat_model,
+)
 
 # 🧠 Model Node con tracking avanzato
 
@@ -33,70 +76,148 @@ async def call_model_with_tracking(state: GAIAInternalState) -> Dict[str, Any]:
     else:
         print("  ❌ Task ID is empty - data not passed correctly!")
 
+    # 📡 Evento per chi consuma lo stream (no-op senza stream_mode="custom")
+    get_stream_writer()({"event": "model_step_started", "step": state.model_steps + 1})
+
     configuration = Configuration.from_context()
-    model = load_chat_model(configuration.model).bind_tools(TOOLS)
+    tools = await tracked_tools_for(configuration)
 
-    # System prompt con contesto
-    system_message = configuration.system_prompt.format(
-        system_time=datetime.now(tz=UTC).isoformat()
+    # ⏱️ Budget della task: passi e deadline derivati dal Level
+    step_budget, deadline = resolve_task_budget(state, configuration)
+    force_final = state.is_last_step or budget_exhausted(
+        state, step_budget, deadline, configuration.deadline_reserve_seconds
     )
-
-    # Aggiungi contesto se abbiamo metadati
+    # Ultimo turno: gli schemi restano (la storia contiene tool call) ma il modello non può usarli
+    model = bind_tools_for_step(load_chat_model(configuration.model), tools, configuration.model, force_final)
+
+    # 🧊 Prefisso stabile (system prompt + tool schemas + storia) per il prompt caching:
+    # il contesto volatile della task va in fondo
+    system_message = format_static_system_prompt(configuration.system_prompt)
+    tool_names = {tool.__name__ for tool in tools}
+    if "wikipedia_lookup" in tool_names:
+        system_message = f"{system_message}\n\n{WIKI_DUMP_PROMPT}"
+    if tool_names & ARTIFACT_TOOLS:
+        system_message = f"{system_message}\n\n{ARTIFACT_PROMPT}"
+    volatile_context = ""
     if state.task_id:
-        context_info = f"\n\n=== CURRENT TASK CONTEXT ===\n"
-        context_info += f"Task ID: {state.task_id}\n"
-        context_info += f"Has File: {state.has_file}\n"
-        context_info += f"Tools Used: {', '.join(state.tools_used)}\n"
-        context_info += f"Current Step: {state.current_step}\n"
-        system_message += context_info
-
-    # Get model response
-    response = cast(
-        AIMessage,
-        await model.ainvoke([
-            {"role": "system", "content": system_message},
-            *state.messages
-        ])
+        volatile_context = TASK_CONTEXT_PROMPT.format(
+            system_time=datetime.now(tz=UTC).date().isoformat(),
+            task_id=state.task_id,
+            has_file=state.has_file,
+            tools_used=", ".join(state.tools_used),
+            current_step=state.current_step,
+        )
+    if force_final:
+        print(f"⏱️ [GRAPH] Budget esaurito ({state.model_steps}/{step_budget} steps): forcing FINAL ANSWER")
+        volatile_context = f"{volatile_context}\n\n{FORCE_FINAL_ANSWER_PROMPT}".strip()
+
+    messages = build_cacheable_messages(
+        system_message, state.messages, configuration.model, volatile_context
     )
 
-    # Handle last step
-    if state.is_last_step and response.tool_calls:
-        return {
-            "messages": [response],
-            "error_count": state.error_count + 1
-        }
+    # Get model response
+    response = cast(AIMessage, await model.ainvoke(messages))
+    if force_final and response.tool_calls:
+        # Il provider ha ignorato il divieto: chiedi una volta la risposta senza tool
+        print("⏱️ [GRAPH] Tool calls on the forced final turn: asking again for the answer")
+        response = cast(AIMessage, await model.ainvoke(final_answer_retry(messages, response)))
+
+    prompt_tokens, cached_tokens = get_prompt_token_usage(response)
+    update: Dict[str, Any] = {"model_steps": 1}
+    if prompt_tokens:
+        update["prompt_tokens"] = prompt_tokens
+        update["cached_prompt_tokens"] = cached_tokens
+    if force_final:
+        update["budget_exhausted"] = True
+        # Ultima risorsa: il modello vuole ancora usare tool, scarta le chiamate e chiudi la task
+        if response.tool_calls:
+            response = best_effort_final_message(response)
+            update["error_count"] = 1
 
     # Extract reasoning step
     new_reasoning = extract_reasoning_step(response.content or "")
-    
-    # Aggiungi reasoning step
-    updated_reasoning = state.reasoning_steps.copy()
-    if new_reasoning and len(new_reasoning) > 10:
-        updated_reasoning.append(new_reasoning)
-        print(f"🔧 [GRAPH] Added reasoning step: {new_reasoning[:50]}...")
 
     # Update current step
     current_step = "reasoning" if not response.tool_calls else f"using_tools({len(response.tool_calls)})"
 
-    # ✅ CRITICAL: Return TUTTO lo stato, non solo i campi modificati
-    return {
-        # Campi aggiornati
-        "messages": [response],
-        "reasoning_steps": updated_reasoning,
-        "current_step": current_step,
-        
-        # ✅ PRESERVA tutti i metadati esistenti
-        "task_id": state.task_id,
-        "has_file": state.has_file,
-        "file_name": state.file_name,
-        "tools_used": state.tools_used,
-        "reasoning_steps": updated_reasoning,
-        "current_step": current_step,
-        "start_time": state.start_time,
-        "difficulty_level": state.difficulty_level,
-        "confidence": state.confidence,
-        "error_count": state.error_count
-    }
+    # ✅ Restituisci solo i delta: i reducer di GAIAInternalState fanno il merge
+    update["messages"] = [response]
+    update["current_step"] = current_step
+    if new_reasoning and len(new_reasoning) > 10:
+        update["reasoning_steps"] = [new_reasoning]
+        print(f"🔧 [GRAPH] Added reasoning step: {new_reasoning[:50]}...")
+
+    return update
+
+
+def artifacts_enabled(configuration: Configuration) -> bool:
+    """Artifact store attivo (artifact_threshold_chars=0 lo disabilita)."""
+    return configuration.artifact_threshold_chars > 0
+
+
+async def tracked_tools_for(configuration: Configuration) -> List[Callable[..., Any]]:
+    """Tool offerti al modello dal grafo tracciato: i *_artifact solo con lo store attivo."""
+    return await tools_for(configuration, artifacts=artifacts_enabled(configuration))
+
+
+def resolve_task_budget(state: GAIAInternalState, configuration: Configuration) -> Tuple[int, datetime | None]:
+    """Step budget e deadline della task, derivati dal Level se il runner non li ha impostati."""
+    step_budget = state.step_budget or configuration.step_budget_for(state.difficulty_level)
+
+    deadline = state.deadline
+    if deadline is None and state.start_time is not None:
+        deadline = state.start_time + timedelta(
+            seconds=configuration.time_budget_for(state.difficulty_level)
+        )
+    return step_budget, deadline
+
+
+def budget_exhausted(
+    state: GAIAInternalState,
+    step_budget: int,
+    deadline: datetime | None,
+    reserve_seconds: float,
+) -> bool:
+    """Verifica se questo è l'ultimo passo utile per dare una FINAL ANSWER."""
+    if state.model_steps + 1 >= step_budget:
+        return True
+    if deadline is not None:
+        remaining = (deadline - datetime.now(tz=deadline.tzinfo)).total_seconds()
+        return remaining <= reserve_seconds
+    return False
+
+
+# tool_choice che vieta nuove tool call, per provider (gli altri ricevono solo il prompt)
+NO_TOOL_CHOICE: Dict[str, Any] = {
+    "openai": "none",
+    "anthropic": {"type": "none"},
+}
+
+
+def bind_tools_for_step(model: Any, tools: Sequence[Callable[..., Any]], model_name: str, force_final: bool) -> Any:
+    """Lega i tool al modello; nel turno finale forzato con tool_choice "none" dove il provider lo supporta."""
+    provider = model_name.split("/", maxsplit=1)[0]
+    if force_final and provider in NO_TOOL_CHOICE:
+        return model.bind_tools(tools, tool_choice=NO_TOOL_CHOICE[provider])
+    return model.bind_tools(tools)
+
+
+def final_answer_retry(messages: List[Any], response: AIMessage) -> List[Any]:
+    """Messaggi per richiedere la risposta finale dopo un turno forzato con tool calls."""
+    retry = list(messages)
+    text = get_message_text(response)
+    if text:
+        retry.append({"role": "assistant", "content": text})
+    retry.append({"role": "user", "content": FORCE_FINAL_ANSWER_PROMPT})
+    return retry
+
+
+def best_effort_final_message(response: AIMessage) -> AIMessage:
+    """Risposta senza tool calls: il budget è finito, si usa quanto già ragionato."""
+    content = get_message_text(response)
+    if "FINAL ANSWER:" not in content:
+        content = f"{content}\n\nFINAL ANSWER: ".lstrip()
+    return AIMessage(id=response.id, content=content)
 
 
 def extract_reasoning_step(content: str) -> str:
@@ -160,45 +281,209 @@ def route_model_output_tracked(state: GAIAInternalState) -> Literal["prepare_out
 # 🛠️ Tool Node con tracking
 
 
-class TrackedToolNode(ToolNode):
-    """ToolNode che traccia quali tool vengono usati"""
+class TrackedToolNode:
+    """Esegue i tool tramite ToolNode, traccia quali vengono usati e memoizza le chiamate ripetute."""
 
-    def __init__(self, tools):
-        super().__init__(tools)
+    def __init__(self, tools, side_effect_tools: FrozenSet[str] = SIDE_EFFECT_TOOLS):
+        """Nodo sui `tools` dati; quelli in `side_effect_tools` non vengono mai memoizzati."""
+        self.tool_node = ToolNode(tools)
+        self.side_effect_tools = side_effect_tools
 
-    async def invoke(self, input, config, **kwargs):
-        """Override invoke per tracciare i tools usati"""
+    async def __call__(self, state: GAIAInternalState, config: RunnableConfig) -> Dict[str, Any]:
+        """Esegue le tool call dell'ultimo messaggio e aggiorna i tool usati."""
         print(f"\n🔧 [TRACKED_TOOLS] Starting tool execution...")
-        
-        # ✅ Estrai tool names PRIMA dell'esecuzione
-        tool_names = []
-        if hasattr(input, 'messages') and input.messages:
-            last_message = input.messages[-1]
-            if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
-                tool_names = [call.get('name', 'unknown_tool') for call in last_message.tool_calls]
-                print(f"🔧 [TRACKED_TOOLS] About to execute: {tool_names}")
-        
-        # Esegui i tool normalmente
-        result = await super().invoke(input, config, **kwargs)
-        
-        # ✅ Aggiorna lo stato con i tools eseguiti
-        if tool_names:
-            current_tools = getattr(input, 'tools_used', [])
-            updated_tools = list(set(current_tools + tool_names))  # Evita duplicati
-            
-            # ✅ CRITICAL: Aggiungi al result invece di sovrascrivere
-            if isinstance(result, dict):
-                result['tools_used'] = updated_tools
-            else:
-                # Se result non è dict, creane uno
-                result = {
-                    'messages': result.messages if hasattr(result, 'messages') else [],
-                    'tools_used': updated_tools
-                }
-            
-            print(f"🔧 [TRACKED_TOOLS] Updated tools_used: {updated_tools}")
-        
-        return result
+
+        # ✅ Estrai tool calls PRIMA dell'esecuzione
+        tool_calls = []
+        if state.messages:
+            tool_calls = getattr(state.messages[-1], 'tool_calls', None) or []
+        tool_names = [call.get('name', 'unknown_tool') for call in tool_calls]
+        print(f"🔧 [TRACKED_TOOLS] About to execute: {tool_names}")
+
+        # Esegui le chiamate in parallelo, passando dalla cache per-task
+        cache = get_task_cache(task_cache_key(state, config))
+        current_task_cache.set(cache)
+        configuration = Configuration.from_context()
+        store = None
+        if artifacts_enabled(configuration):
+            store = get_artifact_store(task_cache_key(state, config), configuration.artifact_dir)
+        current_artifact_store.set(store)
+        # ⏱️ I tool non superano la deadline della task (oltre al proprio budget)
+        _, deadline = resolve_task_budget(state, configuration)
+        task_seconds = None
+        if deadline is not None:
+            task_seconds = (deadline - datetime.now(tz=deadline.tzinfo)).total_seconds()
+        with deadline_scope(task_seconds):
+            messages = await asyncio.gather(*(
+                self._cached_tool_call(cache, call, config) for call in tool_calls
+            ))
+        # 📦 Output lunghi nello store: al modello arrivano anteprima e handle
+        messages = [
+            await self._spill_to_artifact(store, message, configuration) for message in messages
+        ]
+
+        # ✅ Solo il delta: nessuna scrittura se i tool erano già tracciati
+        update: Dict[str, Any] = {"messages": list(messages)}
+        new_tools = [name for name in tool_names if name not in state.tools_used]
+        if new_tools:
+            update["tools_used"] = new_tools
+            print(f"🔧 [TRACKED_TOOLS] New tools used: {new_tools}")
+
+        return update
+
+    @staticmethod
+    async def _spill_to_artifact(
+        store: ArtifactStore | None, message: ToolMessage, configuration: Configuration
+    ) -> ToolMessage:
+        """Sostituisce un output troppo lungo con anteprima + handle dell'artifact."""
+        content = message.content
+        threshold = configuration.artifact_threshold_chars
+        if (
+            store is None
+            or not isinstance(content, str)
+            or len(content) <= threshold
+            or message.name in ARTIFACT_TOOLS
+            or message.status == "error"
+            or is_error_output(content)
+        ):
+            return message
+        # Il marker della cache resta in testa: l'artifact contiene solo l'output del tool
+        prefix = ""
+        if content.startswith(CACHED_MARKER):
+            prefix, content = f"{CACHED_MARKER}\n", content[len(CACHED_MARKER):].lstrip("\n")
+        name = message.name or "tool"
+        handle = await run_in(IO, store.put, name, content)
+        print(f"📦 [ARTIFACTS] {name}: {len(content)} chars stored as {handle}")
+        return message.model_copy(update={
+            "content": prefix + make_preview(handle, name, content, configuration.artifact_preview_chars),
+        })
+
+    async def _cached_tool_call(self, cache: ToolCallCache, call: ToolCall, config: RunnableConfig) -> ToolMessage:
+        """Riusa il risultato di una chiamata identica già fatta (o in corso) nella stessa task."""
+        name, args = call["name"], call["args"]
+        if name in self.side_effect_tools:
+            return await self._run_tool_call(call, config)
+
+        entry = cache.get(name, args)
+        if entry is not None:
+            # shield: cancellare una run (es. self-consistency) non cancella la chiamata condivisa
+            previous = await asyncio.shield(entry)
+            if previous.status != "error" and not is_error_output(previous.content):
+                print(f"🔧 [TRACKED_TOOLS] Cache hit: {name}")
+                content = previous.content
+                if isinstance(content, str):
+                    content = f"{CACHED_MARKER}\n{content}"
+                return ToolMessage(
+                    content=content,
+                    name=name,
+                    tool_call_id=call["id"],
+                    status=previous.status,
+                )
+            # Un prefetch fallito non deve nascondere un nuovo tentativo
+            cache.discard(name, args)
+
+        entry = asyncio.ensure_future(self._run_tool_call(call, config))
+        cache.put(name, args, entry)
+        message = await asyncio.shield(entry)
+        # Gli errori non vanno memoizzati: la prossima chiamata deve riprovare
+        if message.status == "error" or is_error_output(message.content):
+            cache.discard(name, args)
+        return message
+
+    async def prefetch(self, state: GAIAInternalState, config: RunnableConfig) -> Dict[str, Any]:
+        """Avvia in background le fetch prevedibili, in parallelo alla prima chiamata al modello."""
+        update: Dict[str, Any] = {}
+        key = task_cache_key(state, config)
+        if not key:
+            # Nessuna task né thread: cache e artifact valgono solo per questa run
+            key = update["run_scope"] = f"run-{uuid.uuid4().hex}"
+        cache = get_task_cache(key)
+        current_task_cache.set(cache)
+
+        for call in detect_prefetch_calls(state):
+            name, args = call["name"], call["args"]
+            if name not in self.tool_node.tools_by_name or cache.get(name, args) is not None:
+                continue
+            print(f"🔧 [PREFETCH] Warming {name}({args})")
+            cache.put(name, args, asyncio.ensure_future(self._run_tool_call(call, config)))
+
+        # I risultati arrivano tramite la cache
+        return update
+
+    async def _run_tool_call(self, call: ToolCall, config: RunnableConfig) -> ToolMessage:
+        """Esegue una singola tool call con la gestione errori standard di ToolNode."""
+        result = await self.tool_node.ainvoke(
+            {"messages": [AIMessage(content="", tool_calls=[call])]}, config
+        )
+        return result["messages"][0]
+
+
+# URL nel testo della domanda (senza la punteggiatura finale)
+URL_PATTERN = re.compile(r"https?://[^\s<>\"'\]\)]+")
+YOUTUBE_PATTERN = re.compile(r"(?:youtube\.com/|youtu\.be/)")
+
+
+def detect_prefetch_calls(state: GAIAInternalState) -> List[ToolCall]:
+    """Individua le tool call che il primo turno del modello richiederà quasi certamente."""
+    calls: List[ToolCall] = []
+
+    # File allegato alla task GAIA
+    if state.has_file and state.task_id:
+        calls.append(ToolCall(name="download_gaia_file", args={"task_id": state.task_id}, id="prefetch_file"))
+
+    # URL nella domanda (primo messaggio utente)
+    question = ""
+    if state.messages:
+        question = str(state.messages[0].content)
+
+    seen = set()
+    for url in URL_PATTERN.findall(question):
+        url = url.rstrip(".,;:!?")
+        if url in seen:
+            continue
+        seen.add(url)
+        if YOUTUBE_PATTERN.search(url):
+            # analyze_youtube_video riusa la trascrizione dalla cache della task
+            calls.append(ToolCall(name="get_youtube_transcript", args={"video_url": url}, id=f"prefetch_{len(calls)}"))
+        else:
+            calls.append(ToolCall(name="extract_text_from_url", args={"url": url}, id=f"prefetch_{len(calls)}"))
+
+    return calls
+
+
+def task_cache_key(state: GAIAInternalState, config: RunnableConfig) -> str:
+    """Chiave della cache per-task: task_id, altrimenti il thread, altrimenti la singola run.
+
+    Vuota solo prima che prefetch assegni lo scope della run.
+    """
+    if state.task_id:
+        return state.task_id
+    thread_id = (config.get("configurable") or {}).get("thread_id")
+    if thread_id:
+        return str(thread_id)
+    return state.run_scope
+
+
+# Caratteri dei ToolMessage conservati nell'output slim
+SLIM_PREVIEW_CHARS = 200
+
+
+def slim_messages(messages: Sequence[AnyMessage], preview_chars: int = SLIM_PREVIEW_CHARS) -> List[AnyMessage]:
+    """Crea copie compatte dei messaggi: i ToolMessage lunghi diventano un'anteprima.
+
+    Le risposte del modello restano intere (contengono reasoning e FINAL ANSWER).
+    """
+    compact: List[AnyMessage] = []
+    for message in messages:
+        content = message.content
+        if isinstance(message, ToolMessage) and isinstance(content, str) and len(content) > preview_chars:
+            omitted = len(content) - preview_chars
+            message = message.model_copy(update={
+                "content": f"{content[:preview_chars]}… [{omitted} chars omitted]",
+                "artifact": None,
+            })
+        compact.append(message)
+    return compact
 
 
 # 📊 Output Processing Node
@@ -244,8 +529,13 @@ def prepare_clean_output(state: GAIAInternalState) -> Dict[str, Any]:
     # Calcola confidence
     confidence = calculate_confidence_from_execution(state, tools_used, reasoning_steps)
 
+    # 🪶 Output slim: i testi completi dei tool non sopravvivono alla task
+    messages = state.messages
+    if Configuration.from_context().slim_output:
+        messages = slim_messages(messages)
+
     output = GAIAOutputState(
-        messages=state.messages,
+        messages=messages,
         final_answer=final_answer,
         task_id=state.task_id, 
         submitted_answer=submitted_answer,
@@ -254,13 +544,24 @@ def prepare_clean_output(state: GAIAInternalState) -> Dict[str, Any]:
         tools_used=tools_used,  # ✅ Dai messaggi
         processing_time=processing_time,
         steps_taken=len(reasoning_steps),
-        errors_encountered=state.error_count
+        errors_encountered=state.error_count,
+        budget_exhausted=state.budget_exhausted,
+        prompt_tokens=state.prompt_tokens,
+        cached_token_ratio=(
+            state.cached_prompt_tokens / state.prompt_tokens if state.prompt_tokens else 0.0
+        )
     )
     
     print(f"\n🔧 [OUTPUT] Final GAIAOutputState:")
     print(f"  - task_id: '{output.task_id}'")
     print(f"  - tools_used: {output.tools_used}")
     print(f"  - confidence: {output.confidence}")
+    print(f"  - cached_token_ratio: {output.cached_token_ratio:.2f} ({state.cached_prompt_tokens}/{state.prompt_tokens})")
+
+    # Run senza task né thread: nessuno la riprenderà, cache e artifact non servono più
+    if state.run_scope:
+        clear_task_cache(state.run_scope)
+        clear_artifact_store(state.run_scope)
 
     return {"clean_output": output}
 
@@ -331,11 +632,19 @@ def calculate_confidence_from_execution(state: GAIAInternalState, tools_used: Li
     # Penalizza errori
     base_confidence -= (state.error_count * 0.1)
 
+    # Penalizza le risposte forzate dalla fine del budget
+    if state.budget_exhausted:
+        base_confidence -= 0.2
+
     return max(0.0, min(1.0, base_confidence))
 
 
 # 🏗️ Build Graph
-def create_tracked_graph():
+def create_tracked_graph(
+    checkpointer: BaseCheckpointSaver | None = None,
+    tools: Sequence[Callable[..., Any]] | None = None,
+):
+    """Costruisce il grafo tracciato; `tools` sostituisce TOOLS (es. stub nei benchmark)."""
     builder = StateGraph(
         GAIAInternalState,
         # input=GAIAInputState,
@@ -343,12 +652,15 @@ def create_tracked_graph():
     )
 
     # Add nodes
+    tool_node = TrackedToolNode(TOOLS if tools is None else tools)
+    builder.add_node("prefetch", tool_node.prefetch)
     builder.add_node("call_model", call_model_with_tracking)
-    builder.add_node("tools", TrackedToolNode(TOOLS))
+    builder.add_node("tools", tool_node)
     builder.add_node("prepare_output", prepare_clean_output)
 
     # ⚠️ Fix gli edges:
-    builder.add_edge("__start__", "call_model")
+    builder.add_edge("__start__", "prefetch")
+    builder.add_edge("prefetch", "call_model")
     builder.add_conditional_edges(
         "call_model",
         route_model_output_tracked,
@@ -361,7 +673,7 @@ def create_tracked_graph():
     builder.add_edge("tools", "call_model")
     builder.add_edge("prepare_output", "__end__")  # ✅ Questo era mancante?
 
-    return builder.compile(name="TrackedGAIA-Agent")
+    return builder.compile(checkpointer=checkpointer, name="TrackedGAIA-Agent")
 
 
 # Create the graph instance
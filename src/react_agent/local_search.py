@@ -0,0 +1,232 @@
+"""Indice di ricerca locale (BM25) su disco, consultato da `search` prima di Tavily.
+
+L'indice è un inverted index in SQLite alimentato dalle pagine lette con
+`extract_text_from_url` e dai risultati delle ricerche già fatte: nelle run
+successive le stesse ricerche vengono servite in locale in pochi millisecondi.
+"""
+
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Parametri BM25 standard
+K1 = 1.2
+B = 0.75
+
+# Lunghezza massima dell'estratto restituito per documento
+SNIPPET_CHARS = 1500
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it of on or that the this "
+    "to was were what when where which who why with".split()
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Token minuscoli, senza stopword."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def bm25_scores(
+    query_terms: Iterable[str],
+    postings: Dict[str, Dict[Any, int]],
+    doc_lengths: Dict[Any, int],
+    total_docs: int,
+    avg_length: float,
+) -> Dict[Any, float]:
+    """Punteggi BM25 dei documenti che contengono almeno un termine della query."""
+    scores: Dict[Any, float] = {}
+    for term in set(query_terms):
+        term_postings = postings.get(term, {})
+        if not term_postings:
+            continue
+        df = len(term_postings)
+        idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+        for doc, tf in term_postings.items():
+            norm = K1 * (1 - B + B * doc_lengths[doc] / (avg_length or 1))
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+    return scores
+
+
+def best_snippet(content: str, terms: Iterable[str], width: int = SNIPPET_CHARS) -> str:
+    """Finestra di testo che contiene più termini della query."""
+    if len(content) <= width:
+        return content
+    lowered = content.lower()
+    positions = sorted(
+        match.start() for term in set(terms) for match in re.finditer(re.escape(term), lowered)
+    )
+    if not positions:
+        return content[:width]
+    # Finestra che copre più occorrenze (two pointers sulle posizioni ordinate)
+    best_start, best_count, left = positions[0], 0, 0
+    for right, position in enumerate(positions):
+        while position - positions[left] > width:
+            left += 1
+        if right - left + 1 > best_count:
+            best_start, best_count = positions[left], right - left + 1
+    start = max(0, best_start - width // 10)
+    return content[start:start + width]
+
+
+class LocalSearchIndex:
+    """Inverted index BM25 persistente e aggiornato in modo incrementale."""
+
+    def __init__(self, path: str, min_coverage: float = 0.75) -> None:
+        """Apre (o crea) l'indice SQLite in `path`."""
+        self.path = path
+        # Frazione minima dei termini della query presenti nel miglior documento
+        self.min_coverage = min_coverage
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Chiude la connessione al database."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        """Numero di documenti indicizzati."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def add_document(self, url: str, title: str, content: str) -> bool:
+        """Indicizza (o aggiorna) un documento; un testo più corto non sostituisce uno più lungo."""
+        content = content.strip()
+        if not url or not content:
+            return False
+        counts = Counter(tokenize(f"{title} {content}"))
+        if not counts:
+            return False
+
+        with self._lock, self._conn:
+            existing = self._conn.execute(
+                "SELECT id, length(content) FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+            if existing is not None:
+                if existing[1] >= len(content):
+                    return False
+                self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (existing[0],))
+                self._conn.execute("DELETE FROM documents WHERE id = ?", (existing[0],))
+
+            cursor = self._conn.execute(
+                "INSERT INTO documents (url, title, content, length, added_at) VALUES (?, ?, ?, ?, ?)",
+                (url, title, content, sum(counts.values()), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                [(term, cursor.lastrowid, tf) for term, tf in counts.items()],
+            )
+        return True
+
+    def add_search_results(self, response: Dict[str, Any] | None) -> int:
+        """Indicizza i risultati di una risposta Tavily; restituisce quanti sono stati aggiunti."""
+        added = 0
+        for result in (response or {}).get("results") or []:
+            content = result.get("raw_content") or result.get("content") or ""
+            if self.add_document(result.get("url", ""), result.get("title", ""), content):
+                added += 1
+        return added
+
+    def search(self, query: str, max_results: int = 5) -> Dict[str, Any] | None:
+        """Risultati in formato Tavily, oppure None se il miglior documento non copre la query."""
+        terms = tokenize(query)
+        if not terms:
+            return None
+
+        with self._lock:
+            total_docs, total_length = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents"
+            ).fetchone()
+            if not total_docs:
+                return None
+            unique_terms = sorted(set(terms))
+            rows = self._conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p "
+                f"JOIN documents d ON d.id = p.doc_id "
+                f"WHERE p.term IN ({','.join('?' * len(unique_terms))})",
+                unique_terms,
+            ).fetchall()
+
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths: Dict[int, int] = {}
+        for term, doc_id, tf, length in rows:
+            postings.setdefault(term, {})[doc_id] = tf
+            lengths[doc_id] = length
+
+        scores = bm25_scores(terms, postings, lengths, total_docs, total_length / total_docs)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:max_results]
+        if not ranked or self._coverage(ranked[0][0], unique_terms, postings) < self.min_coverage:
+            return None
+
+        return {
+            "query": query,
+            "source": "local_index",
+            "results": self._results(ranked, terms),
+        }
+
+    @staticmethod
+    def _coverage(doc_id: int, terms: List[str], postings: Dict[str, Dict[int, int]]) -> float:
+        matched = sum(1 for term in terms if doc_id in postings.get(term, {}))
+        return matched / len(terms)
+
+    def _results(self, ranked: List[Tuple[int, float]], terms: List[str]) -> List[Dict[str, Any]]:
+        ids = [doc_id for doc_id, _ in ranked]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, url, title, content FROM documents WHERE id IN ({','.join('?' * len(ids))})",
+                ids,
+            ).fetchall()
+        documents = {row[0]: row[1:] for row in rows}
+        return [
+            {
+                "url": documents[doc_id][0],
+                "title": documents[doc_id][1],
+                "content": best_snippet(documents[doc_id][2], terms),
+                "score": round(score, 4),
+            }
+            for doc_id, score in ranked
+        ]
+
+
+_INDEXES: Dict[str, LocalSearchIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_local_search_index(path: str, min_coverage: float = 0.75) -> LocalSearchIndex:
+    """Restituisci l'indice condiviso per percorso (una connessione per processo)."""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(path)
+        if index is None:
+            index = _INDEXES[path] = LocalSearchIndex(path, min_coverage)
+        index.min_coverage = min_coverage
+        return index
@@ -0,0 +1,194 @@
+"""Rilevatore opzionale di blocchi dell'event loop.
+
+Con il monitor attivo ogni callback del loop viene cronometrato: quelli oltre
+la soglia sono attribuiti al tool o al nodo del grafo che li ha eseguiti
+(contextvar `current_activity`, oppure il nodo LangGraph della config corrente).
+Una sonda misura anche il ritardo del loop (lag). Il riepilogo finisce nel
+summary del run e indica quali chiamate serializzano le task concorrenti.
+
+Uso: `async with LoopMonitor() as monitor: ...` poi `monitor.format_summary()`.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.runnables.config import var_child_runnable_config
+
+# Attività in corso nel contesto (es. "tool:python_repl"); i nodi la ricavano dalla config
+current_activity: ContextVar[str | None] = ContextVar("current_activity", default=None)
+
+# Ultima attività entrata durante il callback in corso (per thread: un loop per thread)
+_STEP = threading.local()
+
+_PATCH_LOCK = threading.Lock()
+_ACTIVE: Optional["LoopMonitor"] = None
+_ORIGINAL_RUN = asyncio.events.Handle._run
+
+
+def attributed(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Decoratore per i tool: i callback eseguiti durante il tool gli vengono attribuiti."""
+    activity = f"tool:{func.__name__}"
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = current_activity.set(activity)
+        # Un tool senza await esce nello stesso callback in cui è entrato
+        _STEP.activity = activity
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            current_activity.reset(token)
+
+    return wrapper
+
+
+def _callback_name(handle: asyncio.Handle) -> str:
+    callback = getattr(handle, "_callback", None)
+    # Step di un Task: il nome utile è quello della coroutine
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        return getattr(task.get_coro(), "__qualname__", task.get_name())
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+def attribute(handle: asyncio.Handle, step_activity: str | None = None) -> str:
+    """Tool o nodo responsabile di un callback, altrimenti il nome del callback."""
+    context = getattr(handle, "_context", None)
+    activity = context.get(current_activity) if context is not None else None
+    if activity or step_activity:
+        return activity or step_activity
+    if context is not None:
+        config = context.get(var_child_runnable_config) or {}
+        node = (config.get("metadata") or {}).get("langgraph_node")
+        if node:
+            return f"node:{node}"
+    return f"callback:{_callback_name(handle)}"
+
+
+@dataclass
+class StallStats:
+    """Callback lenti attribuiti alla stessa attività."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+@dataclass
+class LoopReport:
+    """Riepilogo del monitor: lag del loop e blocchi per attività."""
+
+    lag_samples: List[float] = field(default_factory=list)
+    stalls: Dict[str, StallStats] = field(default_factory=dict)
+
+    @property
+    def max_lag(self) -> float:
+        """Ritardo massimo osservato dalla sonda, in secondi."""
+        return max(self.lag_samples, default=0.0)
+
+    @property
+    def p95_lag(self) -> float:
+        """95° percentile del ritardo della sonda, in secondi."""
+        if not self.lag_samples:
+            return 0.0
+        ordered = sorted(self.lag_samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class LoopMonitor:
+    """Cronometra i callback del loop e campiona il lag (uno solo attivo per processo)."""
+
+    def __init__(self, threshold: float = 0.1, probe_interval: float = 0.05) -> None:
+        """Monitor con soglia di blocco e intervallo della sonda in secondi."""
+        # Un callback più lungo di `threshold` secondi è un blocco del loop
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self._stalls: Dict[str, StallStats] = defaultdict(StallStats)
+        self._lag_samples: List[float] = []
+        self._probe: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "LoopMonitor":
+        """Avvia il monitor."""
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Ferma il monitor."""
+        await self.stop()
+
+    def start(self) -> None:
+        """Patcha il loop e avvia la sonda; RuntimeError se un altro monitor è attivo."""
+        global _ACTIVE
+        with _PATCH_LOCK:
+            if _ACTIVE is not None:
+                raise RuntimeError("A LoopMonitor is already running")
+            _ACTIVE = self
+            asyncio.events.Handle._run = _timed_run
+        self._probe = asyncio.get_running_loop().create_task(self._sample_lag(), name="loop-monitor-probe")
+
+    async def stop(self) -> None:
+        """Ferma la sonda e ripristina il loop."""
+        global _ACTIVE
+        if self._probe is not None:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+            self._probe = None
+        with _PATCH_LOCK:
+            if _ACTIVE is self:
+                asyncio.events.Handle._run = _ORIGINAL_RUN
+                _ACTIVE = None
+
+    def record(self, handle: asyncio.Handle, elapsed: float, step_activity: str | None = None) -> None:
+        """Registra un callback che ha bloccato il loop per `elapsed` secondi."""
+        stats = self._stalls[attribute(handle, step_activity)]
+        stats.count += 1
+        stats.total_seconds += elapsed
+        stats.max_seconds = max(stats.max_seconds, elapsed)
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.probe_interval
+            await asyncio.sleep(self.probe_interval)
+            self._lag_samples.append(max(0.0, loop.time() - expected))
+
+    def report(self) -> LoopReport:
+        """Copia delle misure raccolte finora."""
+        return LoopReport(lag_samples=list(self._lag_samples), stalls=dict(self._stalls))
+
+    def format_summary(self, top: int = 10) -> str:
+        """Riepilogo leggibile con i `top` blocchi più costosi."""
+        report = self.report()
+        lines = [
+            f"🐢 Event loop: max lag {report.max_lag * 1000:.0f} ms, "
+            f"p95 lag {report.p95_lag * 1000:.0f} ms, "
+            f"{sum(s.count for s in report.stalls.values())} callbacks over {self.threshold * 1000:.0f} ms"
+        ]
+        ranked = sorted(report.stalls.items(), key=lambda item: item[1].total_seconds, reverse=True)
+        for activity, stats in ranked[:top]:
+            lines.append(
+                f"   {activity:<40} {stats.count:>4}x  total {stats.total_seconds * 1000:>7.0f} ms  "
+                f"max {stats.max_seconds * 1000:>6.0f} ms"
+            )
+        return "\n".join(lines)
+
+
+def _timed_run(self: asyncio.Handle) -> None:
+    _STEP.activity = None
+    start = time.perf_counter()
+    try:
+        _ORIGINAL_RUN(self)
+    finally:
+        elapsed = time.perf_counter() - start
+        monitor = _ACTIVE
+        if monitor is not None and elapsed >= monitor.threshold:
+            monitor.record(self, elapsed, _STEP.activity)
@@ -0,0 +1,109 @@
+"""Indice BM25 di passaggi dentro un singolo documento lungo.
+
+Il testo viene diviso in finestre sovrapposte (chiuse su uno spazio) e ogni
+finestra è un documento BM25: per una domanda puntuale il modello legge i
+pochi passaggi migliori invece dell'intera pagina o trascrizione.
+Nessun servizio di embedding: solo tokenize/bm25_scores dell'indice locale.
+"""
+
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from react_agent.local_search import bm25_scores, tokenize
+
+# Dimensione delle finestre e sovrapposizione, in caratteri
+CHUNK_CHARS = 800
+OVERLAP_CHARS = 200
+
+
+class Passage(NamedTuple):
+    """Passaggio restituito: posizione nel documento, punteggio e testo."""
+
+    start: int
+    end: int
+    score: float
+    text: str
+
+
+def chunk_spans(text: str, chunk_chars: int = CHUNK_CHARS, overlap: int = OVERLAP_CHARS) -> List[Tuple[int, int]]:
+    """Intervalli [start, end) delle finestre, con i bordi spostati sugli spazi."""
+    spans: List[Tuple[int, int]] = []
+    length = len(text)
+    start = 0
+    while start < length:
+        end = min(length, start + chunk_chars)
+        if end < length:
+            # Non tagliare una parola: chiudi sull'ultimo spazio della finestra
+            cut = text.rfind(" ", start + chunk_chars // 2, end)
+            end = cut if cut > start else end
+        spans.append((start, end))
+        if end >= length:
+            break
+        next_start = max(end - overlap, start + 1)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+    return spans
+
+
+class PassageIndex:
+    """Postings BM25 delle finestre di un documento, costruiti una volta sola.
+
+    Con `keep_text=False` l'indice conserva solo intervalli e postings: il testo
+    dei passaggi viene letto alla ricerca tramite `read` (es. dal file su disco).
+    """
+
+    def __init__(
+        self,
+        text: str,
+        chunk_chars: int = CHUNK_CHARS,
+        overlap: int = OVERLAP_CHARS,
+        keep_text: bool = True,
+    ) -> None:
+        """Divide il testo in finestre e ne costruisce i postings."""
+        self.text: str | None = text if keep_text else None
+        self.spans = chunk_spans(text, chunk_chars, overlap)
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        for chunk_id, (start, end) in enumerate(self.spans):
+            counts = Counter(tokenize(text[start:end]))
+            self._lengths[chunk_id] = sum(counts.values())
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[chunk_id] = tf
+        total = sum(self._lengths.values())
+        self._avg_length = total / len(self.spans) if self.spans else 0.0
+
+    def __len__(self) -> int:
+        """Numero di finestre indicizzate."""
+        return len(self.spans)
+
+    def search(
+        self, query: str, top_k: int = 3, read: Callable[[int, int], str] | None = None
+    ) -> List[Passage]:
+        """I `top_k` passaggi migliori, in ordine di punteggio.
+
+        `read(start, end)` restituisce il testo di un intervallo; obbligatorio senza testo in memoria.
+        """
+        if read is None:
+            if self.text is None:
+                raise ValueError("PassageIndex built with keep_text=False needs a reader")
+            text = self.text
+            read = lambda start, end: text[start:end]  # noqa: E731
+        scores = bm25_scores(
+            tokenize(query), self._postings, self._lengths, len(self.spans), self._avg_length
+        )
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:max(1, top_k)]
+        return [
+            Passage(start, end, round(score, 4), read(start, end))
+            for chunk_id, score in ranked
+            for start, end in [self.spans[chunk_id]]
+        ]
+
+
+def byte_offsets(text: str, spans: List[Tuple[int, int]]) -> Dict[int, int]:
+    """Offset in byte (UTF-8) dei bordi delle finestre, per rileggerle da file con seek."""
+    offsets: Dict[int, int] = {}
+    position = size = 0
+    for boundary in sorted({bound for span in spans for bound in span}):
+        size += len(text[position:boundary].encode("utf-8"))
+        offsets[boundary], position = size, boundary
+    return offsets
@@ -78,6 +78,30 @@ When you receive transcriptions or extracted text:
 - For identification: Find and extract the specific detail requested
 - Show your reasoning briefly, then give the FINAL ANSWER
 
-Remember: GAIA tasks are conceptually simple for humans but require careful, systematic execution. Take your time, be methodical, and ALWAYS provide a specific FINAL ANSWER.
+Remember: GAIA tasks are conceptually simple for humans but require careful, systematic execution. Take your time, be methodical, and ALWAYS provide a specific FINAL ANSWER."""
 
-System time: {system_time}"""
+# Volatile per-step context. It is sent *after* the conversation so that the
+# system prompt, tool schemas and history form a stable, cacheable prefix.
+TASK_CONTEXT_PROMPT = """=== CURRENT TASK CONTEXT ===
+Current date: {system_time}
+Task ID: {task_id}
+Has File: {has_file}
+Tools Used: {tools_used}
+Current Step: {current_step}"""
+
+FORCE_FINAL_ANSWER_PROMPT = """You have run out of time or steps for this task.
+Do NOT call any more tools. Using only the information gathered so far, give your best answer now.
+End your response with: FINAL ANSWER: [YOUR FINAL ANSWER]"""
+
+# Appended to the system prompt only when wikipedia_lookup is offered (local dump indexed)
+WIKI_DUMP_PROMPT = """=== OFFLINE WIKIPEDIA ===
+For Wikipedia articles: try wikipedia_lookup first (offline, instant, can return a single section);
+fall back to search and extract_text_from_url if the article is not in the local dump."""
+
+# Appended to the system prompt only when the artifact store is enabled (tracked graph)
+ARTIFACT_PROMPT = """=== LONG OUTPUTS ===
+Long outputs arrive as a preview with an artifact handle: use search_artifact to get the
+passages relevant to the question, grep_artifact for exact strings, then read_artifact to
+read around them.
+For tables (lists, counts, rankings): use extract_text_from_url with tables=True, then
+load the CSV it points to with pandas in python_repl and aggregate there."""
@@ -0,0 +1,97 @@
+"""Client async condivisi per le chiamate dirette ai provider (Whisper, vision).
+
+Un solo `AsyncOpenAI`/`AsyncAnthropic` per event loop, quindi un solo pool di
+connessioni riusato da tutti i tool, e un semaforo per provider che limita le
+richieste concorrenti. Nessun thread occupato: le chiamate sono native async.
+Allo stesso modo `http_request` (resilience.py) riusa un solo `aiohttp.ClientSession`.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Tuple
+
+from react_agent.configuration import Configuration
+from react_agent.utils import PROVIDER_CLIENT_KWARGS
+
+# Client e semafori per event loop: gli oggetti async non si condividono tra loop
+_LOOP_STATE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _new_openai() -> Any:
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(**PROVIDER_CLIENT_KWARGS["openai"])
+
+
+def _new_anthropic() -> Any:
+    from anthropic import AsyncAnthropic
+
+    return AsyncAnthropic(**PROVIDER_CLIENT_KWARGS["anthropic"])
+
+
+def _new_http_session() -> Any:
+    import aiohttp
+
+    return aiohttp.ClientSession()
+
+
+CLIENT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "openai": _new_openai,
+    "anthropic": _new_anthropic,
+    # Pool di connessioni (DNS, TLS, keep-alive) condiviso dalle richieste HTTP dei tool
+    "http": _new_http_session,
+}
+
+
+def _state() -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    state = _LOOP_STATE.get(loop)
+    if state is None:
+        state = _LOOP_STATE[loop] = {"clients": {}, "semaphores": {}}
+    return state
+
+
+def get_client(provider: str) -> Any:
+    """Client async condiviso del provider (creato al primo utilizzo nel loop corrente)."""
+    clients = _state()["clients"]
+    client = clients.get(provider)
+    if client is None:
+        client = clients[provider] = CLIENT_FACTORIES[provider]()
+    return client
+
+
+def _semaphore(provider: str) -> Tuple[asyncio.Semaphore, int]:
+    """Semaforo del provider nel loop corrente.
+
+    Il limite è fissato alla creazione: sostituire il semaforo lascerebbe fuori
+    dal conteggio le richieste che tengono ancora quello vecchio, superando il tetto.
+    """
+    limit = Configuration.from_context().provider_concurrency.get(provider, 4)
+    semaphores = _state()["semaphores"]
+    entry = semaphores.get(provider)
+    if entry is None:
+        entry = semaphores[provider] = (asyncio.Semaphore(limit), limit)
+    elif entry[1] != limit:
+        print(f"⚠️ [PROVIDERS] {provider}: concurrency {limit} ignored, keeping {entry[1]} for this event loop")  # noqa: T201
+    return entry
+
+
+@asynccontextmanager
+async def provider_slot(provider: str) -> AsyncIterator[Any]:
+    """Attende uno slot libero per il provider e restituisce il client condiviso."""
+    semaphore, _ = _semaphore(provider)
+    async with semaphore:
+        yield get_client(provider)
+
+
+async def aclose_clients() -> None:
+    """Chiude i client del loop corrente (es. a fine benchmark)."""
+    loop = asyncio.get_running_loop()
+    state = _LOOP_STATE.pop(loop, None)
+    if state is None:
+        return
+    for client in state["clients"].values():
+        await client.close()
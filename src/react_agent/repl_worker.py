@@ -0,0 +1,76 @@
+"""Esecuzione del codice di `python_repl` in un processo separato.
+
+Legge il codice da stdin e scrive su stdout il risultato in JSON. Il processo
+può essere terminato alla deadline del tool: un ciclo infinito o un calcolo
+troppo lungo non bloccano l'event loop né un thread del runner.
+Solo libreria standard (pandas viene importato se il codice lo usa).
+"""
+
+import contextlib
+import json
+import sys
+
+
+def run_code(code: str) -> str:
+    """Esegue il codice e restituisce il valore più significativo come stringa."""
+    try:
+        # Crea un ambiente isolato per l'esecuzione
+        local_vars = {}
+        global_vars = {
+            '__builtins__': __builtins__,
+            'pd': None,  # pandas sarà importato se necessario
+        }
+
+        # Importa pandas se il codice lo richiede
+        if 'pd.' in code or 'pandas' in code:
+            import pandas as pd
+            global_vars['pd'] = pd
+
+        # Esegui il codice
+        exec(code, global_vars, local_vars)
+
+        # Cerca variabili di output comuni con priorità
+        output_vars = ['final_answer', 'result', 'answer', 'output', 'total']
+
+        for var_name in output_vars:
+            if var_name in local_vars:
+                return str(local_vars[var_name])
+
+        # Se non trova variabili specifiche, cerca l'ultima espressione valutata
+        # Riesegui l'ultima linea per catturare il valore di ritorno
+        lines = code.strip().split('\n')
+        if lines:
+            last_line = lines[-1].strip()
+            if last_line and not last_line.startswith('#'):
+                try:
+                    # Se l'ultima linea è una variabile o espressione, valutala
+                    last_result = eval(last_line, global_vars, local_vars)
+                    if last_result is not None:
+                        return str(last_result)
+                except Exception:
+                    pass
+
+        # Se tutto fallisce, mostra le variabili disponibili
+        available_vars = [
+            k for k in local_vars.keys() if not k.startswith('_')]
+        if available_vars:
+            return f"Codice eseguito. Variabili disponibili: {available_vars}. Valori: {[f'{k}={local_vars[k]}' for k in available_vars[:3]]}"
+        else:
+            return "Codice eseguito con successo"
+
+    # BaseException: anche sys.exit() nel codice utente diventa un errore leggibile
+    except BaseException as e:
+        return f"Errore nell'esecuzione: {str(e) or type(e).__name__}"
+
+
+def main() -> None:
+    """Esegue il codice letto da stdin e scrive il risultato su stdout."""
+    code = sys.stdin.read()
+    # I print del codice utente vanno su stderr: stdout è riservato al risultato
+    with contextlib.redirect_stdout(sys.stderr):
+        result = run_code(code)
+    sys.stdout.write(json.dumps({"result": result}))
+
+
+if __name__ == "__main__":
+    main()
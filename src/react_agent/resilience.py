@@ -0,0 +1,405 @@
+"""Resilienza condivisa per le chiamate HTTP e ai provider.
+
+- backoff esponenziale con jitter, che rispetta `Retry-After`
+- circuit breaker per endpoint: dopo troppi errori consecutivi l'endpoint viene
+  saltato per un po' invece di sprecare step e quota
+- retry budget per endpoint: i retry non superano una frazione delle richieste,
+  così un rate limit prolungato non moltiplica il traffico
+
+Solo gli errori transitori (429, 5xx, connessione, timeout) vengono ritentati.
+"""
+
+import asyncio
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, TypeVar
+from urllib.parse import urlparse
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from react_agent.deadlines import remaining
+
+T = TypeVar("T")
+
+# Endpoint condivisi
+GAIA_API = "gaia-api"
+GAIA_API_URL = "https://agents-course-unit4-scoring.hf.space"
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Errori di trasporto degli SDK dei provider (APITimeoutError deriva da APIConnectionError)
+_TRANSIENT_SDK_ERRORS = (
+    ("openai", "APIConnectionError"),
+    ("anthropic", "APIConnectionError"),
+    ("httpx", "TransportError"),
+)
+
+# Timeout di una richiesta HTTP senza deadline più stretta (totale e connessione)
+HTTP_TIMEOUT_SECONDS = 60.0
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+
+# Sostituibile nei test per non attendere davvero
+_sleep = asyncio.sleep
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Parametri dei retry: tentativi, backoff e attesa massima accettata."""
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    # Un Retry-After più lungo di così non viene atteso: si fallisce subito
+    max_retry_after: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: attesa casuale fino al limite esponenziale."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+class RetryableError(Exception):
+    """Errore transitorio (es. HTTP 429/503), con l'eventuale Retry-After in secondi."""
+
+    def __init__(self, message: str, status: int | None = None, retry_after: float | None = None):
+        """Errore con status HTTP e attesa suggerita dal server, se noti."""
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """L'endpoint è in pausa dopo troppi errori consecutivi."""
+
+
+class CircuitBreaker:
+    """Circuit breaker closed → open → half-open su errori transitori consecutivi."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Breaker che si apre dopo `failure_threshold` errori consecutivi."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Stato corrente: closed, open o half-open."""
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """In half-open lascia passare una sola richiesta di prova."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Chiude il breaker dopo una chiamata riuscita."""
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Richiesta annullata senza esito: un'altra può fare da prova."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Conta un errore e apre il breaker oltre la soglia."""
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+
+class RetryBudget:
+    """Ogni richiesta accredita `ratio` retry, ogni retry ne consuma uno (tetto `reserve`)."""
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0) -> None:
+        """Budget di retry pari a `ratio` delle richieste, fino a `reserve` token."""
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = reserve
+
+    def record_request(self) -> None:
+        """Accredita una frazione di token per ogni richiesta."""
+        self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Spende un token di retry; False se il budget è esaurito."""
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+@dataclass
+class Endpoint:
+    """Stato di resilienza condiviso da tutte le chiamate verso lo stesso endpoint."""
+
+    name: str
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    budget: RetryBudget = field(default_factory=RetryBudget)
+
+
+_ENDPOINTS: Dict[str, Endpoint] = {}
+
+
+def get_endpoint(name: str) -> Endpoint:
+    """Endpoint (breaker e budget) per nome, creato al primo utilizzo."""
+    endpoint = _ENDPOINTS.get(name)
+    if endpoint is None:
+        endpoint = _ENDPOINTS[name] = Endpoint(name)
+    return endpoint
+
+
+def reset_endpoints() -> None:
+    """Dimentica breaker e budget (usato nei test)."""
+    _ENDPOINTS.clear()
+
+
+def endpoint_for_url(url: str) -> str:
+    """Endpoint di una URL: l'API GAIA è condivisa, il resto è per host."""
+    if url.startswith(GAIA_API_URL):
+        return GAIA_API
+    return urlparse(url).netloc or url
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After in secondi, sia come numero sia come data HTTP."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+def _status_of(exc: BaseException) -> int | None:
+    for candidate in (exc, getattr(exc, "response", None)):
+        for attr in ("status", "status_code"):
+            value = getattr(candidate, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def _retry_after_of(exc: BaseException) -> float | None:
+    retry_after = getattr(exc, "retry_after", None)
+    if isinstance(retry_after, (int, float)):
+        return float(retry_after)
+    headers = getattr(getattr(exc, "response", None), "headers", None) or getattr(exc, "headers", None)
+    if headers is not None and hasattr(headers, "get"):
+        return parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+    return None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Errori che vale la pena ritentare: rate limit, 5xx, connessione e timeout."""
+    if isinstance(exc, RetryableError):
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    # aiohttp viene importato solo dai tool che lo usano: controlla solo se è già caricato
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None and isinstance(exc, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return True
+    # Errori di connessione/timeout degli SDK (senza status): i loro retry sono disattivati
+    for module, name in _TRANSIENT_SDK_ERRORS:
+        loaded = sys.modules.get(module)
+        error = getattr(loaded, name, None) if loaded is not None else None
+        if error is not None and isinstance(exc, error):
+            return True
+    status = _status_of(exc)
+    return status in RETRYABLE_STATUS
+
+
+async def with_retries(
+    endpoint_name: str,
+    call: Callable[[], Awaitable[T]],
+    policy: RetryPolicy = DEFAULT_POLICY,
+) -> T:
+    """Esegue `call` con backoff, circuit breaker e retry budget dell'endpoint.
+
+    Gli errori non transitori vengono rilanciati subito; se i tentativi, il budget o
+    l'attesa accettabile finiscono, viene rilanciato l'ultimo errore transitorio.
+    """
+    endpoint = get_endpoint(endpoint_name)
+    endpoint.budget.record_request()
+
+    attempt = 0
+    while True:
+        if not endpoint.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for '{endpoint_name}': too many recent failures")
+        try:
+            result = await call()
+        except Exception as exc:
+            if not is_transient(exc):
+                endpoint.breaker.record_success()
+                raise
+            endpoint.breaker.record_failure()
+            attempt += 1
+
+            retry_after = _retry_after_of(exc)
+            if retry_after is not None and retry_after > policy.max_retry_after:
+                raise
+            if attempt >= policy.max_attempts or endpoint.breaker.state != "closed":
+                raise
+            if not endpoint.budget.try_spend():
+                raise
+
+            delay = policy.backoff(attempt)
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, policy.base_delay)
+            # Un retry che non può finire entro la deadline del tool non si tenta
+            left = remaining()
+            if left is not None and delay >= left:
+                raise
+            print(f"🔁 [RETRY] {endpoint_name}: {type(exc).__name__} "  # noqa: T201
+                  f"(attempt {attempt}/{policy.max_attempts}), waiting {delay:.1f}s")
+            await _sleep(delay)
+            continue
+        except BaseException:
+            # Cancellazione (deadline, wait_for, quorum): nessun esito da registrare,
+            # ma la prova half-open non deve restare in corso per sempre
+            endpoint.breaker.release_probe()
+            raise
+
+        endpoint.breaker.record_success()
+        return result
+
+
+@dataclass
+class HTTPResponse:
+    """Risposta HTTP già letta: status, header e corpo."""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def text(self) -> str:
+        """Corpo decodificato con il charset dichiarato (utf-8 di default)."""
+        content_type = self.headers.get("content-type", self.headers.get("Content-Type", ""))
+        charset = "utf-8"
+        if "charset=" in content_type:
+            charset = content_type.split("charset=")[-1].split(";")[0].strip() or charset
+        return self.body.decode(charset, errors="replace")
+
+    def json(self) -> Any:
+        """Corpo interpretato come JSON."""
+        import json
+
+        return json.loads(self.body)
+
+
+async def http_request(
+    method: str,
+    url: str,
+    endpoint: str | None = None,
+    policy: RetryPolicy = DEFAULT_POLICY,
+    **kwargs: Any,
+) -> HTTPResponse:
+    """Richiesta aiohttp con retry sugli status transitori; gli altri status vengono restituiti.
+
+    Senza un `timeout` esplicito ogni tentativo dura al massimo HTTP_TIMEOUT_SECONDS
+    o il tempo rimasto alla deadline del tool, se minore. Tutti i tentativi usano
+    la sessione condivisa del loop (chiusa da `provider_clients.aclose_clients`).
+    """
+    import aiohttp
+
+    # Import locale: provider_clients importa utils, che importa questo modulo
+    from react_agent.provider_clients import get_client
+
+    async def _attempt() -> HTTPResponse:
+        # Ricalcolato a ogni tentativo: i retry consumano la stessa deadline
+        timeout = aiohttp.ClientTimeout(
+            total=remaining(HTTP_TIMEOUT_SECONDS),
+            sock_connect=HTTP_CONNECT_TIMEOUT_SECONDS,
+        )
+        session = get_client("http")
+        async with session.request(method, url, **{"timeout": timeout, **kwargs}) as response:
+            if response.status in RETRYABLE_STATUS:
+                raise RetryableError(
+                    f"HTTP {response.status} from {url}",
+                    status=response.status,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+            return HTTPResponse(
+                status=response.status,
+                headers={key.lower(): value for key, value in response.headers.items()},
+                body=await response.read(),
+            )
+
+    return await with_retries(endpoint or endpoint_for_url(url), _attempt, policy)
+
+
+class ResilientChatModel(BaseChatModel):
+    """Chat model che passa ogni chiamata async del modello reale da `with_retries`."""
+
+    inner: Any
+    endpoint: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "resilient"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ResilientChatModel":
+        """Lega i tool al modello interno mantenendo il wrapper."""
+        return self.model_copy(update={"inner": self.inner.bind_tools(tools, **kwargs)})
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: List[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Il grafo è async: il percorso sync delega senza retry
+        message = self.inner.invoke(messages, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: List[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = await with_retries(
+            self.endpoint,
+            lambda: self.inner.ainvoke(messages, stop=stop, **kwargs),
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
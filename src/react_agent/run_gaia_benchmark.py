@@ -1,6 +1,7 @@
 """Script principale per eseguire il benchmark GAIA"""
 
 from react_agent.gaia_runner import run_all_gaia_tasks
+from react_agent.provider_clients import aclose_clients
 import asyncio
 import os
 import sys
@@ -25,6 +26,10 @@ async def main():
         print(f"\n❌ Error: {e}")
         return 1
 
+    finally:
+        # Sessione HTTP condivisa del loop (vedi provider_clients.py)
+        await aclose_clients()
+
     return 0
 
 
@@ -1,47 +1,90 @@
 """Script per eseguire il benchmark GAIA con la V2"""
 
+import argparse
 import asyncio
-import aiohttp
-from react_agent.gaia_runner_v2 import CleanGAIARunner
 
-from dotenv import load_dotenv 
+from dotenv import load_dotenv
 
-# ✅ Carica .env all'inizio
-load_dotenv()
+from react_agent.executors import executor_stats, format_executor_stats
+from react_agent.gaia_runner_v2 import CleanGAIARunner
+from react_agent.loop_monitor import LoopMonitor
+from react_agent.provider_clients import aclose_clients
+from react_agent.resilience import GAIA_API_URL, http_request
 
 
 async def fetch_all_questions():
     """Fetch tutte le domande GAIA"""
-    url = "https://agents-course-unit4-scoring.hf.space/questions"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                raise Exception(f"Errore nel fetch: {response.status}")
-            return await response.json()
+    url = f"{GAIA_API_URL}/questions"
+    response = await http_request("GET", url)
+    if response.status != 200:
+        raise Exception(f"Errore nel fetch: {response.status}")
+    return response.json()
 
 async def submit_answers(answers, username="pandagan"):
     """Submit risposte all'API GAIA"""
-    url = "https://agents-course-unit4-scoring.hf.space/submit"
+    url = f"{GAIA_API_URL}/submit"
     payload = {
         "username": username,
         "agent_code": "react_agent_v2",
         "answers": answers
     }
     
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=payload) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                return {"error": f"Submit failed: {response.status}"}
-
-async def run_gaia_benchmark_v2(username="pandagan", max_questions=5):
-    """Esegui benchmark GAIA con sistema V2"""
-    
+    # Retry con backoff su 429/5xx: un errore transitorio non fa perdere il run
+    try:
+        response = await http_request("POST", url, json=payload)
+    except Exception as e:
+        return {"error": f"Submit failed: {e}"}
+    if response.status == 200:
+        return response.json()
+    return {"error": f"Submit failed: {response.status}"}
+
+async def run_gaia_benchmark_v2(
+    username="pandagan",
+    max_questions=5,
+    answer_cache_path=None,
+    local_search_index="",
+    monitor_event_loop=False,
+):
+    """Esegui benchmark GAIA con sistema V2 (cache risposte solo con `answer_cache_path`).
+
+    `local_search_index` è l'indice BM25 consultato da `search` prima di Tavily ("" = disattivato).
+    Entrambi sono opt-in: un run riusa risultati di run precedenti solo se richiesto.
+
+    Con `monitor_event_loop` il summary riporta i blocchi dell'event loop per tool/nodo.
+    """
+    # ✅ Carica .env all'avvio del benchmark, non all'import del modulo
+    load_dotenv()
+
     print("🚀 Starting GAIA Benchmark V2...")
-    
+
+    monitor = LoopMonitor() if monitor_event_loop else None
+    if monitor is not None:
+        monitor.start()
+    try:
+        return await _run_questions(username, max_questions, answer_cache_path, local_search_index)
+    finally:
+        # Anche se il run fallisce: il monitor patcha il loop per tutto il processo
+        if monitor is not None:
+            await monitor.stop()
+            print(monitor.format_summary())
+
+
+async def _run_questions(username, max_questions, answer_cache_path, local_search_index):
+    """Risolve le domande, invia le risposte e stampa il summary."""
     # 1. Setup
-    runner = CleanGAIARunner()
+    runner = CleanGAIARunner(
+        {"configurable": {"local_search_index": local_search_index}},
+        answer_cache_path=answer_cache_path,
+    )
+    try:
+        return await _solve_and_submit(runner, username, max_questions)
+    finally:
+        # Anche se una domanda o il fetch falliscono: file della cache e sessioni HTTP
+        await runner.aclose()
+        await aclose_clients()
+
+
+async def _solve_and_submit(runner, username, max_questions):
     questions = await fetch_all_questions()
     
     if max_questions:
@@ -52,6 +95,8 @@ async def run_gaia_benchmark_v2(username="pandagan", max_questions=5):
     # 2. Process each question
     answers = []
     total_processing_time = 0
+    total_prompt_tokens = 0
+    total_cached_tokens = 0
     
     for i, question in enumerate(questions, 1):
         print(f"\n🔍 Question {i}/{len(questions)}: {question['task_id']}")
@@ -61,28 +106,28 @@ async def run_gaia_benchmark_v2(username="pandagan", max_questions=5):
         result = await runner.solve_question(
             question=question['question'],
             task_id=question['task_id'],
-            file_name=question.get('file_name', '')
+            file_name=question.get('file_name', ''),
+            level=int(question.get('Level') or 1)
         )
         
         # 4. Extract data from structured output
         print(f"✅ Answer: {result.final_answer}")
         print(f"⏱️  Time: {result.processing_time:.2f}s")
         print(f"🎯 Confidence: {result.confidence:.2f}")
+        print(f"🧊 Cached prompt tokens: {result.cached_token_ratio:.0%} of {result.prompt_tokens}")
         print(f"🔧 Tools: {', '.join(result.tools_used)}")
         
         total_processing_time += result.processing_time
+        total_prompt_tokens += result.prompt_tokens
+        total_cached_tokens += round(result.cached_token_ratio * result.prompt_tokens)
         
         # 5. Add to submission
         answers.append({
             "task_id": question["task_id"],
             "submitted_answer": result.submitted_answer
         })
-        
-        # Rate limiting
-        if i < len(questions):
-            print("⏱️ Waiting 5 seconds...")
-            await asyncio.sleep(5)
-    
+
+
     # 6. Submit results
     print(f"\n📤 Submitting {len(answers)} answers...")
     submission_result = await submit_answers(answers, username)
@@ -93,12 +138,37 @@ async def run_gaia_benchmark_v2(username="pandagan", max_questions=5):
     print(f"\n🎉 GAIA Benchmark V2 Complete!")
     print(f"📊 Results: {submission_result}")
     print(f"⏱️ Average processing time: {avg_time:.2f}s")
+    if total_prompt_tokens:
+        print(f"🧊 Cached-token ratio: {total_cached_tokens / total_prompt_tokens:.0%} "
+              f"({total_cached_tokens}/{total_prompt_tokens} prompt tokens)")
+    # Code dei pool per classe di carico (io/cpu/download)
+    if executor_stats():
+        print(format_executor_stats())
     
     return submission_result
 
-if __name__ == "__main__":
+def main():
+    """Esegue il benchmark con le opzioni da riga di comando."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--username", default="pandagan")
+    parser.add_argument("--max-questions", type=int, default=20, help="0 = tutte le domande")
+    parser.add_argument("--answer-cache", metavar="PATH", default=None,
+                        help="riusa le risposte salvate (es. .cache/react_agent/answers.sqlite)")
+    parser.add_argument("--local-search-index", metavar="PATH", default="",
+                        help="indice BM25 locale prima di Tavily (es. .cache/react_agent/search_index.sqlite)")
+    parser.add_argument("--monitor-loop", action="store_true",
+                        help="riporta i blocchi dell'event loop per tool/nodo")
+    args = parser.parse_args()
+
     result = asyncio.run(run_gaia_benchmark_v2(
-        username="pandagan",
-        max_questions=20  # Per testing
+        username=args.username,
+        max_questions=args.max_questions,
+        answer_cache_path=args.answer_cache,
+        local_search_index=args.local_search_index,
+        monitor_event_loop=args.monitor_loop,
     ))
-    print(f"Final result: {result}")
\ No newline at end of file
+    print(f"Final result: {result}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
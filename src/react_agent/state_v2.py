@@ -1,6 +1,7 @@
 """Nuovo sistema di stato con Input → Internal → Output"""
 
 from __future__ import annotations
+import operator
 from dataclasses import dataclass, field
 from typing import Sequence, List, Dict, Any, Optional
 from datetime import datetime
@@ -11,7 +12,17 @@ from langgraph.managed import IsLastStep
 from typing_extensions import Annotated
 
 
-@dataclass
+def merge_unique(left: Sequence[str], right: Sequence[str]) -> List[str]:
+    """Reducer: aggiunge i nuovi elementi mantenendo l'ordine, senza duplicati."""
+    merged = list(left)
+    for item in right:
+        if item not in merged:
+            merged.append(item)
+    return merged
+
+
+# ✅ slots=True: niente __dict__ per istanza, meno memoria con molte task concorrenti
+@dataclass(slots=True)
 class GAIAInputState:
     """🎯 INPUT: Interface pubblica - solo quello che l'utente fornisce"""
     messages: Annotated[Sequence[AnyMessage], add_messages] = field(
@@ -19,7 +30,7 @@ class GAIAInputState:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class GAIAInternalState(GAIAInputState):
     """🔧 INTERNAL: Stato completo con tutti i metadati di esecuzione"""
     
@@ -31,19 +42,35 @@ class GAIAInternalState(GAIAInputState):
     has_file: bool = False
     file_name: str = ""
     difficulty_level: int = 1
+    # Scope di cache e artifact di una run senza task_id né thread (impostato da prefetch)
+    run_scope: str = ""
     
     # Execution tracking
-    tools_used: List[str] = field(default_factory=list)
-    reasoning_steps: List[str] = field(default_factory=list)
+    # ✅ Reducer append-only: i nodi restituiscono solo i delta
+    tools_used: Annotated[List[str], merge_unique] = field(default_factory=list)
+    reasoning_steps: Annotated[List[str], operator.add] = field(default_factory=list)
     start_time: Optional[datetime] = None
     
+    # Budget della task (derivati dal Level se non impostati)
+    deadline: datetime | None = None
+    step_budget: int = 0
+    model_steps: Annotated[int, operator.add] = 0
+    budget_exhausted: bool = False
+
+    # Prompt caching: token di input totali e serviti dalla cache del provider
+    prompt_tokens: Annotated[int, operator.add] = 0
+    cached_prompt_tokens: Annotated[int, operator.add] = 0
+
     # Results & analysis
     confidence: float = 0.0
-    error_count: int = 0
+    error_count: Annotated[int, operator.add] = 0
     current_step: str = ""
 
+    # Output finale scritto da prepare_output
+    clean_output: GAIAOutputState | None = None
+
 
-@dataclass
+@dataclass(slots=True)
 class GAIAOutputState:
     """📤 OUTPUT: Risultato pulito per il consumer"""
     
@@ -62,7 +89,14 @@ class GAIAOutputState:
     confidence: float = 0.0
     tools_used: List[str] = field(default_factory=list)
     processing_time: float = 0.0
+
+    # Segnali di affidabilità usati dal cascade
+    budget_exhausted: bool = False  # risposta forzata dalla fine di passi/tempo
+    quorum_reached: bool = True  # False se le run di self-consistency non concordano
     
     # Debug info (optional)
+    model_used: str = ""
+    prompt_tokens: int = 0
+    cached_token_ratio: float = 0.0
     steps_taken: int = 0
     errors_encountered: int = 0
\ No newline at end of file
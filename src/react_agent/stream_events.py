@@ -0,0 +1,44 @@
+"""Eventi tipizzati emessi da CleanGAIARunner.stream_question."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Union
+
+from react_agent.state_v2 import GAIAOutputState
+
+
+@dataclass
+class ModelStepStarted:
+    """Il modello sta per essere chiamato (step 1-based)."""
+    step: int
+
+
+@dataclass
+class TokenDelta:
+    """Token parziali generati dal modello."""
+    text: str
+
+
+@dataclass
+class ToolCallIssued:
+    """Il modello ha richiesto una tool call."""
+    tool_name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    tool_call_id: str = ""
+
+
+@dataclass
+class ToolResult:
+    """Risultato di una tool call (cached=True se servito dalla cache della task)."""
+    tool_name: str
+    tool_call_id: str
+    content: str
+    cached: bool = False
+
+
+@dataclass
+class FinalOutput:
+    """Ultimo evento dello stream: l'output pulito della task."""
+    output: GAIAOutputState
+
+
+GAIAEvent = Union[ModelStepStarted, TokenDelta, ToolCallIssued, ToolResult, FinalOutput]
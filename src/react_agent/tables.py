@@ -0,0 +1,192 @@
+"""Estrazione delle tabelle HTML in DataFrame pandas.
+
+`extract_text_from_url(url, tables=True)` salva ogni tabella della pagina come
+artifact CSV e restituisce al modello solo lo schema (forma, colonne con tipo,
+prime righe): i conteggi e le aggregazioni si fanno poi con pandas in
+`python_repl`, senza ricopiare la tabella nel prompt.
+
+Parsing con BeautifulSoup (già usato da `html_to_text`), così non servono
+lxml/html5lib come per `pandas.read_html`; rowspan/colspan vengono espansi.
+"""
+
+import re
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Tabelle estratte al massimo da una pagina e righe mostrate nell'anteprima
+MAX_TABLES = 20
+PREVIEW_ROWS = 3
+# Valore di una cella nell'anteprima (le celle lunghe vengono troncate)
+PREVIEW_CELL_CHARS = 40
+# Oltre questo span una cella è quasi sicuramente un errore del markup
+MAX_SPAN = 100
+
+# Note a piè di pagina tipo "[1]", "[a]", "[citation needed]"
+_FOOTNOTE_RE = re.compile(r"\[(?:\d+|[a-z]|citation needed|note \d+)\]", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"^[-+−]?\d+(?:\.\d+)?$")
+
+
+def _cell_text(cell) -> str:
+    for sup in cell.find_all("sup", class_="reference"):
+        sup.decompose()
+    text = _FOOTNOTE_RE.sub("", cell.get_text(" ", strip=True))
+    return " ".join(text.split())
+
+
+def _span(cell, name: str) -> int:
+    try:
+        return max(1, min(int(cell.get(name, 1)), MAX_SPAN))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _expand_rows(table) -> Tuple[List[List[str]], List[bool]]:
+    """Righe della tabella come griglia (rowspan/colspan espansi) e flag "riga di intestazione"."""
+    # Solo le righe di questa tabella, non quelle delle tabelle annidate
+    rows = [tr for tr in table.find_all("tr") if tr.find_parent("table") is table]
+    grid: List[List[str]] = []
+    is_header: List[bool] = []
+    # Celle con rowspan ancora da riportare nelle righe successive: colonna → (testo, righe rimaste)
+    pending: Dict[int, Tuple[str, int]] = {}
+
+    for tr in rows:
+        cells = tr.find_all(["th", "td"], recursive=False)
+        if not cells and not pending:
+            continue
+        row: List[str] = []
+        column = 0
+
+        def fill_pending() -> None:
+            nonlocal column
+            while column in pending:
+                text, left = pending[column]
+                row.append(text)
+                if left > 1:
+                    pending[column] = (text, left - 1)
+                else:
+                    del pending[column]
+                column += 1
+
+        for cell in cells:
+            fill_pending()
+            text = _cell_text(cell)
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                row.append(text)
+                if rowspan > 1:
+                    pending[column] = (text, rowspan - 1)
+                column += 1
+        fill_pending()
+        # Rowspan oltre l'ultima cella della riga
+        for extra in sorted(c for c in pending if c >= column):
+            row.extend([""] * (extra - len(row)))
+            text, left = pending[extra]
+            row.append(text)
+            if left > 1:
+                pending[extra] = (text, left - 1)
+            else:
+                del pending[extra]
+
+        grid.append(row)
+        is_header.append(
+            (bool(cells) and all(cell.name == "th" for cell in cells))
+            or tr.find_parent("thead") is not None
+        )
+    return grid, is_header
+
+
+def _header(rows: List[List[str]], width: int) -> List[str]:
+    """Nomi di colonna (più righe di intestazione unite con " / "), unici e non vuoti."""
+    names = []
+    for index in range(width):
+        parts: List[str] = []
+        for row in rows:
+            value = row[index] if index < len(row) else ""
+            if value and value not in parts:
+                parts.append(value)
+        names.append(" / ".join(parts) or f"column_{index}")
+
+    seen: Dict[str, int] = {}
+    unique = []
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        unique.append(name if count == 0 else f"{name}_{count}")
+    return unique
+
+
+def _coerce_numeric(frame: "pd.DataFrame") -> "pd.DataFrame":
+    """Converti in numeri le colonne i cui valori non vuoti sono tutti numeri (es. "1,234")."""
+    import pandas as pd
+    for column in frame.columns:
+        values = frame[column]
+        cleaned = values.str.replace(",", "", regex=False).str.replace("−", "-", regex=False).str.strip()
+        present = cleaned[cleaned != ""]
+        if present.empty or not present.map(lambda value: bool(_NUMBER_RE.match(value))).all():
+            continue
+        frame[column] = pd.to_numeric(cleaned.replace("", None))
+    return frame
+
+
+def parse_table(table) -> Optional["pd.DataFrame"]:
+    """DataFrame di un elemento <table>, None per le tabelle di layout (una riga o una colonna)."""
+    grid, is_header = _expand_rows(table)
+    width = max((len(row) for row in grid), default=0)
+    if len(grid) < 2 or width < 2:
+        return None
+    grid = [row + [""] * (width - len(row)) for row in grid]
+
+    header_count = 0
+    while header_count < len(grid) - 1 and is_header[header_count]:
+        header_count += 1
+    # Nessuna intestazione marcata: la prima riga fa da intestazione
+    header_count = header_count or 1
+    columns = _header(grid[:header_count], width)
+
+    body = [row for row in grid[header_count:] if any(row)]
+    if not body:
+        return None
+    import pandas as pd
+
+    return _coerce_numeric(pd.DataFrame(body, columns=columns))
+
+
+def extract_tables(html: str, max_tables: int = MAX_TABLES) -> List[Tuple[str, "pd.DataFrame"]]:
+    """Tabelle di dati della pagina come (titolo, DataFrame); il titolo è la <caption> se presente."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    tables: List[Tuple[str, pd.DataFrame]] = []
+    for table in soup.find_all("table"):
+        frame = parse_table(table)
+        if frame is None:
+            continue
+        caption = table.find("caption")
+        title = " ".join(caption.get_text(" ", strip=True).split()) if caption else ""
+        tables.append((title, frame))
+        if len(tables) >= max_tables:
+            break
+    return tables
+
+
+def describe_table(frame: "pd.DataFrame", rows: int = PREVIEW_ROWS) -> str:
+    """Descrivi la tabella in modo compatto: forma, colonne con tipo e prime righe."""
+    columns = ", ".join(f"{name} ({dtype})" for name, dtype in frame.dtypes.items())
+    lines = [f"{len(frame)} rows x {len(frame.columns)} columns: {columns}"]
+    for record in frame.head(rows).itertuples(index=False):
+        values = [str(value) for value in record]
+        lines.append(" | ".join(
+            value if len(value) <= PREVIEW_CELL_CHARS else value[:PREVIEW_CELL_CHARS - 1] + "…"
+            for value in values
+        ))
+    return "\n".join(lines)
+
+
+def tables_to_artifacts(html: str, max_tables: int = MAX_TABLES) -> List[Tuple[str, str, str]]:
+    """Per ogni tabella: (titolo, CSV, schema). Eseguito nel pool CPU (vedi executors.py)."""
+    return [
+        (title, frame.to_csv(index=False), describe_table(frame))
+        for title, frame in extract_tables(html, max_tables)
+    ]
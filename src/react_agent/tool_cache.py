@@ -0,0 +1,152 @@
+"""Cache per-task delle chiamate ai tool idempotenti."""
+
+import asyncio
+import json
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from langchain_core.messages import ToolMessage
+
+# Prefisso aggiunto ai risultati serviti dalla cache
+CACHED_MARKER = "[cached result]"
+
+# Numero massimo di task con una cache attiva in memoria
+MAX_CACHED_TASKS = 32
+
+CacheKey = Tuple[str, str]
+
+
+def canonical_args(args: Dict[str, Any]) -> str:
+    """Serializza gli argomenti in forma canonica (chiavi ordinate, stringhe senza spazi ai bordi)."""
+    normalized = {
+        key: value.strip() if isinstance(value, str) else value
+        for key, value in args.items()
+        if value is not None
+    }
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def is_error_output(content: Any) -> bool:
+    """Riconosce i messaggi di errore (o i risultati vuoti) restituiti come stringa dai tool."""
+    if not isinstance(content, str):
+        return False
+    stripped = content.strip()
+    return stripped in ("", "null", "None") or stripped.lower().startswith(("errore", "error"))
+
+
+class ToolCallCache:
+    """Memoizza i risultati (anche in corso) delle chiamate di una singola task."""
+
+    def __init__(self) -> None:
+        """Cache vuota."""
+        self._entries: Dict[CacheKey, asyncio.Future] = {}
+
+    @staticmethod
+    def key(tool_name: str, args: Dict[str, Any]) -> CacheKey:
+        """Chiave di una chiamata: nome del tool e argomenti canonici."""
+        return (tool_name, canonical_args(args))
+
+    def get(self, tool_name: str, args: Dict[str, Any]) -> asyncio.Future | None:
+        """Restituisce la future di una chiamata identica, se ancora valida."""
+        entry = self._entries.get(self.key(tool_name, args))
+        if entry is not None and entry.cancelled():
+            self.discard(tool_name, args)
+            return None
+        return entry
+
+    def put(self, tool_name: str, args: Dict[str, Any], entry: asyncio.Future) -> None:
+        """Registra la future di una chiamata."""
+        self._entries[self.key(tool_name, args)] = entry
+
+    def discard(self, tool_name: str, args: Dict[str, Any]) -> None:
+        """Dimentica una chiamata (es. fallita o cancellata)."""
+        self._entries.pop(self.key(tool_name, args), None)
+
+    def is_idle(self) -> bool:
+        """Verifica che nessuna chiamata sia ancora in corso."""
+        return all(entry.done() for entry in self._entries.values())
+
+    def clear(self) -> None:
+        """Svuota la cache cancellando le chiamate ancora in corso."""
+        for entry in self._entries.values():
+            if not entry.done():
+                entry.cancel()
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Numero di chiamate memorizzate."""
+        return len(self._entries)
+
+
+_TASK_CACHES: "OrderedDict[str, ToolCallCache]" = OrderedDict()
+
+# Cache della task in esecuzione, visibile ai tool che ne chiamano altri
+current_task_cache: ContextVar[ToolCallCache | None] = ContextVar(
+    "current_task_cache", default=None
+)
+
+
+def get_task_cache(task_key: str) -> ToolCallCache:
+    """Cache della task indicata (LRU sulle task più recenti).
+
+    Oltre MAX_CACHED_TASKS vengono scartate solo le cache senza chiamate in corso:
+    quelle di task ancora attive restano finché il runner non chiama `clear_task_cache`.
+    """
+    cache = _TASK_CACHES.get(task_key)
+    if cache is None:
+        cache = ToolCallCache()
+        _TASK_CACHES[task_key] = cache
+        _evict_idle_caches(keep=task_key)
+    else:
+        _TASK_CACHES.move_to_end(task_key)
+    return cache
+
+
+def _evict_idle_caches(keep: str) -> None:
+    """Riporta il numero di cache sotto il limite partendo dalle meno recenti inattive."""
+    excess = len(_TASK_CACHES) - MAX_CACHED_TASKS
+    if excess <= 0:
+        return
+    idle = [
+        key for key, cache in _TASK_CACHES.items() if key != keep and cache.is_idle()
+    ][:excess]
+    for key in idle:
+        _TASK_CACHES.pop(key).clear()
+
+
+def clear_task_cache(task_key: str) -> None:
+    """Rimuove la cache di una task conclusa."""
+    cache = _TASK_CACHES.pop(task_key, None)
+    if cache is not None:
+        cache.clear()
+
+
+async def cached_tool_result(
+    tool_name: str,
+    args: Dict[str, Any],
+    func: Callable[..., Awaitable[Any]],
+) -> Any:
+    """Chiamata annidata tra tool: riusa (o popola) la cache della task corrente."""
+    cache = current_task_cache.get()
+    if cache is None:
+        return await func(**args)
+
+    entry = cache.get(tool_name, args)
+    if entry is not None:
+        previous = await asyncio.shield(entry)
+        if not is_error_output(previous.content):
+            return previous.content
+        cache.discard(tool_name, args)
+
+    async def _run() -> ToolMessage:
+        result = await func(**args)
+        content = result if isinstance(result, str) else str(result)
+        return ToolMessage(content=content, name=tool_name, tool_call_id=f"nested_{tool_name}")
+
+    entry = asyncio.ensure_future(_run())
+    cache.put(tool_name, args, entry)
+    message = await asyncio.shield(entry)
+    if is_error_output(message.content):
+        cache.discard(tool_name, args)
+    return message.content
@@ -6,33 +6,59 @@ These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
 
-from typing import Any, Callable, List, Optional, cast
-
-from langchain_tavily import TavilySearch  # type: ignore[import-not-found]
-
-from react_agent.configuration import Configuration
-
-import aiohttp
 import asyncio
-import tempfile
+import base64
+import json
+import mimetypes
 import os
-from pathlib import Path
-import sys
 import subprocess
-import pandas as pd
-import mimetypes
-import base64
-from PIL import Image
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, FrozenSet, List, Optional
+
+from react_agent.artifacts import ArtifactStore, current_artifact_store
+from react_agent.cassettes import recordable_tool
+from react_agent.configuration import Configuration
+from react_agent.deadlines import remaining, run_subprocess, with_deadline
+from react_agent.executors import CPU, DOWNLOAD, IO, run_in
+from react_agent.local_search import LocalSearchIndex, get_local_search_index
+from react_agent.loop_monitor import attributed
+from react_agent.provider_clients import provider_slot
+from react_agent.resilience import GAIA_API_URL, http_request, with_retries
+from react_agent.tables import tables_to_artifacts
+from react_agent.tool_cache import cached_tool_result
+from react_agent.wiki_dump import get_wiki_dump, wiki_dump_ready
+
+# Timeout delle chiamate dirette ai provider fuori da una deadline
+API_TIMEOUT_SECONDS = 120.0
+
+# Script eseguito in un subprocess da python_repl
+REPL_WORKER = str(Path(__file__).with_name("repl_worker.py"))
+
+# Le librerie pesanti (pandas, aiohttp, bs4, langchain_tavily) sono importate
+# dentro i tool al primo utilizzo: `import react_agent` resta veloce
 
 
 async def search(query: str, fallback_queries: bool = True) -> Optional[dict[str, Any]]:
     """Search con fallback automatico per query che non trovano risultati"""
 
+    from langchain_tavily import TavilySearch  # type: ignore[import-not-found]
+
     configuration = Configuration.from_context()
+
+    # Prima l'indice locale: le fonti già viste rispondono senza chiamare Tavily
+    index = _local_index(configuration)
+    if index is not None:
+        local = await run_in(IO, index.search, query, configuration.max_search_results)
+        if local is not None:
+            print(f"🔎 [LOCAL_SEARCH] Hit for '{query}' ({len(local['results'])} results)")
+            return local
+
     wrapped = TavilySearch(max_results=configuration.max_search_results)
 
     # Prova la query originale
-    result = await wrapped.ainvoke({"query": query})
+    result = await with_retries("tavily", lambda: wrapped.ainvoke({"query": query}))
 
     # Se non trova risultati E fallback_queries è True, prova alternative
     if fallback_queries and (not result or not result.get('results')):
@@ -49,71 +75,153 @@ async def search(query: str, fallback_queries: bool = True) -> Optional[dict[str
 
         for alt_query in alternative_queries:
             if alt_query != query:  # Evita di ripetere la stessa query
-                result = await wrapped.ainvoke({"query": alt_query})
+                result = await with_retries(
+                    "tavily", lambda: wrapped.ainvoke({"query": alt_query}))
                 if result and result.get('results'):
                     break
 
+    if index is not None and result:
+        await run_in(IO, index.add_search_results, result)
     return result
 
 
-async def extract_text_from_url(url: str) -> str:
-    """Estrae tutto il testo da una URL - tool generico e semplice"""
+def _local_index(configuration: Configuration) -> LocalSearchIndex | None:
+    """Restituisci l'indice BM25 locale configurato, se abilitato."""
+    if not configuration.local_search_index:
+        return None
+    return get_local_search_index(
+        configuration.local_search_index, configuration.local_search_min_coverage)
+
+
+async def extract_text_from_url(url: str, tables: bool = False) -> str:
+    """Estrae tutto il testo da una URL - tool generico e semplice.
+
+    Args:
+        url: pagina da leggere
+        tables: se True restituisce solo le tabelle della pagina, salvate come CSV
+            e descritte da uno schema compatto da elaborare con pandas in python_repl
+            (solo con l'artifact store attivo, altrimenti il testo della pagina)
+    """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return f"Errore nell'accesso alla pagina: {response.status}"
+        # Retry/backoff e circuit breaker per host (vedi resilience.py)
+        response = await http_request("GET", url)
+        if response.status != 200:
+            return f"Errore nell'accesso alla pagina: {response.status}"
+
+        content = response.text()
+        text = html_to_text(content)
+
+        # La pagina entra nell'indice locale consultato da `search`
+        index = _local_index(Configuration.from_context())
+        if index is not None:
+            await run_in(IO, index.add_document, url, url, text)
+
+        store = current_artifact_store.get()
+        if tables and store is not None:
+            summary = await _tables_summary(store, content)
+            if summary:
+                return summary
+        return text
 
-                content = await response.text()
+    except Exception as e:
+        return f"Errore nell'estrazione del testo: {str(e)}"
 
-                # Parse HTML semplice
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(content, 'html.parser')
 
-                # Rimuovi script e style
-                for script in soup(["script", "style"]):
-                    script.decompose()
+async def _tables_summary(store: ArtifactStore, content: str) -> str:
+    """Salva le tabelle della pagina come artifact CSV e ne restituisce gli schemi."""
+    # Parsing HTML e conversione in CSV nel pool di processi
+    tables = await run_in(CPU, tables_to_artifacts, content)
+    sections = []
+    for number, (title, csv, schema) in enumerate(tables, start=1):
+        handle = await run_in(IO, store.put, "table", csv)
+        path = await run_in(IO, store.path, handle)
+        heading = f"Table {number}" + (f" '{title}'" if title else "")
+        sections.append(f"{heading} [artifact {handle}], load with pd.read_csv({str(path)!r})\n{schema}")
+    return "\n\n".join(sections)
 
-                # Estrai tutto il testo
-                text = soup.get_text()
 
-                # Pulisci il testo
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip()
-                          for line in lines for phrase in line.split("  "))
-                text = '\n'.join(chunk for chunk in chunks if chunk)
+def html_to_text(content: str) -> str:
+    """Converti una pagina HTML in testo pulito (senza script/style, max 50k caratteri)."""
+    # Parse HTML semplice
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
 
-                # Limita a 50k caratteri per evitare overflow
-                return text[:50000]
+    # Rimuovi script e style
+    for script in soup(["script", "style"]):
+        script.decompose()
 
-    except Exception as e:
-        return f"Errore nell'estrazione del testo: {str(e)}"
+    # Estrai tutto il testo
+    text = soup.get_text()
+
+    # Pulisci il testo
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip()
+              for line in lines for phrase in line.split("  "))
+    text = '\n'.join(chunk for chunk in chunks if chunk)
+
+    # Limita a 50k caratteri per evitare overflow
+    return text[:50000]
+
+
+async def wikipedia_lookup(title: str, section: str = "") -> str:
+    """Testo di un articolo di Wikipedia dal dump locale: offline, in pochi millisecondi.
+
+    Args:
+        title: titolo dell'articolo o URL di Wikipedia (i redirect vengono seguiti)
+        section: titolo di una sezione (es. 'Discography'); vuoto = articolo intero
+    """
+    configuration = Configuration.from_context()
+    if not configuration.wiki_dump_path:
+        return "Error: no local Wikipedia dump configured, use search and extract_text_from_url"
+    try:
+        # Apertura (mmap + indice) e lettura della pagina nel pool io
+        dump = await run_in(IO, get_wiki_dump, configuration.wiki_dump_path)
+        article = await run_in(IO, dump.article, title)
+    except FileNotFoundError as e:
+        return f"Error: local Wikipedia dump not available ({e})"
+
+    if article is None:
+        suggestions = await run_in(IO, dump.suggestions, title)
+        hint = f" Similar titles: {', '.join(suggestions)}" if suggestions else ""
+        return f"No article titled '{title}' in the local Wikipedia dump.{hint}"
+
+    heading = article.title
+    if article.redirected_from:
+        heading += f" (redirected from {article.redirected_from})"
+    sections = article.sections()
+    outline = ", ".join(s.title for s in sections if s.level == 2)
+
+    # Senza sezione richiesta vale quella del redirect ("Titolo#Sezione"), se esiste
+    found = article.section(section or article.fragment) if section or article.fragment else None
+    if found is not None:
+        return f"{heading} § {found.title}\n\n{found.text}"
+    if section:
+        return f"{heading}\nNo section '{section}'. Sections: {outline}"
+    return f"{heading}\nSections: {outline}\n\n{article.text[:50000]}"
 
 
 async def download_gaia_file(task_id: str) -> Optional[str]:
     """Download file associato a una domanda GAIA."""
     try:
-        url = f"https://agents-course-unit4-scoring.hf.space/files/{task_id}"
+        url = f"{GAIA_API_URL}/files/{task_id}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    # Usa asyncio.to_thread per operazioni I/O sincrone
-                    temp_dir = await asyncio.to_thread(tempfile.mkdtemp)  # ✅
+        response = await http_request("GET", url)
+        if response.status == 200:
+            # I/O sincrono nel pool io (vedi executors.py)
+            temp_dir = await run_in(IO, tempfile.mkdtemp)  # ✅
 
-                    content_disposition = response.headers.get(
-                        'content-disposition', '')
-                    filename = content_disposition.split(
-                        'filename=')[-1].strip('"') if 'filename=' in content_disposition else f"{task_id}_file"
+            content_disposition = response.headers.get(
+                'content-disposition', '')
+            filename = content_disposition.split(
+                'filename=')[-1].strip('"') if 'filename=' in content_disposition else f"{task_id}_file"
 
-                    file_path = os.path.join(temp_dir, filename)
-                    content = await response.read()
+            file_path = os.path.join(temp_dir, filename)
 
-                    # Wrap file operations in asyncio.to_thread
-                    # ✅
-                    await asyncio.to_thread(_write_file, file_path, content)
+            # Scrittura del download nel pool download
+            # ✅
+            await run_in(DOWNLOAD, _write_file, file_path, response.body)
 
-                    return file_path
+            return file_path
         return None
     except Exception as e:
         return f"Errore nel download: {str(e)}"
@@ -131,83 +239,51 @@ def _write_file(file_path: str, content: bytes) -> None:
 
 async def python_repl(code: str) -> str:
     """Esegue codice Python e restituisce il risultato."""
+    # Processo separato: alla deadline del tool viene terminato (vedi deadlines.py).
+    # -P: la directory del worker non entra in sys.path, così `import tables`,
+    # `import utils` ecc. nel codice utente non caricano i moduli dell'agente
+    returncode, stdout, stderr = await run_subprocess(
+        [sys.executable, "-P", REPL_WORKER], input_data=code.encode("utf-8")
+    )
     try:
-        # Crea un ambiente isolato per l'esecuzione
-        local_vars = {}
-        global_vars = {
-            '__builtins__': __builtins__,
-            'pd': None,  # pandas sarà importato se necessario
-        }
-
-        # Importa pandas se il codice lo richiede
-        if 'pd.' in code or 'pandas' in code:
-            import pandas as pd
-            global_vars['pd'] = pd
-
-        # Esegui il codice
-        exec(code, global_vars, local_vars)
-
-        # Cerca variabili di output comuni con priorità
-        output_vars = ['final_answer', 'result', 'answer', 'output', 'total']
-
-        for var_name in output_vars:
-            if var_name in local_vars:
-                return str(local_vars[var_name])
-
-        # Se non trova variabili specifiche, cerca l'ultima espressione valutata
-        # Riesegui l'ultima linea per catturare il valore di ritorno
-        lines = code.strip().split('\n')
-        if lines:
-            last_line = lines[-1].strip()
-            if last_line and not last_line.startswith('#'):
-                try:
-                    # Se l'ultima linea è una variabile o espressione, valutala
-                    last_result = eval(last_line, global_vars, local_vars)
-                    if last_result is not None:
-                        return str(last_result)
-                except:
-                    pass
-
-        # Se tutto fallisce, mostra le variabili disponibili
-        available_vars = [
-            k for k in local_vars.keys() if not k.startswith('_')]
-        if available_vars:
-            return f"Codice eseguito. Variabili disponibili: {available_vars}. Valori: {[f'{k}={local_vars[k]}' for k in available_vars[:3]]}"
-        else:
-            return "Codice eseguito con successo"
-
-    except Exception as e:
-        return f"Errore nell'esecuzione: {str(e)}"
+        return json.loads(stdout)["result"]
+    except (ValueError, KeyError):
+        detail = stderr.decode("utf-8", errors="replace").strip().splitlines()
+        return f"Errore nell'esecuzione: {detail[-1] if detail else f'exit code {returncode}'}"
 
 
 async def read_spreadsheet(file_path: str, sheet_name: Optional[str] = None) -> str:
     """Legge file Excel o CSV e restituisce informazioni strutturate."""
+    # Parsing e riepilogo nel pool di processi: al loop torna solo il testo
+    return await run_in(CPU, _summarize_spreadsheet, file_path, sheet_name)
+
+
+def _summarize_spreadsheet(file_path: str, sheet_name: str | None = None) -> str:
+    """Riassumi il foglio (parte sincrona, eseguita in un processo del pool CPU)."""
+    import pandas as pd
+
     try:
         # Rileva il tipo di file usando la nostra funzione
         file_type = detect_file_type(file_path)
         file_extension = Path(file_path).suffix.lower()
 
-        # Wrap le operazioni pandas in asyncio.to_thread
         if file_extension == '.csv' or file_type == 'text/csv':
-            df = await asyncio.to_thread(pd.read_csv, file_path)  # ✅
+            df = pd.read_csv(file_path)
             sheets_info = ""
         elif file_extension in ['.xlsx', '.xls'] or 'spreadsheet' in file_type:
             # Per Excel, mostra prima i fogli disponibili
-            excel_file = await asyncio.to_thread(pd.ExcelFile, file_path)  # ✅
+            excel_file = pd.ExcelFile(file_path)
             sheets_info = f"Fogli disponibili: {excel_file.sheet_names}\n"
 
             # Leggi il foglio specificato o il primo
             if sheet_name:
-                # ✅
-                df = await asyncio.to_thread(pd.read_excel, file_path, sheet_name=sheet_name)
+                df = pd.read_excel(excel_file, sheet_name=sheet_name)
             else:
-                # ✅
-                df = await asyncio.to_thread(pd.read_excel, file_path, sheet_name=excel_file.sheet_names[0])
+                df = pd.read_excel(excel_file, sheet_name=excel_file.sheet_names[0])
                 sheets_info += f"Leggendo foglio: {excel_file.sheet_names[0]}\n"
         else:
             return f"Tipo di file non supportato: {file_extension} (tipo rilevato: {file_type})"
 
-        # Il resto rimane uguale (queste operazioni sono in memoria, non I/O)
         analysis = []
         analysis.append(f"File: {Path(file_path).name}")
         if sheets_info:
@@ -247,22 +323,36 @@ async def read_spreadsheet(file_path: str, sheet_name: Optional[str] = None) ->
 async def analyze_spreadsheet_data(file_path: str, query: str, sheet_name: Optional[str] = None) -> str:
     """Analizza dati di un spreadsheet basandosi su una query specifica."""
     try:
-        # Leggi il file con asyncio.to_thread
-        file_extension = Path(file_path).suffix.lower()
+        # Lettura e generazione del codice (df.to_dict() serializzato) nel pool di processi
+        analysis_code = await run_in(CPU, _build_analysis_code, file_path, query, sheet_name)
+        if analysis_code.startswith("Tipo di file non supportato"):
+            return analysis_code
 
-        if file_extension == '.csv':
-            df = await asyncio.to_thread(pd.read_csv, file_path)  # ✅
-        elif file_extension in ['.xlsx', '.xls']:
-            if sheet_name:
-                # ✅
-                df = await asyncio.to_thread(pd.read_excel, file_path, sheet_name=sheet_name)
-            else:
-                df = await asyncio.to_thread(pd.read_excel, file_path)  # ✅
+        # Esegui l'analisi
+        return await python_repl(analysis_code)
+
+    except Exception as e:
+        return f"Errore nell'analisi: {str(e)}"
+
+
+def _build_analysis_code(file_path: str, query: str, sheet_name: str | None = None) -> str:
+    """Carica il foglio e genera il codice di analisi (sincrono, nel pool CPU)."""
+    import pandas as pd
+
+    file_extension = Path(file_path).suffix.lower()
+
+    if file_extension == '.csv':
+        df = pd.read_csv(file_path)
+    elif file_extension in ['.xlsx', '.xls']:
+        if sheet_name:
+            df = pd.read_excel(file_path, sheet_name=sheet_name)
         else:
-            return f"Tipo di file non supportato: {file_extension}"
+            df = pd.read_excel(file_path)
+    else:
+        return f"Tipo di file non supportato: {file_extension}"
 
-        # Genera codice Python per l'analisi basato sulla query
-        analysis_code = f"""
+    # Genera codice Python per l'analisi basato sulla query
+    analysis_code = f"""
 # Dataset caricato con {df.shape[0]} righe e {df.shape[1]} colonne
 # Colonne disponibili: {list(df.columns)}
 
@@ -304,33 +394,32 @@ print("\\nInfo generali sul dataset:")
 print(f"Dimensioni: {{df.shape}}")
 print(f"Colonne: {{list(df.columns)}}")
 """
-
-        # Esegui l'analisi
-        return await python_repl(analysis_code)
-
-    except Exception as e:
-        return f"Errore nell'analisi: {str(e)}"
+    return analysis_code
 
 
 # audio analysis tools
 async def transcribe_audio(file_path: str, query: Optional[str] = None) -> str:
     """Trascrive file audio usando OpenAI Whisper API"""
     try:
-        import openai
-
         # Verifica che sia un file audio
         file_type = detect_file_type(file_path)
         if not file_type.startswith('audio/'):
             return f"Il file non è audio: {file_type}"
 
-        # Trascrivi usando Whisper
-        with open(file_path, "rb") as audio_file:
-            transcript = await asyncio.to_thread(
-                openai.audio.transcriptions.create,
-                model="whisper-1",
-                file=audio_file,
-                response_format="text"
-            )
+        audio_bytes = await run_in(IO, Path(file_path).read_bytes)
+
+        # Trascrivi usando Whisper con il client async condiviso (nessun thread occupato)
+        async def _transcribe() -> str:
+            async with provider_slot("openai") as client:
+                return await client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=(Path(file_path).name, audio_bytes),
+                    response_format="text",
+                    # Il client HTTP rispetta la deadline del tool
+                    timeout=remaining(API_TIMEOUT_SECONDS),
+                )
+
+        transcript = await with_retries("openai", _transcribe)
 
         # Se c'è una query specifica, fornisci contesto
         if query:
@@ -351,7 +440,9 @@ async def analyze_youtube_video(video_url: str, query: Optional[str] = None) ->
         print(f"🎥 Analizzando video YouTube: {video_url}")
 
         # STEP 1: Prova prima i sottotitoli (gratuito)
-        transcript = await get_youtube_transcript(video_url)
+        # Riusa la trascrizione già scaricata (es. dal prefetch) nella stessa task
+        transcript = await cached_tool_result(
+            "get_youtube_transcript", {"video_url": video_url}, get_youtube_transcript)
         if not transcript.startswith("Errore"):
             print("✅ Sottotitoli trovati - usando trascrizione gratuita")
             if query:
@@ -379,23 +470,26 @@ async def analyze_youtube_video(video_url: str, query: Optional[str] = None) ->
 async def get_youtube_transcript(video_url: str) -> str:
     """Ottiene sottotitoli esistenti da YouTube - GRATUITO"""
     try:
-        def _get_transcript_sync(video_id: str) -> str:
-            """Helper sincrono per YouTubeTranscriptApi"""
+        def _get_transcript_sync(video_id: str, timeout: float) -> str:
+            """Scarica la trascrizione con YouTubeTranscriptApi (sincrono), con timeout su ogni richiesta HTTP."""
+            import requests
             from youtube_transcript_api import YouTubeTranscriptApi
 
-            # Prova diverse lingue
+            class _TimeoutSession(requests.Session):
+                def request(self, *args: Any, **kwargs: Any) -> Any:
+                    kwargs.setdefault("timeout", timeout)
+                    return super().request(*args, **kwargs)
+
+            api = YouTubeTranscriptApi(http_client=_TimeoutSession())
+
+            # Prova diverse lingue, poi la prima trascrizione disponibile
             try:
-                transcript = YouTubeTranscriptApi.get_transcript(
-                    video_id, languages=['en'])
-            except:
-                try:
-                    transcript = YouTubeTranscriptApi.get_transcript(
-                        video_id, languages=['it'])
-                except:
-                    transcript = YouTubeTranscriptApi.get_transcript(video_id)
+                transcript = api.fetch(video_id, languages=['en', 'it'])
+            except Exception:
+                transcript = next(iter(api.list(video_id))).fetch()
 
             # Combina tutto il testo
-            return ' '.join([entry['text'] for entry in transcript])
+            return ' '.join(snippet.text for snippet in transcript)
 
         import re
 
@@ -416,8 +510,10 @@ async def get_youtube_transcript(video_url: str) -> str:
         if not video_id:
             return "Errore: Impossibile estrarre video ID dall'URL"
 
-        # ✅ Usa asyncio.to_thread per la chiamata bloccante
-        text = await asyncio.to_thread(_get_transcript_sync, video_id)
+        # ✅ Fetch remoto lento: pool download, non compete con il parsing.
+        # Il thread non si può cancellare: il timeout HTTP dal budget rimasto
+        # lo libera poco dopo la deadline del tool invece di tenerlo occupato
+        text = await run_in(DOWNLOAD, _get_transcript_sync, video_id, max(1.0, remaining(API_TIMEOUT_SECONDS)))
         return text
 
     except Exception as e:
@@ -427,40 +523,32 @@ async def get_youtube_transcript(video_url: str) -> str:
 async def download_youtube_audio(video_url: str) -> str:
     """Scarica solo l'audio da YouTube per Whisper - versione semplificata"""
     try:
-        def _download_audio_sync(video_url: str, temp_dir: str) -> str:
-            """Helper sincrono per yt-dlp"""
-            import yt_dlp
-
-            # Scarica direttamente in formato audio
-            output_path = os.path.join(temp_dir, "audio.%(ext)s")
-
-            ydl_opts = {
-                'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio',
-                'outtmpl': output_path,
-                'noplaylist': True,
-                'quiet': True,
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
-
-                # Trova il file scaricato
-                for file in os.listdir(temp_dir):
-                    if file.startswith('audio.'):
-                        file_path = os.path.join(temp_dir, file)
-                        print(
-                            f"📁 File scaricato: {file} (tipo: {detect_file_type(file_path)})")
-                        return file_path
-
-                return None
-
         # Crea directory temporanea
-        temp_dir = await asyncio.to_thread(tempfile.mkdtemp)
-
-        # ✅ Usa asyncio.to_thread per la chiamata bloccante
-        audio_file = await asyncio.to_thread(_download_audio_sync, video_url, temp_dir)
-
-        return audio_file if audio_file else "Errore: Download audio fallito"
+        temp_dir = await run_in(IO, tempfile.mkdtemp)
+        output_path = os.path.join(temp_dir, "audio.%(ext)s")
+
+        # ✅ yt-dlp in un subprocess: alla deadline viene terminato, nessun thread resta bloccato
+        returncode, _, stderr = await run_subprocess([
+            sys.executable, "-m", "yt_dlp",
+            "--format", "bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio",
+            "--output", output_path,
+            "--no-playlist",
+            "--quiet",
+            video_url,
+        ])
+        if returncode != 0:
+            detail = stderr.decode("utf-8", errors="replace").strip().splitlines()
+            return f"Errore download audio: {detail[-1] if detail else f'exit code {returncode}'}"
+
+        # Trova il file scaricato
+        for file in os.listdir(temp_dir):
+            if file.startswith('audio.'):
+                file_path = os.path.join(temp_dir, file)
+                print(
+                    f"📁 File scaricato: {file} (tipo: {detect_file_type(file_path)})")
+                return file_path
+
+        return "Errore: Download audio fallito"
 
     except Exception as e:
         return f"Errore download audio: {str(e)}"
@@ -489,44 +577,42 @@ async def analyze_image(file_path: str, query: str) -> str:
             with open(image_path, "rb") as image_file:
                 return base64.b64encode(image_file.read()).decode('utf-8')
 
-        # Usa asyncio.to_thread per operazioni I/O
-        base64_image = await asyncio.to_thread(encode_image, file_path)
+        # Lettura e codifica nel pool io
+        base64_image = await run_in(IO, encode_image, file_path)
 
         # Configura il client (OpenAI o Anthropic)
         configuration = Configuration.from_context()
 
         # Opzione 1: OpenAI GPT-4 Vision
         if "openai" in configuration.model.lower():
-            import openai
-
-            response = await asyncio.to_thread(
-                openai.chat.completions.create,
-                model="gpt-4o",  # o gpt-4-vision-preview
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": f"Analizza questa immagine e rispondi alla domanda: {query}"},
+            async def _vision() -> Any:
+                async with provider_slot("openai") as client:
+                    return await client.chat.completions.create(
+                        model="gpt-4o",  # o gpt-4-vision-preview
+                        messages=[
                             {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
-                                }
+                                "role": "user",
+                                "content": [
+                                    {"type": "text", "text": f"Analizza questa immagine e rispondi alla domanda: {query}"},
+                                    {
+                                        "type": "image_url",
+                                        "image_url": {
+                                            "url": f"data:image/jpeg;base64,{base64_image}"
+                                        }
+                                    }
+                                ]
                             }
-                        ]
-                    }
-                ],
-                max_tokens=1000
-            )
+                        ],
+                        max_tokens=1000,
+                        timeout=remaining(API_TIMEOUT_SECONDS),
+                    )
+
+            response = await with_retries("openai", _vision)
 
             return response.choices[0].message.content
 
         # Opzione 2: Anthropic Claude 3
         elif "anthropic" in configuration.model.lower():
-            import anthropic
-
-            client = anthropic.Anthropic()
-
             # Rileva il tipo di immagine per il media_type
             image_format = Path(file_path).suffix.lower().replace('.', '')
             if image_format in ['jpg', 'jpeg']:
@@ -538,30 +624,34 @@ async def analyze_image(file_path: str, query: str) -> str:
             else:
                 media_type = "image/jpeg"  # fallback
 
-            response = await asyncio.to_thread(
-                client.messages.create,
-                model="claude-3-sonnet-20240229",  # o claude-3-opus-20240229
-                max_tokens=1000,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": media_type,
-                                    "data": base64_image,
-                                },
-                            },
+            async def _vision() -> Any:
+                async with provider_slot("anthropic") as client:
+                    return await client.messages.create(
+                        model="claude-3-sonnet-20240229",  # o claude-3-opus-20240229
+                        max_tokens=1000,
+                        timeout=remaining(API_TIMEOUT_SECONDS),
+                        messages=[
                             {
-                                "type": "text",
-                                "text": f"Analizza questa immagine e rispondi alla domanda: {query}"
+                                "role": "user",
+                                "content": [
+                                    {
+                                        "type": "image",
+                                        "source": {
+                                            "type": "base64",
+                                            "media_type": media_type,
+                                            "data": base64_image,
+                                        },
+                                    },
+                                    {
+                                        "type": "text",
+                                        "text": f"Analizza questa immagine e rispondi alla domanda: {query}"
+                                    }
+                                ],
                             }
                         ],
-                    }
-                ],
-            )
+                    )
+
+            response = await with_retries("anthropic", _vision)
 
             return response.content[0].text
 
@@ -588,14 +678,11 @@ async def describe_image(file_path: str) -> str:
 async def fetch_gaia_task(task_id: str) -> str:
     """Recupera una specifica task GAIA."""
     try:
-        url = "https://agents-course-unit4-scoring.hf.space/questions"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return f"Errore nel fetch delle domande: {response.status}"
+        response = await http_request("GET", f"{GAIA_API_URL}/questions")
+        if response.status != 200:
+            return f"Errore nel fetch delle domande: {response.status}"
 
-                questions = await response.json()
+        questions = response.json()
 
         # Trova la task
         task = None
@@ -633,14 +720,11 @@ async def fetch_gaia_task(task_id: str) -> str:
 async def list_gaia_tasks(level: Optional[str] = None, limit: int = 10) -> str:
     """Lista le task GAIA disponibili."""
     try:
-        url = "https://agents-course-unit4-scoring.hf.space/questions"
-
-        async with aiohttp.ClientSession() as session:  # ✅
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return f"Errore nel fetch delle domande: {response.status}"
+        response = await http_request("GET", f"{GAIA_API_URL}/questions")
+        if response.status != 200:
+            return f"Errore nel fetch delle domande: {response.status}"
 
-                questions = await response.json()
+        questions = response.json()
 
         # Resto del codice rimane uguale...
         if level:
@@ -746,5 +830,94 @@ async def analyze_file(file_path: str, query: Optional[str] = None) -> str:
     except Exception as e:
         return f"Error analyzing file: {str(e)}"
 
-TOOLS: List[Callable[..., Any]] = [search, download_gaia_file,
-                                   python_repl, read_spreadsheet, analyze_spreadsheet_data, fetch_gaia_task, list_gaia_tasks, analyze_file, analyze_image, describe_image, extract_text_from_url, transcribe_audio, analyze_youtube_video, get_youtube_transcript]
+async def read_artifact(handle: str, offset: int = 0, length: int = 4000) -> str:
+    """Legge una porzione di un artifact (output lungo di un tool salvato a parte).
+
+    Args:
+        handle: handle indicato nell'anteprima, es. 'extract_text_from_url-1a2b3c4d5e6f'
+        offset: carattere da cui iniziare
+        length: numero di caratteri da leggere (massimo 8000)
+    """
+    store = current_artifact_store.get()
+    if store is None:
+        return "Error: no artifacts available in this task"
+    try:
+        chunk, total = await run_in(IO, store.read, handle, offset, length)
+    except KeyError:
+        return f"Error: unknown artifact '{handle}'"
+    end = min(total, max(0, offset) + len(chunk))
+    return f"[artifact {handle}: chars {max(0, offset)}-{end} of {total}]\n{chunk}"
+
+
+async def grep_artifact(handle: str, pattern: str, context_chars: int = 200, max_matches: int = 10) -> str:
+    """Cerca un pattern (regex, case-insensitive) in un artifact e restituisce le occorrenze con contesto.
+
+    Args:
+        handle: handle indicato nell'anteprima
+        pattern: regex o testo da cercare
+        context_chars: caratteri di contesto prima e dopo ogni occorrenza
+        max_matches: numero massimo di occorrenze restituite
+    """
+    store = current_artifact_store.get()
+    if store is None:
+        return "Error: no artifacts available in this task"
+    try:
+        matches = await run_in(
+            IO, lambda: list(store.grep(handle, pattern, context_chars, max_matches))
+        )
+    except KeyError:
+        return f"Error: unknown artifact '{handle}'"
+    if not matches:
+        return f"No matches for '{pattern}' in artifact {handle}"
+    return "\n\n".join(f"[offset {offset}] {text}" for offset, text in matches)
+
+
+async def search_artifact(query: str, handle: str = "", top_k: int = 3) -> str:
+    """Restituisce i passaggi di un artifact più rilevanti per la query (BM25 sul testo completo).
+
+    Utile per trovare un fatto in una pagina o trascrizione lunga senza leggerla tutta.
+
+    Args:
+        query: cosa cercare, in parole chiave
+        handle: handle dell'artifact; vuoto = tutti gli artifact della task
+        top_k: numero di passaggi da restituire (massimo 5)
+    """
+    store = current_artifact_store.get()
+    if store is None:
+        return "Error: no artifacts available in this task"
+    try:
+        results = await run_in(IO, store.search, query, handle, min(top_k, 5))
+    except KeyError:
+        return f"Error: unknown artifact '{handle}'"
+    if not results:
+        return f"No passages matching '{query}'"
+    return "\n\n".join(
+        f"[{name} chars {passage.start}-{passage.end}, score {passage.score}]\n{passage.text}"
+        for name, passage in results
+    )
+
+
+# Ogni tool è registrabile/riproducibile tramite cassette (vedi cassettes.py)
+# e ha un budget di tempo oltre il quale restituisce un timeout (vedi deadlines.py);
+# `attributed` attribuisce al tool gli eventuali blocchi dell'event loop (vedi loop_monitor.py)
+TOOLS: List[Callable[..., Any]] = [attributed(with_deadline(recordable_tool(tool))) for tool in [
+    search, download_gaia_file, python_repl, read_spreadsheet, analyze_spreadsheet_data, fetch_gaia_task, list_gaia_tasks, analyze_file, analyze_image, describe_image, extract_text_from_url, wikipedia_lookup, transcribe_audio, analyze_youtube_video, get_youtube_transcript,
+    read_artifact, grep_artifact, search_artifact]]
+
+
+async def tools_for(configuration: Configuration, artifacts: bool = False) -> List[Callable[..., Any]]:
+    """TOOLS offerti al modello.
+
+    wikipedia_lookup solo con un dump locale indicizzato, i tool *_artifact solo
+    con `artifacts=True` (grafo tracciato con artifact store attivo).
+    """
+    excluded = set() if artifacts else set(ARTIFACT_TOOLS)
+    if not await wiki_dump_ready(configuration.wiki_dump_path):
+        excluded.add("wikipedia_lookup")
+    return [tool for tool in TOOLS if tool.__name__ not in excluded]
+
+# Tool con effetti collaterali: esclusi dalla memoizzazione per-task
+SIDE_EFFECT_TOOLS: FrozenSet[str] = frozenset({"python_repl"})
+
+# Tool che leggono gli artifact: output già limitato, mai salvato come artifact
+ARTIFACT_TOOLS: FrozenSet[str] = frozenset({"read_artifact", "grep_artifact", "search_artifact"})
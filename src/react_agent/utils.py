@@ -1,9 +1,26 @@
 """Utility & helper functions."""
 
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
 
+from react_agent.cassettes import wrap_chat_model
+from react_agent.resilience import ResilientChatModel
+
+# Providers that need explicit cache breakpoints; others (e.g. OpenAI) cache
+# stable prefixes automatically.
+EXPLICIT_CACHE_PROVIDERS = frozenset({"anthropic"})
+
+# Client kwargs per provider. The SDK's own retries are disabled where
+# supported so that ResilientChatModel is the single retry layer.
+PROVIDER_CLIENT_KWARGS: Dict[str, Dict[str, Any]] = {
+    "openai": {"max_retries": 0},
+    "anthropic": {"max_retries": 0},
+}
+
 
 def get_message_text(msg: BaseMessage) -> str:
     """Get the text content of a message."""
@@ -25,4 +42,67 @@ def load_chat_model(fully_specified_name: str) -> BaseChatModel:
         fully_specified_name (str): String in the format 'provider/model'.
     """
     provider, model = fully_specified_name.split("/", maxsplit=1)
-    return init_chat_model(model, model_provider=provider)
+    # With an active cassette the model is recorded or replayed (see cassettes.py)
+    return wrap_chat_model(
+        fully_specified_name,
+        lambda: ResilientChatModel(
+            inner=init_chat_model(
+                model, model_provider=provider, **PROVIDER_CLIENT_KWARGS.get(provider, {})
+            ),
+            endpoint=provider,
+        ),
+    )
+
+
+def format_static_system_prompt(template: str) -> str:
+    """Format a system prompt so it stays byte-identical across steps.
+
+    Custom prompts may still use `{system_time}`; it is filled at day granularity
+    so the prefix only changes once a day.
+    """
+    return template.format(system_time=datetime.now(tz=UTC).date().isoformat())
+
+
+def build_cacheable_messages(
+    system_prompt: str,
+    history: Sequence[Any],
+    fully_specified_name: str,
+    volatile_context: str = "",
+) -> List[Any]:
+    """Assemble the model input as a stable prefix followed by volatile content.
+
+    Order: static system prompt, conversation history, then the per-step context.
+    For providers with explicit prompt caching, cache breakpoints are placed on
+    the system prompt (covering tool schemas) and on the last history message.
+    """
+    provider = fully_specified_name.split("/", maxsplit=1)[0]
+    explicit = provider in EXPLICIT_CACHE_PROVIDERS
+
+    system: Dict[str, Any] = {"role": "system", "content": system_prompt}
+    if explicit:
+        system["content"] = [
+            {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+        ]
+
+    messages: List[Any] = [system, *history]
+    if explicit and history and isinstance(history[-1], BaseMessage):
+        last = history[-1]
+        if isinstance(last.content, str) and last.content:
+            messages[-1] = last.model_copy(
+                update={
+                    "content": [
+                        {"type": "text", "text": last.content, "cache_control": {"type": "ephemeral"}}
+                    ]
+                }
+            )
+
+    if volatile_context:
+        messages.append({"role": "user", "content": volatile_context})
+    return messages
+
+
+def get_prompt_token_usage(msg: BaseMessage) -> Tuple[int, int]:
+    """Return (prompt tokens, prompt tokens served from the provider cache)."""
+    usage = getattr(msg, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    return usage.get("input_tokens", 0), details.get("cache_read", 0) or 0
@@ -0,0 +1,372 @@
+"""Lettore offline di un dump XML di Wikipedia (o di un altro wiki MediaWiki).
+
+Il dump decompresso (`*-pages-articles.xml`) viene aperto con mmap: nessuna
+copia in memoria, il sistema operativo carica solo le pagine lette. Un indice
+SQLite accanto al dump associa ogni titolo all'offset in byte della sua
+`<page>` e ai redirect, quindi una lookup è una query sull'indice più il
+parsing della sola pagina richiesta: pochi millisecondi, senza rete.
+
+L'indice si costruisce una volta sola (per un dump completo richiede tempo):
+
+    python -m react_agent.wiki_dump /path/enwiki-latest-pages-articles.xml
+"""
+
+import html
+import mmap
+import os
+import re
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+from urllib.parse import unquote
+
+from react_agent.executors import IO, run_in
+
+# Hop massimi tra redirect (evita cicli nel dump)
+MAX_REDIRECTS = 5
+# Righe inserite per transazione durante la costruzione dell'indice
+BUILD_BATCH = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    title TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    redirect TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_key ON pages (key);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_TITLE_RE = re.compile(rb"<title>(.*?)</title>", re.DOTALL)
+_REDIRECT_RE = re.compile(rb'<redirect\s+title="(.*?)"\s*/>', re.DOTALL)
+_TEXT_RE = re.compile(rb"<text\b[^>]*?(?:/>|>(.*?)</text>)", re.DOTALL)
+
+_HEADING_RE = re.compile(r"^(={2,6})\s*(.+?)\s*\1\s*$", re.MULTILINE)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_REF_RE = re.compile(r"<ref\b[^>/]*/>|<ref\b[^>]*>.*?</ref>", re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+_TEMPLATE_RE = re.compile(r"\{\{[^{}]*\}\}")
+_LINK_RE = re.compile(r"\[\[([^\[\]|]*)(?:\|([^\[\]]*))?\]\]")
+_EXTERNAL_LINK_RE = re.compile(r"\[(?:https?:)?//[^\s\]]+\s*([^\]]*)\]")
+_DROPPED_LINKS = ("file:", "image:", "category:")
+
+
+def normalize_title(title: str) -> str:
+    """Titolo canonico MediaWiki: spazi al posto di "_", prima lettera maiuscola, senza URL."""
+    title = unquote(title.strip())
+    if "/wiki/" in title:
+        title = title.split("/wiki/", 1)[1]
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+def _split_fragment(title: str) -> Tuple[str, str]:
+    """Separa titolo e sezione di un link tipo Titolo#Sezione."""
+    page, _, fragment = title.partition("#")
+    return normalize_title(page), fragment.replace("_", " ").strip()
+
+
+def wikitext_to_text(wikitext: str) -> str:
+    """Testo leggibile dal wikitext: niente template, note e markup; titoli di sezione conservati."""
+    text = _COMMENT_RE.sub("", wikitext)
+    text = _REF_RE.sub("", text)
+    # Template annidati: si rimuovono dall'interno verso l'esterno
+    previous = None
+    while previous != text:
+        previous, text = text, _TEMPLATE_RE.sub("", text)
+
+    def link(match: "re.Match[str]") -> str:
+        target, label = match.group(1), match.group(2)
+        if target.strip().lower().startswith(_DROPPED_LINKS):
+            return ""
+        return label if label is not None else target
+
+    # Anche i link annidati (didascalie delle immagini) dall'interno verso l'esterno
+    previous = None
+    while previous != text:
+        previous, text = text, _LINK_RE.sub(link, text)
+    text = _EXTERNAL_LINK_RE.sub(r"\1", text)
+    text = _TAG_RE.sub("", text)
+    text = text.replace("'''", "").replace("''", "")
+    text = html.unescape(text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+@dataclass(frozen=True)
+class Section:
+    """Sezione di un articolo (sottosezioni incluse nel testo)."""
+
+    level: int
+    title: str
+    text: str
+
+
+@dataclass(frozen=True)
+class Article:
+    """Articolo letto dal dump, con il testo già ripulito dal wikitext."""
+
+    title: str
+    text: str
+    # Titolo richiesto, se diverso (redirect o maiuscole/minuscole)
+    redirected_from: str | None = None
+    # Sezione indicata dal redirect ("Titolo#Sezione")
+    fragment: str = ""
+
+    def sections(self) -> List[Section]:
+        """Sezioni della pagina, divise sui titoli wikitext."""
+        headings = list(_HEADING_RE.finditer(self.text))
+        sections = []
+        for index, heading in enumerate(headings):
+            level = len(heading.group(1))
+            end = len(self.text)
+            for following in headings[index + 1:]:
+                if len(following.group(1)) <= level:
+                    end = following.start()
+                    break
+            sections.append(Section(level, heading.group(2), self.text[heading.end():end].strip()))
+        return sections
+
+    def section(self, title: str) -> Section | None:
+        """Sezione per titolo (senza distinzione tra maiuscole e minuscole, poi per prefisso)."""
+        wanted = title.strip().lower()
+        sections = self.sections()
+        for candidate in sections:
+            if candidate.title.lower() == wanted:
+                return candidate
+        for candidate in sections:
+            if candidate.title.lower().startswith(wanted):
+                return candidate
+        return None
+
+
+class WikiDump:
+    """Dump XML MediaWiki mappato in memoria, con indice titoli/redirect in SQLite."""
+
+    def __init__(self, path: str, index_path: str | None = None) -> None:
+        """Apre il dump e il suo indice (creato se manca o non aggiornato)."""
+        self.path = path
+        self.index_path = index_path or f"{path}.index.sqlite"
+        self._file = open(path, "rb")
+        try:
+            # ValueError se il file è vuoto (dump troncato)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Chiude indice e file del dump."""
+        with self._lock:
+            self._conn.close()
+            self._map.close()
+            self._file.close()
+
+    def __len__(self) -> int:
+        """Numero di pagine indicizzate."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    # --- Indice ---
+
+    def _fingerprint(self) -> str:
+        stat = os.stat(self.path)
+        return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+    def is_indexed(self) -> bool:
+        """Verifica che l'indice sia stato costruito su questa versione del dump."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'dump'").fetchone()
+        return row is not None and row[0] == self._fingerprint()
+
+    def _scan(self) -> Iterator[Tuple[str, str, int, int, str | None]]:
+        """(titolo, chiave, offset, lunghezza, redirect) di ogni <page> del dump."""
+        data = self._map
+        position = data.find(b"<page>")
+        while position != -1:
+            end = data.find(b"</page>", position)
+            if end == -1:
+                break
+            end += len(b"</page>")
+            # Titolo e redirect stanno in testa alla pagina, prima di <revision>
+            head_end = data.find(b"<revision>", position, end)
+            head = data[position:head_end if head_end != -1 else end]
+            title_match = _TITLE_RE.search(head)
+            if title_match:
+                title = normalize_title(html.unescape(title_match.group(1).decode("utf-8", "replace")))
+                redirect_match = _REDIRECT_RE.search(head)
+                redirect = (
+                    html.unescape(redirect_match.group(1).decode("utf-8", "replace"))
+                    if redirect_match else None
+                )
+                yield title, title.lower(), position, end - position, redirect
+            position = data.find(b"<page>", end)
+
+    def build_index(self) -> int:
+        """(Ri)costruisce l'indice scorrendo il dump; restituisce il numero di pagine."""
+        count = 0
+        batch: List[Tuple[str, str, int, int, str | None]] = []
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM pages")
+                self._conn.execute("DELETE FROM meta")
+            for row in self._scan():
+                batch.append(row)
+                if len(batch) >= BUILD_BATCH:
+                    count += self._insert(batch)
+                    batch = []
+            count += self._insert(batch)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO meta (name, value) VALUES ('dump', ?)", (self._fingerprint(),)
+                )
+        return count
+
+    def _insert(self, rows: List[Tuple[str, str, int, int, str | None]]) -> int:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages (title, key, offset, length, redirect) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    # --- Lookup ---
+
+    def _find(self, title: str) -> Tuple[str, int, int, str | None] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, offset, length, redirect FROM pages WHERE title = ?", (title,)
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT title, offset, length, redirect FROM pages WHERE key = ? LIMIT 1",
+                    (title.lower(),),
+                ).fetchone()
+        return row
+
+    def article(self, title: str) -> Article | None:
+        """Articolo per titolo o URL, seguendo i redirect; None se non è nel dump."""
+        requested, fragment = _split_fragment(title)
+        current = requested
+        for _ in range(MAX_REDIRECTS + 1):
+            row = self._find(current)
+            if row is None:
+                return None
+            found, offset, length, redirect = row
+            if redirect is None:
+                text = self._page_text(offset, length)
+                return Article(
+                    title=found,
+                    text=wikitext_to_text(text),
+                    redirected_from=requested if requested != found else None,
+                    fragment=fragment,
+                )
+            current, redirect_fragment = _split_fragment(redirect)
+            fragment = fragment or redirect_fragment
+        return None
+
+    def _page_text(self, offset: int, length: int) -> str:
+        page = self._map[offset:offset + length]
+        match = _TEXT_RE.search(page)
+        if match is None or match.group(1) is None:
+            return ""
+        return html.unescape(match.group(1).decode("utf-8", "replace"))
+
+    def suggestions(self, title: str, limit: int = 5) -> List[str]:
+        """Titoli che iniziano come quello richiesto (per un titolo non trovato)."""
+        prefix = _split_fragment(title)[0].lower()
+        if not prefix:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title FROM pages WHERE key >= ? AND key < ? AND redirect IS NULL "
+                "ORDER BY key LIMIT ?",
+                (prefix, prefix + "\uffff", limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+_DUMPS: Dict[str, WikiDump] = {}
+_DUMPS_LOCK = threading.Lock()
+
+
+def get_wiki_dump(path: str) -> WikiDump:
+    """Dump condiviso per percorso; FileNotFoundError se il dump o il suo indice mancano."""
+    with _DUMPS_LOCK:
+        dump = _DUMPS.get(path)
+        if dump is None:
+            if not Path(path).is_file():
+                raise FileNotFoundError(path)
+            dump = WikiDump(path)
+            if not dump.is_indexed():
+                dump.close()
+                raise FileNotFoundError(f"{dump.index_path} (run: python -m react_agent.wiki_dump {path})")
+            _DUMPS[path] = dump
+        return dump
+
+
+# Esito di is_wiki_dump_ready per percorso, ricalcolato solo se dump o indice cambiano
+_READY: Dict[str, Tuple[Tuple[float, ...], bool]] = {}
+
+
+def _stamp(path: str) -> Tuple[float, ...]:
+    dump, index = os.stat(path), os.stat(f"{path}.index.sqlite")
+    return (dump.st_size, dump.st_mtime, index.st_size, index.st_mtime)
+
+
+def is_wiki_dump_ready(path: str) -> bool:
+    """Verifica che il dump esista e che il suo indice sia aggiornato (non crea l'indice se manca).
+
+    Bloccante (apre l'indice e mappa il dump): dall'event loop usare `wiki_dump_ready`.
+    """
+    if not path:
+        return False
+    try:
+        stamp = _stamp(path)
+    except OSError:
+        return False
+    cached = _READY.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        get_wiki_dump(path)
+        ready = True
+    except (OSError, sqlite3.Error, ValueError):
+        ready = False
+    _READY[path] = (stamp, ready)
+    return ready
+
+
+async def wiki_dump_ready(path: str) -> bool:
+    """Come `is_wiki_dump_ready`, fuori dal loop; un dump già pronto non costa nulla."""
+    if not path:
+        return False
+    cached = _READY.get(path)
+    if cached is not None and cached[1]:
+        return True
+    return await run_in(IO, is_wiki_dump_ready, path)
+
+
+def main(argv: List[str]) -> None:
+    """Costruisce l'indice di un dump da riga di comando."""
+    if len(argv) != 1:
+        sys.exit("usage: python -m react_agent.wiki_dump <pages-articles.xml>")
+    dump = WikiDump(argv[0])
+    try:
+        print(f"📚 Indicizzati {dump.build_index()} titoli in {dump.index_path}")  # noqa: T201
+    finally:
+        dump.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
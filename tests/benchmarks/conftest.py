@@ -0,0 +1,70 @@
+"""Fixture sintetiche per i microbenchmark degli hot path CPU.
+
+Eseguire con `make benchmark`: i risultati vengono salvati in `.benchmarks/` e
+confrontati con l'ultima esecuzione salvata; una regressione oltre soglia fa fallire il run.
+"""
+
+from pathlib import Path
+from typing import List
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+pytest.importorskip("pytest_benchmark")
+
+
+def build_history(steps: int) -> List[BaseMessage]:
+    """Conversazione con `steps` coppie tool call/risultato e una FINAL ANSWER."""
+    messages: List[BaseMessage] = [HumanMessage(content="How many studio albums were published?")]
+    for i in range(steps):
+        messages.append(AIMessage(
+            content=f"I need to search for discography page {i}.\nLet me check the results carefully.",
+            tool_calls=[{"name": "search", "args": {"query": f"discography {i}"}, "id": f"call_{i}"}],
+        ))
+        messages.append(ToolMessage(content="result " * 200, name="search", tool_call_id=f"call_{i}"))
+    messages.append(AIMessage(content="The count is 3.\nFINAL ANSWER: 3"))
+    return messages
+
+
+@pytest.fixture(scope="session")
+def large_csv(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """CSV da 100k righe con colonne numeriche, testuali e valori mancanti"""
+    path = tmp_path_factory.mktemp("sheets") / "sales.csv"
+    rows = ["id,city,amount,quantity,note"]
+    rows.extend(
+        f"{i},city_{i % 50},{i * 1.5:.2f},{i % 17},{'' if i % 11 == 0 else 'ok'}"
+        for i in range(100_000)
+    )
+    path.write_text("\n".join(rows), encoding="utf-8")
+    return path
+
+
+@pytest.fixture(scope="session")
+def large_xlsx(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """XLSX da 10k righe su due fogli"""
+    import pandas as pd
+
+    path = tmp_path_factory.mktemp("sheets") / "sales.xlsx"
+    frame = pd.DataFrame({
+        "id": range(10_000),
+        "city": [f"city_{i % 50}" for i in range(10_000)],
+        "amount": [i * 1.5 for i in range(10_000)],
+    })
+    with pd.ExcelWriter(path) as writer:
+        frame.to_excel(writer, sheet_name="Sales", index=False)
+        frame.head(100).to_excel(writer, sheet_name="Summary", index=False)
+    return path
+
+
+@pytest.fixture(scope="session")
+def saved_page() -> str:
+    """Pagina HTML salvata in stile Wikipedia (~300 KB) con tabelle, script e stili"""
+    sections = []
+    for i in range(200):
+        rows = "".join(f"<tr><td>{i}-{j}</td><td>value {j}</td></tr>" for j in range(10))
+        sections.append(
+            f"<h2>Section {i}</h2><p>Paragraph {i} with <a href='/wiki/{i}'>link</a> "
+            f"and some  spaced   text.</p><table>{rows}</table>"
+            f"<script>var x{i} = {i};</script><style>.c{i} {{ color: red; }}</style>"
+        )
+    return f"<html><head><title>Saved page</title></head><body>{''.join(sections)}</body></html>"
@@ -0,0 +1,255 @@
+"""Benchmark end-to-end offline: grafo v1 (`graph`) contro grafo v2 (`tracked_graph`).
+
+Entrambi i grafi girano sulle domande di `questions.json` con un chat model scriptato
+e tool stub con gli stessi nomi dei TOOLS reali: nessuna rete né API key.
+Misura task/sec, overhead per step del modello e memoria di picco per task.
+
+Uso: `python -m tests.benchmarks.graph_throughput [--repeat N] [--questions path] [--monitor-loop]`
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import importlib
+import io
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from react_agent import graph_v2
+from react_agent.loop_monitor import LoopMonitor
+from react_agent.state_v2 import GAIAInternalState
+from react_agent.tool_cache import clear_task_cache
+from react_agent.tools import TOOLS
+
+# `react_agent.graph` è anche l'attributo esportato dal package: serve il modulo
+graph_v1_module = importlib.import_module("react_agent.graph")
+
+QUESTIONS_PATH = Path(__file__).resolve().parents[2] / "questions.json"
+FAKE_MODEL = "fake/scripted"
+
+# Turni del modello scriptato: due tool call e poi la FINAL ANSWER
+SCRIPT: List[AIMessage] = [
+    AIMessage(
+        content="I need to search for the relevant page first.",
+        tool_calls=[{"name": "search", "args": {"query": "benchmark query"}, "id": "call_search"}],
+    ),
+    AIMessage(
+        content="Let me compute the answer from the results.",
+        tool_calls=[{"name": "python_repl", "args": {"code": "result = 1 + 2"}, "id": "call_repl"}],
+    ),
+    AIMessage(content="The computation gives 3.\nFINAL ANSWER: 3"),
+]
+MODEL_STEPS_PER_TASK = len(SCRIPT)
+
+
+class TurnScriptedChatModel(BaseChatModel):
+    """Risponde in base al turno della conversazione (numero di AIMessage già presenti).
+
+    A differenza di un contatore globale può servire più task, anche concorrenti.
+    """
+
+    script: List[AIMessage]
+
+    @property
+    def _llm_type(self) -> str:
+        return "turn-scripted-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "TurnScriptedChatModel":
+        return self
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        turn = sum(1 for message in messages if isinstance(message, AIMessage))
+        message = self.script[min(turn, len(self.script) - 1)]
+        return ChatResult(generations=[ChatGeneration(message=message.model_copy())])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return self._generate(messages, stop)
+
+
+def make_stub_tools(result_chars: int = 0) -> List[Callable[..., Awaitable[str]]]:
+    """Stub asincroni con nome, docstring e firma dei TOOLS reali (stesso schema).
+
+    Con `result_chars` ogni risultato viene allungato fino a quella dimensione
+    (simula pagine e trascrizioni lunghe).
+    """
+
+    def stub(tool: Callable[..., Any]) -> Callable[..., Awaitable[str]]:
+        @functools.wraps(tool)
+        async def wrapper(*args: Any, **kwargs: Any) -> str:
+            result = f"stub result from {tool.__name__}"
+            if result_chars > len(result):
+                # Testo nuovo a ogni chiamata: nessuna condivisione tra task
+                result += f" {time.perf_counter_ns()} " + "x" * result_chars
+                result = result[:result_chars]
+            return result
+
+        return wrapper
+
+    return [stub(tool) for tool in TOOLS]
+
+
+@dataclass
+class GraphReport:
+    """Risultati di un grafo sul set di domande"""
+
+    name: str
+    tasks: int
+    elapsed_seconds: float
+    peak_memory_per_task_kb: float
+
+    @property
+    def tasks_per_second(self) -> float:
+        return self.tasks / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def ms_per_model_step(self) -> float:
+        return 1000 * self.elapsed_seconds / (self.tasks * MODEL_STEPS_PER_TASK)
+
+
+async def _run_v1(graph: Any, question: Dict[str, Any]) -> str:
+    result = await graph.ainvoke(
+        {"messages": [("user", question["question"])]},
+        {"configurable": {"model": FAKE_MODEL}},
+    )
+    return str(result["messages"][-1].content)
+
+
+async def _run_v2(graph: Any, question: Dict[str, Any]) -> str:
+    state = GAIAInternalState(
+        messages=[("user", question["question"])],
+        task_id=question["task_id"],
+        has_file=bool(question.get("file_name")),
+        file_name=question.get("file_name", ""),
+        difficulty_level=int(question.get("Level") or 1),
+        start_time=datetime.now(),
+    )
+    try:
+        result = await graph.ainvoke(state, {"configurable": {"model": FAKE_MODEL}})
+    finally:
+        # Come CleanGAIARunner: la cache per-task non sopravvive alla task
+        clear_task_cache(question["task_id"])
+    return result["clean_output"].submitted_answer
+
+
+async def _measure(
+    name: str,
+    run: Callable[[Any, Dict[str, Any]], Awaitable[str]],
+    graph: Any,
+    questions: List[Dict[str, Any]],
+    repeat: int,
+) -> GraphReport:
+    # Warmup: compilazione regex, import lazy, primo bind del modello
+    await run(graph, questions[0])
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for question in questions:
+            await run(graph, question)
+    elapsed = time.perf_counter() - start
+
+    # Memoria in un passaggio separato: tracemalloc rallenta l'esecuzione
+    peaks = []
+    for question in questions:
+        tracemalloc.start()
+        await run(graph, question)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return GraphReport(
+        name=name,
+        tasks=repeat * len(questions),
+        elapsed_seconds=elapsed,
+        peak_memory_per_task_kb=sum(peaks) / len(peaks) / 1024,
+    )
+
+
+async def run_benchmark(
+    questions: List[Dict[str, Any]], repeat: int = 1, quiet: bool = True
+) -> List[GraphReport]:
+    """Esegue entrambi i grafi sulle stesse domande con modello e tool finti"""
+    model = TurnScriptedChatModel(script=SCRIPT)
+    stub_tools = make_stub_tools()
+    graph_v1 = graph_v1_module.create_graph(stub_tools)
+    tracked = graph_v2.create_tracked_graph(tools=stub_tools)
+
+    originals = (graph_v1_module.load_chat_model, graph_v2.load_chat_model)
+    graph_v1_module.load_chat_model = graph_v2.load_chat_model = lambda name: model
+    # I print di v2 vengono comunque formattati: fanno parte dell'overhead misurato
+    sink = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    try:
+        with sink:
+            return [
+                await _measure("graph (v1)", _run_v1, graph_v1, questions, repeat),
+                await _measure("tracked_graph (v2)", _run_v2, tracked, questions, repeat),
+            ]
+    finally:
+        graph_v1_module.load_chat_model, graph_v2.load_chat_model = originals
+
+
+def format_report(reports: List[GraphReport]) -> str:
+    lines = [f"{'graph':<20} {'tasks':>6} {'tasks/sec':>10} {'ms/step':>9} {'peak KB/task':>13}"]
+    for report in reports:
+        lines.append(
+            f"{report.name:<20} {report.tasks:>6} {report.tasks_per_second:>10.1f} "
+            f"{report.ms_per_model_step:>9.2f} {report.peak_memory_per_task_kb:>13.1f}"
+        )
+    baseline, tracked = reports[0], reports[-1]
+    overhead = tracked.ms_per_model_step - baseline.ms_per_model_step
+    lines.append(f"v2 overhead per model step: {overhead:+.2f} ms")
+    return "\n".join(lines)
+
+
+def load_questions(path: Path = QUESTIONS_PATH) -> List[Dict[str, Any]]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=Path, default=QUESTIONS_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--verbose", action="store_true", help="mostra i print dei grafi")
+    parser.add_argument("--monitor-loop", action="store_true",
+                        help="riporta i blocchi dell'event loop per tool/nodo (rallenta la misura)")
+    args = parser.parse_args()
+
+    async def _run() -> None:
+        questions = load_questions(args.questions)
+        if not args.monitor_loop:
+            print(format_report(await run_benchmark(questions, args.repeat, quiet=not args.verbose)))  # noqa: T201
+            return
+        async with LoopMonitor(threshold=0.005) as monitor:
+            reports = await run_benchmark(questions, args.repeat, quiet=not args.verbose)
+        print(format_report(reports))  # noqa: T201
+        print(monitor.format_summary())  # noqa: T201
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
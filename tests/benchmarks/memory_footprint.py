@@ -0,0 +1,122 @@
+"""Benchmark offline della memoria per task: output completo contro output slim.
+
+Esegue N task concorrenti su `tracked_graph` con tool stub che restituiscono testi
+lunghi e, come il runner, conserva tutti i GAIAOutputState fino alla fine.
+Misura la memoria ancora allocata per task e il picco durante l'esecuzione.
+
+Uso: `python -m tests.benchmarks.memory_footprint [--tasks N] [--tool-chars N]`
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+
+from react_agent import graph_v2
+from react_agent.state_v2 import GAIAInternalState, GAIAOutputState
+from react_agent.tool_cache import clear_task_cache
+from tests.benchmarks.graph_throughput import (
+    FAKE_MODEL,
+    SCRIPT,
+    TurnScriptedChatModel,
+    make_stub_tools,
+)
+
+
+@dataclass
+class MemoryReport:
+    """Memoria di una modalità di output"""
+
+    mode: str
+    tasks: int
+    retained_kb_per_task: float
+    peak_kb_per_task: float
+    output_object_bytes: int
+
+
+async def _run_tasks(graph, tasks: int, slim: bool) -> List[GAIAOutputState]:
+    # Artifact store disattivato: si misura solo l'effetto dell'output slim
+    config = {"configurable": {"model": FAKE_MODEL, "slim_output": slim, "artifact_threshold_chars": 0}}
+
+    async def _one(index: int) -> GAIAOutputState:
+        task_id = f"memory-{index}"
+        state = GAIAInternalState(
+            messages=[("user", f"Benchmark question {index}")],
+            task_id=task_id,
+            start_time=datetime.now(),
+        )
+        try:
+            result = await graph.ainvoke(state, config)
+        finally:
+            clear_task_cache(task_id)
+        # Come il runner: dello stato finale resta solo clean_output
+        return result["clean_output"]
+
+    return list(await asyncio.gather(*(_one(index) for index in range(tasks))))
+
+
+async def _measure(graph, tasks: int, slim: bool) -> MemoryReport:
+    # Warmup fuori dalla misura: import lazy e strutture interne di LangGraph
+    await _run_tasks(graph, 1, slim)
+    gc.collect()
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    outputs = await _run_tasks(graph, tasks, slim)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return MemoryReport(
+        mode="slim" if slim else "full",
+        tasks=len(outputs),
+        retained_kb_per_task=(retained - baseline) / tasks / 1024,
+        peak_kb_per_task=(peak - baseline) / tasks / 1024,
+        output_object_bytes=sys.getsizeof(outputs[0]),
+    )
+
+
+async def run_benchmark(tasks: int = 20, tool_chars: int = 100_000, quiet: bool = True) -> List[MemoryReport]:
+    """Misura le due modalità di output sullo stesso grafo con modello e tool finti"""
+    model = TurnScriptedChatModel(script=SCRIPT)
+    graph = graph_v2.create_tracked_graph(tools=make_stub_tools(result_chars=tool_chars))
+
+    original = graph_v2.load_chat_model
+    graph_v2.load_chat_model = lambda name: model
+    sink = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    try:
+        with sink:
+            return [await _measure(graph, tasks, slim) for slim in (False, True)]
+    finally:
+        graph_v2.load_chat_model = original
+
+
+def format_report(reports: List[MemoryReport]) -> str:
+    lines = [f"{'output':<8} {'tasks':>6} {'retained KB/task':>17} {'peak KB/task':>13} {'object B':>9}"]
+    for report in reports:
+        lines.append(
+            f"{report.mode:<8} {report.tasks:>6} {report.retained_kb_per_task:>17.1f} "
+            f"{report.peak_kb_per_task:>13.1f} {report.output_object_bytes:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--tool-chars", type=int, default=100_000)
+    parser.add_argument("--verbose", action="store_true", help="mostra i print del grafo")
+    args = parser.parse_args()
+
+    reports = asyncio.run(run_benchmark(args.tasks, args.tool_chars, quiet=not args.verbose))
+    print(format_report(reports))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import pytest
+
+from tests.benchmarks.graph_throughput import (
+    format_report,
+    load_questions,
+    run_benchmark,
+)
+
+
+@pytest.mark.asyncio
+async def test_both_graphs_run_offline_over_questions() -> None:
+    questions = load_questions()[:3]
+
+    reports = await run_benchmark(questions, repeat=1)
+
+    assert [report.name for report in reports] == ["graph (v1)", "tracked_graph (v2)"]
+    assert all(report.tasks == 3 and report.tasks_per_second > 0 for report in reports)
+    assert all(report.peak_memory_per_task_kb > 0 for report in reports)
+    assert "v2 overhead per model step" in format_report(reports)
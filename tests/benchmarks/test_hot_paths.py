@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from react_agent.graph_v2 import extract_reasoning_step, prepare_clean_output
+from react_agent.passages import PassageIndex
+from react_agent.state_v2 import GAIAInternalState
+from react_agent.tools import (
+    detect_file_type,
+    html_to_text,
+    python_repl,
+    read_spreadsheet,
+)
+from tests.benchmarks.conftest import build_history
+
+REASONING_CONTENT = (
+    "Looking at the question carefully.\n" * 20
+    + "My plan is to open the spreadsheet first.\nThen sum the column."
+)
+
+
+def test_extract_reasoning_step(benchmark) -> None:
+    result = benchmark(extract_reasoning_step, REASONING_CONTENT)
+    assert result
+
+
+@pytest.mark.parametrize("steps", [10, 50, 200])
+def test_prepare_clean_output_long_history(benchmark, steps: int) -> None:
+    state = GAIAInternalState(
+        messages=build_history(steps), task_id="bench", start_time=datetime.now()
+    )
+    result = benchmark(prepare_clean_output, state)
+    assert result["clean_output"].submitted_answer == "3"
+
+
+def test_detect_file_type(benchmark) -> None:
+    names = [f"file_{i}{ext}" for i in range(100) for ext in (".xlsx", ".mp3", ".py", ".unknown")]
+    result = benchmark(lambda: [detect_file_type(name) for name in names])
+    assert result[-1] == "application/octet-stream"
+
+
+def test_read_spreadsheet_large_csv(benchmark, large_csv) -> None:
+    result = benchmark.pedantic(
+        lambda: asyncio.run(read_spreadsheet(str(large_csv))), rounds=5, warmup_rounds=1
+    )
+    assert "100000 righe" in result
+
+
+def test_read_spreadsheet_large_xlsx(benchmark, large_xlsx) -> None:
+    result = benchmark.pedantic(
+        lambda: asyncio.run(read_spreadsheet(str(large_xlsx))), rounds=3, warmup_rounds=1
+    )
+    assert "10000 righe" in result
+
+
+def test_html_to_text_saved_page(benchmark, saved_page: str) -> None:
+    result = benchmark(html_to_text, saved_page)
+    assert "Section 199" in result
+    assert "var x" not in result
+
+
+@pytest.mark.parametrize("code", ["result = 1 + 1", "result = pd.Series([1, 2]).sum()"])
+def test_python_repl_startup(benchmark, code: str) -> None:
+    result = benchmark(lambda: asyncio.run(python_repl(code)))
+    assert result in ("2", "3")
+
+
+def test_passage_index_build_long_page(benchmark, saved_page: str) -> None:
+    text = html_to_text(saved_page)
+    index = benchmark(PassageIndex, text)
+    assert len(index) > 10
+
+
+def test_passage_index_query(benchmark, saved_page: str) -> None:
+    index = PassageIndex(html_to_text(saved_page))
+    result = benchmark(index.search, "Section 199 details", 3)
+    assert any("199" in passage.text for passage in result)
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("module", ["react_agent", "react_agent.gaia_runner_v2"])
+def test_cold_import_time(benchmark, module: str) -> None:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    benchmark.pedantic(
+        lambda: subprocess.run([sys.executable, "-c", f"import {module}"], env=env, check=True),
+        rounds=5,
+        warmup_rounds=1,
+    )
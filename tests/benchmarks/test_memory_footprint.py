@@ -0,0 +1,14 @@
+import pytest
+
+from tests.benchmarks.memory_footprint import format_report, run_benchmark
+
+
+@pytest.mark.asyncio
+async def test_slim_output_retains_less_memory_per_task() -> None:
+    full, slim = await run_benchmark(tasks=5, tool_chars=50_000)
+
+    assert full.tasks == slim.tasks == 5
+    # Ogni task conserva due risultati da 50 KB in modalità completa
+    assert full.retained_kb_per_task > 90
+    assert slim.retained_kb_per_task < full.retained_kb_per_task / 5
+    assert "retained KB/task" in format_report([full, slim])
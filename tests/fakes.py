@@ -0,0 +1,53 @@
+"""Fake offline per i test: chat model con risposte predefinite."""
+
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Restituisce in sequenza le risposte fornite, ignorando i tool bindati.
+
+    Un'eccezione nella lista viene sollevata al posto della risposta.
+    """
+
+    responses: List[Any]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if isinstance(message, Exception):
+            raise message
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def repl_script(steps: int, final_answer: str = "2") -> List[AIMessage]:
+    """Script con `steps` chiamate a python_repl seguite da una FINAL ANSWER."""
+    responses = [
+        AIMessage(
+            content="I need to compute the sum step by step",
+            tool_calls=[
+                {"name": "python_repl", "args": {"code": f"result = {i} + 1"}, "id": f"call_{i}"}
+            ],
+        )
+        for i in range(steps)
+    ]
+    responses.append(AIMessage(content=f"FINAL ANSWER: {final_answer}"))
+    return responses
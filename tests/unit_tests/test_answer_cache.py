@@ -0,0 +1,128 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from react_agent import answer_cache, gaia_runner_v2, graph_v2
+from react_agent.answer_cache import (
+    NO_ATTACHMENT,
+    AnswerCache,
+    build_key,
+    config_fingerprint,
+    content_hash,
+)
+from react_agent.configuration import Configuration
+from react_agent.gaia_runner_v2 import CleanGAIARunner
+from react_agent.state_v2 import GAIAOutputState
+from react_agent.tool_cache import current_task_cache
+from react_agent.tools import TOOLS
+from tests.fakes import ScriptedChatModel
+
+
+def _key(task_id: str = "t1", attachment_hash: str = NO_ATTACHMENT, **config):
+    return build_key(task_id, "Question?", attachment_hash, Configuration(**config), TOOLS)
+
+
+@pytest.mark.asyncio
+async def test_repeated_task_is_served_from_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    model = ScriptedChatModel(responses=[AIMessage(content="FINAL ANSWER: Paris")])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+    path = str(tmp_path / "answers.sqlite")
+    config = {"configurable": {"model": "fake/strong"}}
+
+    async with CleanGAIARunner(config, answer_cache_path=path) as runner:
+        first = await runner.solve_question("Capital of France?", task_id="cache-1")
+    async with CleanGAIARunner(config, answer_cache_path=path) as runner:
+        second = await runner.solve_question("Capital of France?", task_id="cache-1")
+
+    assert model.calls == 1
+    assert second.submitted_answer == first.submitted_answer == "Paris"
+    assert [m.content for m in second.messages] == [m.content for m in first.messages]
+
+
+@pytest.mark.asyncio
+async def test_configuration_change_is_a_miss(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    model = ScriptedChatModel(responses=[AIMessage(content="FINAL ANSWER: Paris")])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+    path = str(tmp_path / "answers.sqlite")
+
+    for max_search_results in (5, 7):
+        config = {"configurable": {"model": "fake/strong", "max_search_results": max_search_results}}
+        async with CleanGAIARunner(config, answer_cache_path=path) as runner:
+            await runner.solve_question("Capital of France?", task_id="cache-2")
+
+    assert model.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_errors_fall_back_to_solving(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    model = ScriptedChatModel(responses=[AIMessage(content="FINAL ANSWER: Paris")])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+
+    def broken(*args) -> None:
+        raise sqlite3.OperationalError("database is locked")
+
+    config = {"configurable": {"model": "fake/strong"}}
+    async with CleanGAIARunner(config, answer_cache_path=str(tmp_path / "answers.sqlite")) as runner:
+        monkeypatch.setattr(runner.answer_cache, "get", broken)
+        monkeypatch.setattr(runner.answer_cache, "put", broken)
+        result = await runner.solve_question("Capital of France?", task_id="cache-broken")
+
+    assert result.submitted_answer == "Paris"
+
+
+@pytest.mark.asyncio
+async def test_attachment_hashing_does_not_leak_the_task_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    attachment = tmp_path / "data.csv"
+    attachment.write_text("a,b\n1,2\n")
+
+    async def download_gaia_file(task_id: str) -> str:
+        """Download finto."""
+        return str(attachment if task_id == "with-file" else tmp_path / "missing.csv")
+
+    monkeypatch.setattr(gaia_runner_v2, "TOOLS", [download_gaia_file])
+    config = {"configurable": {"model": "fake/strong"}}
+    async with CleanGAIARunner(config, answer_cache_path=str(tmp_path / "answers.sqlite")) as runner:
+        assert await runner._answer_cache_key("Q?", "with-file", "data.csv") is not None
+        assert current_task_cache.get() is None
+        assert await runner._answer_cache_key("Q?", "no-file", "data.csv") is None
+        assert current_task_cache.get() is None
+
+
+def test_fingerprint_covers_the_agent_prompts(monkeypatch: pytest.MonkeyPatch) -> None:
+    before = config_fingerprint(Configuration())
+    monkeypatch.setattr(answer_cache, "AGENT_PROMPTS", ("changed",))
+
+    assert config_fingerprint(Configuration()) != before
+
+
+def test_key_components_and_invalidation() -> None:
+    cache = AnswerCache(":memory:")
+    output = GAIAOutputState(submitted_answer="42")
+    cache.put(_key("t1"), output)
+    cache.put(_key("t2"), output)
+    cache.put(_key("t1", max_search_results=3), output)
+
+    assert _key(attachment_hash=content_hash(b"a")) != _key(attachment_hash=content_hash(b"b"))
+    assert cache.get(_key("t1", local_search_index="elsewhere.sqlite")) is None
+    cache.put(_key("t3", local_search_index="here.sqlite"), output)
+    assert cache.get(_key("t3", local_search_index="elsewhere.sqlite")) is not None
+    # Impostazioni solo operative: stessa risposta, nessun miss
+    assert cache.get(_key(
+        "t1",
+        artifact_dir="/tmp/elsewhere",
+        default_tool_timeout=5.0,
+        deadline_reserve_seconds=1.0,
+        provider_concurrency={"openai": 1},
+        executor_workers={"io": 2},
+    )) is not None
+
+    assert cache.invalidate(config_fingerprint=config_fingerprint(Configuration(max_search_results=3))) == 1
+    assert cache.invalidate(task_id="t1") == 1
+    assert cache.invalidate(task_id="t3") == 1
+    assert len(cache) == 1
+    with pytest.raises(ValueError):
+        cache.invalidate(question="Question?")
@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from react_agent import artifacts, graph_v2
+from react_agent.artifacts import ArtifactStore, clear_artifact_store
+from react_agent.configuration import Configuration
+from react_agent.prompts import SYSTEM_PROMPT
+from react_agent.state_v2 import GAIAInternalState
+from react_agent.tools import ARTIFACT_TOOLS, grep_artifact, read_artifact, tools_for
+from tests.fakes import ScriptedChatModel
+
+PAGE = "intro " * 2000 + "The answer is 42. " + "outro " * 2000
+
+
+def test_store_reads_slices_and_greps(tmp_path: Path) -> None:
+    store = ArtifactStore(str(tmp_path / "task"))
+    handle = store.put("extract_text_from_url", PAGE)
+
+    assert store.put("extract_text_from_url", PAGE) == handle
+    chunk, total = store.read(handle, offset=12000, length=20)
+    assert chunk == "The answer is 42. ou"
+    assert total == len(PAGE)
+    assert len(store.read(handle, length=10**6)[0]) == 8000
+
+    [(offset, text)] = list(store.grep(handle, r"answer is \d+", context_chars=6))
+    assert offset == 12004 and text == "o The answer is 42. outr"
+
+    with pytest.raises(KeyError):
+        store.get("../etc/passwd")
+    store.clear()
+    assert not (tmp_path / "task").exists()
+
+
+@pytest.mark.asyncio
+async def test_long_tool_output_reaches_model_as_preview(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def extract_text_from_url(url: str) -> str:
+        """Testo di una pagina"""
+        return PAGE
+
+    model = ScriptedChatModel(responses=[
+        AIMessage(content="", tool_calls=[{"name": "extract_text_from_url", "args": {"url": "u"}, "id": "c1"}]),
+        AIMessage(content="FINAL ANSWER: 42"),
+    ])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+    graph = graph_v2.create_tracked_graph(tools=[extract_text_from_url, read_artifact, grep_artifact])
+    config = {"configurable": {"artifact_dir": str(tmp_path), "artifact_preview_chars": 100}}
+
+    try:
+        result = await graph.ainvoke(GAIAInternalState(messages=[("user", "Q?")], task_id="art-1"), config)
+        tool_message = next(m for m in result["messages"] if isinstance(m, ToolMessage))
+        handle = tool_message.content.split()[1].rstrip(":")
+
+        assert len(tool_message.content) < 500
+        assert handle.startswith("extract_text_from_url-")
+        assert (tmp_path / "art-1" / f"{handle}.txt").read_text(encoding="utf-8") == PAGE
+    finally:
+        clear_artifact_store("art-1")
+    assert not (tmp_path / "art-1").exists()
+
+
+@pytest.mark.asyncio
+async def test_artifact_tools_without_store() -> None:
+    assert (await read_artifact("missing")).startswith("Error")
+    assert (await grep_artifact("missing", "x")).startswith("Error")
+
+
+@pytest.mark.asyncio
+async def test_artifact_tools_offered_only_with_store() -> None:
+    def names(tools: list) -> set:
+        return {tool.__name__ for tool in tools}
+
+    # Grafo v1: nessuno store, i tool *_artifact non vengono offerti
+    assert not names(await tools_for(Configuration())) & ARTIFACT_TOOLS
+    assert ARTIFACT_TOOLS <= names(await graph_v2.tracked_tools_for(Configuration()))
+    assert not names(await graph_v2.tracked_tools_for(Configuration(artifact_threshold_chars=0))) & ARTIFACT_TOOLS
+    assert "search_artifact" not in SYSTEM_PROMPT
+    assert "tables=True" not in SYSTEM_PROMPT
+
+
+def test_search_across_task_artifacts(tmp_path: Path) -> None:
+    store = ArtifactStore(str(tmp_path / "task"))
+    page = store.put("extract_text_from_url", PAGE)
+    store.put("transcribe_audio", "words " * 3000 + "the speaker mentions seventeen horses " + "words " * 3000)
+
+    [(handle, passage)] = store.search("how many horses", top_k=1)
+    assert handle.startswith("transcribe_audio-") and "seventeen horses" in passage.text
+
+    [(handle, passage)] = store.search("answer", handle=page, top_k=1)
+    assert handle == page and "The answer is 42." in passage.text
+
+
+def test_passage_indexes_read_from_disk_and_are_bounded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(artifacts, "MAX_PASSAGE_INDEXES", 1)
+    store = ArtifactStore(str(tmp_path / "task"))
+    text = "città è già qui\r\n" * 400 + "il cavallo si chiama Furia " + "perché sì\n" * 400
+    handle = store.put("transcribe_audio", text)
+    other = store.put("extract_text_from_url", PAGE)
+
+    assert len(artifacts._INDEXES) == 1
+    assert all(index.text is None for index, _ in artifacts._INDEXES.values())
+    [(_, passage)] = store.search("cavallo Furia", handle=handle, top_k=1)
+    assert passage.text == text[passage.start:passage.end] and "Furia" in passage.text
+    [(_, passage)] = store.search("answer", handle=other, top_k=1)
+    assert "The answer is 42." in passage.text
+
+    store.clear()
+    assert not artifacts._INDEXES
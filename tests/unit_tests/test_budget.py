@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from react_agent import graph_v2
+from react_agent.configuration import Configuration
+from react_agent.state_v2 import GAIAInternalState
+from tests.fakes import ScriptedChatModel, repl_script
+
+
+def test_budget_derived_from_level() -> None:
+    configuration = Configuration()
+    start = datetime(2025, 1, 1, 12, 0, 0)
+    state = GAIAInternalState(difficulty_level=3, start_time=start)
+
+    step_budget, deadline = graph_v2.resolve_task_budget(state, configuration)
+
+    assert step_budget == configuration.step_budget_by_level[3]
+    assert deadline == start + timedelta(seconds=configuration.time_budget_by_level[3])
+
+
+@pytest.mark.asyncio
+async def test_step_budget_forces_final_answer(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Il modello chiederebbe tool all'infinito: il budget deve chiudere la task
+    model = ScriptedChatModel(responses=repl_script(steps=50)[:-1])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+
+    result = await graph_v2.tracked_graph.ainvoke(
+        GAIAInternalState(messages=[("user", "Loop forever")], task_id="budget", step_budget=3)
+    )
+
+    assert result["model_steps"] == 3
+    assert result["budget_exhausted"]
+    assert not result["messages"][-1].tool_calls
+    assert "FINAL ANSWER:" in result["messages"][-1].content
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_on_the_forced_turn_get_one_more_ask(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Il turno forzato risponde ancora con tool calls: si richiede la risposta una volta
+    model = ScriptedChatModel(responses=[*repl_script(steps=2)[:-1], AIMessage(content="FINAL ANSWER: 4")])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+
+    result = await graph_v2.tracked_graph.ainvoke(
+        GAIAInternalState(messages=[("user", "Two plus two?")], task_id="budget-retry", step_budget=2)
+    )
+
+    assert model.calls == 3
+    assert result["budget_exhausted"]
+    assert result["clean_output"].submitted_answer == "4"
+    assert result["error_count"] == 0
+
+
+def test_forced_turn_disables_tool_use() -> None:
+    class Recorder:
+        def bind_tools(self, tools, **kwargs):
+            return kwargs
+
+    assert graph_v2.bind_tools_for_step(Recorder(), [], "openai/gpt-4o", True) == {"tool_choice": "none"}
+    assert graph_v2.bind_tools_for_step(Recorder(), [], "anthropic/claude", True) == {"tool_choice": {"type": "none"}}
+    assert graph_v2.bind_tools_for_step(Recorder(), [], "openai/gpt-4o", False) == {}
+
+
+@pytest.mark.asyncio
+async def test_deadline_forces_final_answer(monkeypatch: pytest.MonkeyPatch) -> None:
+    model = ScriptedChatModel(responses=repl_script(steps=50)[:-1])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+
+    result = await graph_v2.tracked_graph.ainvoke(
+        GAIAInternalState(
+            messages=[("user", "Loop forever")],
+            task_id="deadline",
+            deadline=datetime.now() - timedelta(seconds=1),
+        )
+    )
+
+    assert result["model_steps"] == 1
+    assert result["budget_exhausted"]
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from react_agent import utils
+from react_agent.cassettes import CassetteMissError, recordable_tool, use_cassette
+from react_agent.gaia_runner_v2 import CleanGAIARunner
+from tests.fakes import ScriptedChatModel, repl_script
+
+
+def _runner() -> CleanGAIARunner:
+    return CleanGAIARunner({"configurable": {"model": "fake/strong"}})
+
+
+@pytest.mark.asyncio
+async def test_recorded_run_replays_offline(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "run.json"
+    fake = ScriptedChatModel(responses=repl_script(1, final_answer="42"))
+    monkeypatch.setattr(utils, "init_chat_model", lambda *args, **kwargs: fake)
+
+    with use_cassette(str(path), "record"):
+        recorded = await _runner().solve_question("What is 41 + 1?", task_id="cassette-1")
+
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    assert len(entries["model"]) == 2
+    assert len(entries["tool"]) == 1
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("replay must not build the real model")
+
+    monkeypatch.setattr(utils, "init_chat_model", no_network)
+    with use_cassette(str(path), "replay"):
+        replayed = await _runner().solve_question("What is 41 + 1?", task_id="cassette-1")
+
+    assert recorded.submitted_answer == "42"
+    assert replayed.submitted_answer == recorded.submitted_answer
+    assert replayed.tools_used == recorded.tools_used
+
+
+@pytest.mark.asyncio
+async def test_tool_replay_skips_the_real_call(tmp_path) -> None:
+    calls: list[str] = []
+
+    @recordable_tool
+    async def lookup(query: str) -> str:
+        """Lookup finto."""
+        calls.append(query)
+        return f"result for {query}"
+
+    path = str(tmp_path / "tools.json")
+    with use_cassette(path, "record"):
+        assert await lookup("GAIA") == "result for GAIA"
+        # Il file viene scritto solo all'uscita dal blocco
+        assert not (tmp_path / "tools.json").exists()
+    with use_cassette(path, "replay"):
+        assert await lookup(query="GAIA") == "result for GAIA"
+        with pytest.raises(CassetteMissError):
+            await lookup("other")
+        # Una chiamata in più di quelle registrate: la run diverge
+        with pytest.raises(CassetteMissError):
+            await lookup("GAIA")
+
+    assert calls == ["GAIA"]
+    assert lookup.__name__ == "lookup"
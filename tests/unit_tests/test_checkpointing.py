@@ -0,0 +1,62 @@
+import pytest
+
+from react_agent import graph_v2
+from react_agent.gaia_runner_v2 import CleanGAIARunner
+from tests.fakes import ScriptedChatModel, repl_script
+
+
+@pytest.mark.asyncio
+async def test_restarted_runner_resumes_from_last_step(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    path = str(tmp_path / "checkpoints.sqlite")
+    first_step, final_step = repl_script(steps=1)
+
+    # Primo processo: il modello "crasha" dopo il primo tool
+    crashing = ScriptedChatModel(responses=[first_step, RuntimeError("process killed")])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: crashing)
+    async with CleanGAIARunner(checkpoint_path=path) as runner:
+        crashed = await runner.solve_question("What is 1 + 1?", task_id="resume-1")
+    assert crashed.submitted_answer == "ERROR"
+
+    # Runner riavviato: riparte dalla chiamata al modello, senza rifare il primo step
+    resumed = ScriptedChatModel(responses=[final_step])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: resumed)
+    async with CleanGAIARunner(checkpoint_path=path) as runner:
+        result = await runner.solve_question("What is 1 + 1?", task_id="resume-1")
+
+    assert result.submitted_answer == "2"
+    assert resumed.calls == 1
+    assert result.tools_used == ["python_repl"]
+
+    # Task già conclusa: l'output viene dal checkpoint
+    async with CleanGAIARunner(checkpoint_path=path) as runner:
+        again = await runner.solve_question("What is 1 + 1?", task_id="resume-1")
+    assert again.submitted_answer == "2"
+    assert resumed.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_artifacts_survive_until_resumed_task_completes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    path = str(tmp_path / "checkpoints.sqlite")
+    artifact_dir = tmp_path / "artifacts"
+    config = {"configurable": {"artifact_dir": str(artifact_dir), "artifact_threshold_chars": 10}}
+    first_step, final_step = repl_script(steps=1)
+    first_step.tool_calls[0]["args"]["code"] = "result = 'x' * 100"
+
+    crashing = ScriptedChatModel(responses=[first_step, RuntimeError("process killed")])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: crashing)
+    async with CleanGAIARunner(config=config, checkpoint_path=path) as runner:
+        crashed = await runner.solve_question("What is 1 + 1?", task_id="resume-2")
+    assert crashed.submitted_answer == "ERROR"
+    # Il checkpoint cita l'artifact del primo tool: deve esistere ancora
+    assert list((artifact_dir / "resume-2").glob("python_repl-*.txt"))
+
+    resumed = ScriptedChatModel(responses=[final_step])
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: resumed)
+    async with CleanGAIARunner(config=config, checkpoint_path=path) as runner:
+        result = await runner.solve_question("What is 1 + 1?", task_id="resume-2")
+    assert result.submitted_answer == "2"
+    assert not (artifact_dir / "resume-2").exists()
@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import time
+
+import pytest
+from langchain_core.runnables.config import var_child_runnable_config
+
+from react_agent.deadlines import (
+    ToolTimeoutError,
+    deadline_scope,
+    remaining,
+    run_subprocess,
+    with_deadline,
+)
+from react_agent.tools import TOOLS
+
+python_repl = next(tool for tool in TOOLS if tool.__name__ == "python_repl")
+
+
+@pytest.fixture
+def short_timeouts():
+    token = var_child_runnable_config.set(
+        {"configurable": {"tool_timeouts": {"python_repl": 1.0, "slow_tool": 0.2}}}
+    )
+    yield
+    var_child_runnable_config.reset(token)
+
+
+def test_nested_scope_never_extends_deadline() -> None:
+    assert remaining() is None
+    with deadline_scope(1.0):
+        with deadline_scope(60.0) as seconds:
+            assert seconds <= 1.0
+            assert remaining(30.0) <= 1.0
+    assert remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_slow_tool_returns_timeout_result(short_timeouts) -> None:
+    @with_deadline
+    async def slow_tool(query: str) -> str:
+        """Tool lento"""
+        await asyncio.sleep(10)
+        return "done"
+
+    start = time.monotonic()
+    result = await slow_tool("x")
+
+    assert result.startswith("Error: slow_tool timed out")
+    assert time.monotonic() - start < 1
+    assert slow_tool.__doc__ == "Tool lento"
+
+
+@pytest.mark.asyncio
+async def test_subprocess_is_killed_at_deadline() -> None:
+    start = time.monotonic()
+    with pytest.raises(ToolTimeoutError):
+        await run_subprocess([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.3)
+    assert time.monotonic() - start < 3
+
+
+@pytest.mark.asyncio
+async def test_python_repl_runs_out_of_process(short_timeouts) -> None:
+    assert await python_repl(code="print('noise')\nresult = 40 + 2") == "42"
+    assert (await python_repl(code="import sys; sys.exit(3)")).startswith("Errore nell'esecuzione")
+
+    # I moduli dell'agente (tables.py, utils.py, ...) non oscurano le librerie dell'utente
+    shadowing = (
+        "import os, sys\n"
+        "result = False\n"
+        "for entry in sys.path:\n"
+        "    result = result or os.path.isfile(os.path.join(entry or '.', 'repl_worker.py'))"
+    )
+    assert await python_repl(code=shadowing) == "False"
+
+    start = time.monotonic()
+    result = await python_repl(code="while True:\n    pass")
+    assert result.startswith("Error: python_repl timed out")
+    assert time.monotonic() - start < 4
+
+
+@pytest.mark.asyncio
+async def test_transcript_fetch_gets_an_http_timeout_from_the_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    import requests
+    import youtube_transcript_api
+
+    from react_agent.tools import get_youtube_transcript
+
+    timeouts: list = []
+    monkeypatch.setattr(requests.Session, "request", lambda self, *a, **kw: timeouts.append(kw["timeout"]))
+
+    class FakeApi:
+        def __init__(self, http_client) -> None:
+            self.http_client = http_client
+
+        def fetch(self, video_id, languages):
+            self.http_client.get(f"https://www.youtube.com/watch?v={video_id}")
+            return [type("Snippet", (), {"text": "hello"})()]
+
+    monkeypatch.setattr(youtube_transcript_api, "YouTubeTranscriptApi", FakeApi)
+    with deadline_scope(5.0):
+        assert await get_youtube_transcript("https://youtu.be/abcdefghijk") == "hello"
+
+    assert len(timeouts) == 1 and 0 < timeouts[0] <= 5.0
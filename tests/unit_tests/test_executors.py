@@ -0,0 +1,77 @@
+import asyncio
+import contextvars
+import time
+from pathlib import Path
+
+import pytest
+from langchain_core.runnables.config import var_child_runnable_config
+
+from react_agent.executors import (
+    CPU,
+    DOWNLOAD,
+    IO,
+    executor_stats,
+    run_in,
+    shutdown_executors,
+)
+from react_agent.tools import read_spreadsheet
+
+marker: contextvars.ContextVar[str] = contextvars.ContextVar("marker", default="")
+
+
+@pytest.fixture
+def small_pools():
+    shutdown_executors()
+    token = var_child_runnable_config.set(
+        {"configurable": {"executor_workers": {"io": 2, "cpu": 1, "download": 1}}}
+    )
+    yield
+    var_child_runnable_config.reset(token)
+    shutdown_executors()
+
+
+@pytest.mark.asyncio
+async def test_slow_downloads_do_not_starve_other_pools(small_pools) -> None:
+    downloads = [asyncio.ensure_future(run_in(DOWNLOAD, time.sleep, 0.3)) for _ in range(4)]
+    await asyncio.sleep(0.05)
+
+    marker.set("task-1")
+    start = time.perf_counter()
+    assert await run_in(IO, marker.get) == "task-1"
+    assert time.perf_counter() - start < 0.2
+
+    await asyncio.gather(*downloads)
+    stats = executor_stats()
+    assert stats[DOWNLOAD].completed == 4 and stats[DOWNLOAD].peak_queued == 3
+    assert stats[IO].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_spreadsheet_is_parsed_in_the_process_pool(small_pools, tmp_path: Path) -> None:
+    sheet = tmp_path / "sales.csv"
+    sheet.write_text("city,amount\nRome,10\nParis,20\n", encoding="utf-8")
+
+    result = await read_spreadsheet(str(sheet))
+
+    assert "Dimensioni: 2 righe x 2 colonne" in result
+    assert executor_stats()[CPU].completed == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_worker_config_and_abandoned_jobs() -> None:
+    shutdown_executors()
+    token = var_child_runnable_config.set({"configurable": {"executor_workers": {"cpu": 1}}})
+    try:
+        # Le classi non configurate usano i default
+        job = asyncio.ensure_future(run_in(DOWNLOAD, time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        job.cancel()
+        await asyncio.gather(job, return_exceptions=True)
+
+        # Attesa cancellata, lavoro ancora sul worker: resta in flight
+        assert executor_stats()[DOWNLOAD].in_flight == 1
+        await asyncio.sleep(0.3)
+        assert executor_stats()[DOWNLOAD].in_flight == 0
+    finally:
+        var_child_runnable_config.reset(token)
+        shutdown_executors()
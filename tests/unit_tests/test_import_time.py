@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Solo dipendenze che nessun'altra libreria importa al caricamento: aiohttp resta
+# fuori perché langsmith lo carica già (tramite httpx_aiohttp) nelle versioni recenti
+HEAVY_MODULES = ["pandas", "PIL", "langchain_tavily", "bs4"]
+
+
+def _import_in_subprocess(statement: str) -> dict:
+    """Importa in un interprete pulito e riporta stdout e moduli pesanti caricati."""
+    script = (
+        f"{statement}\n"
+        "import json, sys\n"
+        f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    *printed, loaded = result.stdout.strip().splitlines()
+    return {"printed": printed, "loaded": json.loads(loaded)}
+
+
+def test_import_package_is_lazy_and_silent() -> None:
+    result = _import_in_subprocess("import react_agent")
+
+    assert result == {"printed": [], "loaded": []}
+
+
+@pytest.mark.parametrize("module", ["react_agent.tools", "react_agent.gaia_runner_v2"])
+def test_tool_dependencies_load_on_first_use(module: str) -> None:
+    assert _import_in_subprocess(f"import {module}")["loaded"] == []
+
+
+def test_lazy_exports_resolve_to_objects() -> None:
+    import react_agent
+    from react_agent.graph_v2 import tracked_graph
+
+    assert react_agent.tracked_graph is tracked_graph
+    assert type(react_agent.graph).__name__ == "CompiledStateGraph"
+    with pytest.raises(AttributeError):
+        react_agent.not_exported
@@ -0,0 +1,82 @@
+import pytest
+from langchain_core.runnables.config import var_child_runnable_config
+
+from react_agent.configuration import Configuration
+from react_agent.local_search import LocalSearchIndex, best_snippet
+from react_agent.tools import search
+
+MERCEDES = (
+    "Mercedes Sosa was an Argentine singer. Studio albums published between 2000 and 2009 "
+    "include Misa Criolla (2000), Corazón Libre (2005), Cantora 1 (2009) and Cantora 2 (2009)."
+)
+
+
+def test_bm25_ranks_matching_document_first(tmp_path) -> None:
+    index = LocalSearchIndex(str(tmp_path / "index.sqlite"))
+    index.add_document("https://example.org/sosa", "Mercedes Sosa discography", MERCEDES)
+    index.add_document("https://example.org/tango", "Tango", "Tango is a partner dance from Argentina.")
+
+    result = index.search("Mercedes Sosa studio albums")
+
+    assert result["source"] == "local_index"
+    assert result["results"][0]["url"] == "https://example.org/sosa"
+
+
+def test_low_coverage_query_is_a_miss(tmp_path) -> None:
+    index = LocalSearchIndex(str(tmp_path / "index.sqlite"))
+    index.add_document("https://example.org/sosa", "Mercedes Sosa", MERCEDES)
+
+    assert index.search("Beatles studio albums 1965 Abbey Road") is None
+
+
+def test_index_persists_and_updates_incrementally(tmp_path) -> None:
+    path = str(tmp_path / "index.sqlite")
+    index = LocalSearchIndex(path)
+    index.add_document("https://example.org/sosa", "Sosa", "Argentine singer.")
+    index.close()
+
+    reopened = LocalSearchIndex(path)
+    assert reopened.add_document("https://example.org/sosa", "Sosa", MERCEDES)
+    assert not reopened.add_document("https://example.org/sosa", "Sosa", "short snippet")
+    assert len(reopened) == 1
+    assert reopened.search("Cantora albums")["results"][0]["content"] == MERCEDES
+
+
+def test_snippet_centres_on_query_terms() -> None:
+    content = "filler " * 1000 + "Cantora 2009 album" + " filler" * 1000
+
+    assert "Cantora 2009" in best_snippet(content, ["cantora", "2009"], width=200)
+
+
+@pytest.mark.asyncio
+async def test_search_answers_repeat_queries_locally(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    class FakeTavily:
+        def __init__(self, **kwargs) -> None:
+            pass
+
+        async def ainvoke(self, payload: dict) -> dict:
+            calls.append(payload["query"])
+            return {"query": payload["query"], "results": [
+                {"url": "https://example.org/sosa", "title": "Mercedes Sosa", "content": MERCEDES}
+            ]}
+
+    monkeypatch.setattr("langchain_tavily.TavilySearch", FakeTavily)
+    token = var_child_runnable_config.set(
+        {"configurable": {"local_search_index": str(tmp_path / "index.sqlite")}}
+    )
+    try:
+        first = await search("Mercedes Sosa studio albums 2000 2009")
+        second = await search("Mercedes Sosa studio albums 2000 2009")
+    finally:
+        var_child_runnable_config.reset(token)
+
+    assert calls == ["Mercedes Sosa studio albums 2000 2009"]
+    assert "source" not in first
+    assert second["source"] == "local_index"
+
+
+def test_local_index_is_opt_in() -> None:
+    # Nessun file creato nella directory corrente da chi usa la Configuration di default
+    assert Configuration().local_search_index == ""
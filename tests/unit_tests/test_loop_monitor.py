@@ -0,0 +1,91 @@
+import asyncio
+import importlib
+import time
+
+import pytest
+from langchain_core.runnables.config import var_child_runnable_config
+
+from react_agent import loop_monitor
+from react_agent.loop_monitor import LoopMonitor, attributed
+
+
+@attributed
+async def blocking_tool() -> str:
+    """Tool che blocca il loop senza mai cedere il controllo"""
+    time.sleep(0.15)
+    return "done"
+
+
+async def blocking_node() -> None:
+    var_child_runnable_config.set({"metadata": {"langgraph_node": "prepare_output"}})
+    await asyncio.sleep(0)
+    time.sleep(0.12)
+
+
+@pytest.mark.asyncio
+async def test_stalls_are_attributed_to_tool_and_node() -> None:
+    async with LoopMonitor(threshold=0.05, probe_interval=0.01) as monitor:
+        await asyncio.sleep(0.03)
+        await asyncio.gather(blocking_tool(), asyncio.create_task(blocking_node()))
+        await asyncio.sleep(0.03)
+
+    report = monitor.report()
+    assert report.stalls["tool:blocking_tool"].max_seconds >= 0.15
+    assert report.stalls["node:prepare_output"].count == 1
+    assert report.max_lag >= 0.1
+    assert "tool:blocking_tool" in monitor.format_summary()
+
+
+@pytest.mark.asyncio
+async def test_monitor_restores_the_loop_and_is_exclusive() -> None:
+    original = asyncio.events.Handle._run
+    async with LoopMonitor():
+        with pytest.raises(RuntimeError):
+            LoopMonitor().start()
+    assert asyncio.events.Handle._run is original
+
+
+@pytest.mark.asyncio
+async def test_failed_benchmark_run_removes_the_loop_patch(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Il package esporta la funzione con lo stesso nome del modulo
+    benchmark = importlib.import_module("react_agent.run_gaia_benchmark_v2")
+
+    async def failing_fetch() -> list:
+        raise RuntimeError("questions API down")
+
+    monkeypatch.setattr(benchmark, "fetch_all_questions", failing_fetch)
+    with pytest.raises(RuntimeError):
+        await benchmark.run_gaia_benchmark_v2(monitor_event_loop=True)
+
+    assert asyncio.events.Handle._run is loop_monitor._ORIGINAL_RUN
+    async with LoopMonitor():
+        pass
+
+
+@pytest.mark.asyncio
+async def test_failed_benchmark_run_closes_clients_and_caches_are_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    benchmark = importlib.import_module("react_agent.run_gaia_benchmark_v2")
+    closed = []
+
+    class FakeRunner:
+        def __init__(self, config, answer_cache_path=None):
+            self.config, self.answer_cache_path = config, answer_cache_path
+
+        async def aclose(self):
+            closed.append(self)
+
+    async def failing_fetch() -> list:
+        raise RuntimeError("questions API down")
+
+    async def aclose_clients():
+        closed.append("clients")
+
+    monkeypatch.setattr(benchmark, "CleanGAIARunner", FakeRunner)
+    monkeypatch.setattr(benchmark, "fetch_all_questions", failing_fetch)
+    monkeypatch.setattr(benchmark, "aclose_clients", aclose_clients)
+    with pytest.raises(RuntimeError):
+        await benchmark.run_gaia_benchmark_v2()
+
+    [runner, clients] = closed
+    assert clients == "clients" and runner.answer_cache_path is None
+    assert runner.config["configurable"]["local_search_index"] == ""
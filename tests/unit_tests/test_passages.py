@@ -0,0 +1,23 @@
+from react_agent.passages import PassageIndex, chunk_spans
+
+FILLER = "The committee discussed the budget for the coming year at length. " * 40
+
+
+def test_chunks_cover_text_without_cutting_words() -> None:
+    spans = chunk_spans(FILLER, chunk_chars=300, overlap=50)
+
+    assert spans[0][0] == 0 and spans[-1][1] == len(FILLER)
+    assert all(prev_end > start for (_, prev_end), (start, _) in zip(spans, spans[1:]))
+    assert all(end == len(FILLER) or FILLER[end] == " " for _, end in spans)
+    assert all(start == 0 or FILLER[start - 1] == " " for start, _ in spans)
+
+
+def test_search_returns_the_passage_with_the_fact() -> None:
+    text = FILLER + "The keynote speaker was Dr. Ada Lovelace from London. " + FILLER
+    index = PassageIndex(text)
+
+    [best, *_] = index.search("who was the keynote speaker", top_k=2)
+
+    assert "Ada Lovelace" in best.text
+    assert text[best.start:best.end] == best.text
+    assert len(best.text) <= 800
@@ -0,0 +1,73 @@
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from react_agent import prompts
+from react_agent.state import State
+from react_agent.utils import (
+    build_cacheable_messages,
+    format_static_system_prompt,
+    get_prompt_token_usage,
+)
+from tests.fakes import ScriptedChatModel
+
+# Il package esporta `graph` come grafo compilato: serve il modulo
+graph = importlib.import_module("react_agent.graph")
+
+
+def test_prefix_is_stable_across_steps() -> None:
+    system = format_static_system_prompt(prompts.SYSTEM_PROMPT)
+    history = [HumanMessage(content="Question?")]
+
+    first = build_cacheable_messages(system, history, "openai/gpt-4o", "System time: 1")
+    second = build_cacheable_messages(
+        system, [*history, AIMessage(content="Thinking")], "openai/gpt-4o", "System time: 2"
+    )
+
+    # Solo il contesto volatile in coda cambia: il prefisso resta identico
+    assert first[:-1] == second[: len(first) - 1]
+    assert second[-1] == {"role": "user", "content": "System time: 2"}
+
+
+def test_anthropic_gets_cache_breakpoints() -> None:
+    messages = build_cacheable_messages(
+        "static", [HumanMessage(content="Question?")], "anthropic/claude-sonnet-4-5"
+    )
+
+    assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert messages[-1].content[0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_prompt_token_usage_reads_cache_hits() -> None:
+    message = AIMessage(
+        content="",
+        usage_metadata={
+            "input_tokens": 2000,
+            "output_tokens": 10,
+            "total_tokens": 2010,
+            "input_token_details": {"cache_read": 1536},
+        },
+    )
+
+    assert get_prompt_token_usage(message) == (2000, 1536)
+
+
+@pytest.mark.asyncio
+async def test_v1_turn_ends_with_the_conversation(monkeypatch: pytest.MonkeyPatch) -> None:
+    sent = []
+
+    class RecordingModel(ScriptedChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            sent.append(messages)
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+    model = RecordingModel(responses=[AIMessage(content="FINAL ANSWER: 4")])
+    monkeypatch.setattr(graph, "load_chat_model", lambda name: model)
+
+    await graph.call_model(State(messages=[HumanMessage(content="2 + 2?")]))
+
+    # Nessun messaggio utente con l'orario in coda: la data è nel system prompt
+    [messages] = sent
+    assert [m.type for m in messages] == ["system", "human"]
+    assert messages[-1].content == "2 + 2?"
@@ -0,0 +1,69 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables.config import var_child_runnable_config
+
+from react_agent import provider_clients
+from react_agent.tools import transcribe_audio
+
+
+class FakeOpenAI:
+    """Client finto: conta le richieste concorrenti"""
+
+    instances = 0
+
+    def __init__(self) -> None:
+        FakeOpenAI.instances += 1
+        self.active = 0
+        self.peak = 0
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return f"transcript of {kwargs['file'][0]}"
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_tools_share_one_client_within_the_provider_cap(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(provider_clients.CLIENT_FACTORIES, "openai", FakeOpenAI)
+    FakeOpenAI.instances = 0
+    audio = tmp_path / "clip.mp3"
+    audio.write_bytes(b"ID3")
+    token = var_child_runnable_config.set({"configurable": {"provider_concurrency": {"openai": 2}}})
+    try:
+        results = await asyncio.gather(*(transcribe_audio(str(audio)) for _ in range(6)))
+        client = provider_clients.get_client("openai")
+    finally:
+        var_child_runnable_config.reset(token)
+        await provider_clients.aclose_clients()
+
+    assert all("transcript of clip.mp3" in result for result in results)
+    assert FakeOpenAI.instances == 1
+    assert client.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_provider_limit_is_fixed_at_first_use() -> None:
+    first = var_child_runnable_config.set({"configurable": {"provider_concurrency": {"openai": 2}}})
+    try:
+        semaphore, limit = provider_clients._semaphore("openai")
+    finally:
+        var_child_runnable_config.reset(first)
+
+    second = var_child_runnable_config.set({"configurable": {"provider_concurrency": {"openai": 5}}})
+    try:
+        # Un'altra Configuration non sostituisce il semaforo: il tetto resta globale
+        assert provider_clients._semaphore("openai") == (semaphore, limit) and limit == 2
+    finally:
+        var_child_runnable_config.reset(second)
+        await provider_clients.aclose_clients()
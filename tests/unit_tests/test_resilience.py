@@ -0,0 +1,201 @@
+import asyncio
+
+import anthropic
+import httpx
+import openai
+import pytest
+from aiohttp import web
+from langchain_core.messages import AIMessage
+
+from react_agent import provider_clients, resilience
+from react_agent.deadlines import deadline_scope
+from react_agent.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientChatModel,
+    RetryableError,
+    RetryBudget,
+    RetryPolicy,
+    http_request,
+    parse_retry_after,
+    with_retries,
+)
+from tests.fakes import ScriptedChatModel
+
+
+@pytest.fixture(autouse=True)
+def no_real_sleep(monkeypatch: pytest.MonkeyPatch) -> list:
+    delays: list = []
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(resilience, "_sleep", fake_sleep)
+    resilience.reset_endpoints()
+    return delays
+
+
+def _flaky(failures: list):
+    calls = {"count": 0}
+
+    async def call() -> str:
+        calls["count"] += 1
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    return call, calls
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors_honouring_retry_after(no_real_sleep: list) -> None:
+    call, calls = _flaky([RetryableError("429", status=429, retry_after=2), RetryableError("503", status=503)])
+
+    assert await with_retries("api", call) == "ok"
+    assert calls["count"] == 3
+    assert 2 <= no_real_sleep[0] <= 2 + resilience.DEFAULT_POLICY.base_delay
+
+
+@pytest.mark.asyncio
+async def test_non_transient_errors_are_not_retried() -> None:
+    call, calls = _flaky([ValueError("bad request")])
+
+    with pytest.raises(ValueError):
+        await with_retries("api", call)
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_provider_connection_errors_are_retried() -> None:
+    request = httpx.Request("POST", "https://api.example.com/v1")
+    call, calls = _flaky([
+        openai.APIConnectionError(request=request),
+        openai.APITimeoutError(request=request),
+        anthropic.APIConnectionError(request=request),
+        httpx.ConnectTimeout("connect timeout", request=request),
+    ])
+    resilience.get_endpoint("provider").budget = RetryBudget(ratio=0.0, reserve=10)
+
+    assert await with_retries("provider", call, RetryPolicy(max_attempts=5)) == "ok"
+    assert calls["count"] == 5
+
+
+def test_parse_retry_after_seconds_and_http_date() -> None:
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_circuit_breaker_opens_and_probes_after_timeout() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()  # una sola richiesta di prova
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast() -> None:
+    endpoint = resilience.get_endpoint("down")
+    endpoint.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    call, calls = _flaky([RetryableError("503", status=503)] * 10)
+
+    with pytest.raises(RetryableError):
+        await with_retries("down", call)
+    with pytest.raises(CircuitOpenError):
+        await with_retries("down", call)
+    assert calls["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_releases_the_breaker() -> None:
+    now = [0.0]
+    endpoint = resilience.get_endpoint("probe")
+    endpoint.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    endpoint.breaker.record_failure()
+    now[0] = 10.0
+
+    async def hang() -> str:
+        await asyncio.sleep(10)
+        return "late"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(with_retries("probe", hang), timeout=0.01)
+    call, _ = _flaky([])
+    assert await with_retries("probe", call) == "ok"
+    assert endpoint.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_retries() -> None:
+    resilience.get_endpoint("limited").budget = RetryBudget(ratio=0.0, reserve=1)
+    call, calls = _flaky([RetryableError("429", status=429)] * 10)
+
+    with pytest.raises(RetryableError):
+        await with_retries("limited", call)
+    assert calls["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_http_request_retries_rate_limited_server() -> None:
+    hits = {"count": 0}
+
+    async def handler(request: web.Request) -> web.Response:
+        hits["count"] += 1
+        if hits["count"] == 1:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        response = await http_request("GET", f"http://127.0.0.1:{port}/")
+        session = provider_clients.get_client("http")
+        await http_request("GET", f"http://127.0.0.1:{port}/")
+        # Retry e richieste successive riusano la stessa sessione del loop
+        assert provider_clients.get_client("http") is session
+    finally:
+        await provider_clients.aclose_clients()
+        await runner.cleanup()
+
+    assert session.closed
+    assert response.status == 200
+    assert response.json() == {"ok": True}
+    assert hits["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_resilient_chat_model_retries_provider_errors() -> None:
+    inner = ScriptedChatModel(
+        responses=[RetryableError("429", status=429), AIMessage(content="FINAL ANSWER: 4")]
+    )
+    model = ResilientChatModel(inner=inner, endpoint="fake").bind_tools([])
+
+    response = await model.ainvoke("2 + 2?")
+
+    assert response.content == "FINAL ANSWER: 4"
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_no_retry_past_the_tool_deadline(no_real_sleep: list) -> None:
+    call, calls = _flaky([RetryableError("429", status=429, retry_after=5)])
+
+    with deadline_scope(1.0):
+        with pytest.raises(RetryableError):
+            await with_retries("api", call)
+
+    assert calls["count"] == 1
+    assert no_real_sleep == []
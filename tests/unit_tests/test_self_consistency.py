@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatResult
+
+from react_agent import graph_v2
+from react_agent.gaia_runner_v2 import (
+    CleanGAIARunner,
+    normalize_answer,
+    vote_on_answers,
+)
+from react_agent.state_v2 import GAIAOutputState
+from tests.fakes import ScriptedChatModel
+
+
+class DelayedScriptedChatModel(ScriptedChatModel):
+    """Come ScriptedChatModel, ma ogni risposta arriva dopo il ritardo indicato."""
+
+    delays: List[float]
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        result = self._generate(messages, stop)
+        await asyncio.sleep(delay)
+        return result
+
+
+def test_normalize_answer_ignores_formatting() -> None:
+    assert normalize_answer(" Paris. ") == normalize_answer("paris")
+    assert normalize_answer("1,000") == normalize_answer("1000.0")
+    assert normalize_answer("a,b") == normalize_answer("A, b")
+
+
+def test_normalize_answer_keeps_distinct_numbers_and_lists_apart() -> None:
+    assert normalize_answer("1234567") != normalize_answer("1234568")
+    assert normalize_answer("1,234,567") == normalize_answer("1234567.00")
+    assert normalize_answer("1,2,3") == normalize_answer("1, 2, 3") == "1, 2, 3"
+    assert normalize_answer("1,2,3") != normalize_answer("123")
+    assert normalize_answer("1.50, 2") == normalize_answer("1.5,2.0")
+
+
+def test_vote_ignores_failed_runs() -> None:
+    outputs = [
+        GAIAOutputState(submitted_answer="ERROR"),
+        GAIAOutputState(submitted_answer="Rome", confidence=0.9),
+        GAIAOutputState(submitted_answer="paris", confidence=0.6),
+        GAIAOutputState(submitted_answer="Paris.", confidence=0.7),
+    ]
+
+    winner, votes = vote_on_answers(outputs)
+
+    assert winner.submitted_answer == "Paris."
+    assert votes == 2
+
+
+@pytest.mark.asyncio
+async def test_quorum_stops_remaining_runs(monkeypatch: pytest.MonkeyPatch) -> None:
+    model = DelayedScriptedChatModel(
+        responses=[
+            AIMessage(content="FINAL ANSWER: Paris"),
+            AIMessage(content="FINAL ANSWER: paris."),
+            AIMessage(content="FINAL ANSWER: Rome"),
+        ],
+        delays=[0.01, 0.02, 5.0],
+    )
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+    runner = CleanGAIARunner(
+        {"configurable": {"model": "fake/strong", "self_consistency_runs": 3}}
+    )
+
+    result = await asyncio.wait_for(
+        runner.solve_question("Capital of France?", task_id="vote-1"), timeout=2
+    )
+
+    assert normalize_answer(result.submitted_answer) == "paris"
+    assert result.processing_time < 2
+    assert model.calls == 3
@@ -0,0 +1,72 @@
+from collections import Counter
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from react_agent import graph_v2
+from react_agent.state_v2 import GAIAInternalState, GAIAOutputState, merge_unique
+from tests.fakes import ScriptedChatModel, repl_script
+
+
+def test_merge_unique_keeps_order() -> None:
+    assert merge_unique(["search", "python_repl"], ["python_repl", "analyze_file"]) == [
+        "search",
+        "python_repl",
+        "analyze_file",
+    ]
+
+
+async def _checkpoint_writes(monkeypatch: pytest.MonkeyPatch, steps: int) -> Counter:
+    model = ScriptedChatModel(responses=repl_script(steps))
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+    saver = InMemorySaver()
+    graph = graph_v2.create_tracked_graph(checkpointer=saver)
+
+    result = await graph.ainvoke(
+        GAIAInternalState(messages=[("user", "What is 1 + 1?")], task_id="t-1", step_budget=100),
+        {"configurable": {"thread_id": f"growth-{steps}"}, "recursion_limit": 200},
+    )
+    assert result["clean_output"].submitted_answer == "2"
+    assert result["tools_used"] == ["python_repl"]
+    assert len(result["reasoning_steps"]) == steps
+
+    # Byte serializzati per canale, sommati su tutte le versioni scritte
+    written: Counter = Counter()
+    for (_, _, channel, _), (_, blob) in saver.blobs.items():
+        written[channel] += len(blob)
+    return written
+
+
+@pytest.mark.asyncio
+async def test_metadata_not_rewritten_each_step(monkeypatch: pytest.MonkeyPatch) -> None:
+    short = await _checkpoint_writes(monkeypatch, steps=5)
+    long = await _checkpoint_writes(monkeypatch, steps=40)
+
+    # I metadati statici vengono scritti una sola volta, indipendentemente dai passi
+    for channel in ("task_id", "file_name", "start_time", "difficulty_level", "confidence"):
+        assert long[channel] == short[channel]
+    # tools_used cambia solo al primo utilizzo del tool
+    assert long["tools_used"] == short["tools_used"]
+
+
+def test_state_classes_have_no_instance_dict() -> None:
+    assert not hasattr(GAIAInternalState(), "__dict__")
+    assert not hasattr(GAIAOutputState(), "__dict__")
+
+
+def test_slim_messages_cut_only_long_tool_outputs() -> None:
+    messages = [
+        HumanMessage(content="question"),
+        AIMessage(content="x" * 500),
+        ToolMessage(content="short", tool_call_id="a"),
+        ToolMessage(content="y" * 1000, tool_call_id="b"),
+    ]
+
+    slim = graph_v2.slim_messages(messages, preview_chars=100)
+
+    assert [m.content for m in slim[:3]] == [m.content for m in messages[:3]]
+    assert slim[3].content.startswith("y" * 100)
+    assert slim[3].content.endswith("[900 chars omitted]")
+    assert slim[3].tool_call_id == "b"
+    assert len(messages[3].content) == 1000
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from react_agent import graph_v2
+from react_agent.artifacts import get_artifact_store
+from react_agent.gaia_runner_v2 import CleanGAIARunner, _until_deadline
+from react_agent.stream_events import (
+    FinalOutput,
+    ModelStepStarted,
+    TokenDelta,
+    ToolCallIssued,
+    ToolResult,
+)
+from tests.fakes import ScriptedChatModel, repl_script
+
+
+@pytest.mark.asyncio
+async def test_stream_question_yields_typed_events(monkeypatch: pytest.MonkeyPatch) -> None:
+    model = ScriptedChatModel(responses=repl_script(steps=1))
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+
+    events = [
+        event
+        async for event in CleanGAIARunner().stream_question("What is 1 + 1?", task_id="stream-1")
+    ]
+    kinds = [type(event) for event in events if not isinstance(event, TokenDelta)]
+
+    assert kinds == [ModelStepStarted, ToolCallIssued, ToolResult, ModelStepStarted, FinalOutput]
+    tool_result = events[[type(e) for e in events].index(ToolResult)]
+    assert tool_result.tool_name == "python_repl"
+    assert tool_result.content == "1"
+    assert events[-1].output.submitted_answer == "2"
+
+
+@pytest.mark.asyncio
+async def test_stream_question_removes_task_artifacts(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    model = ScriptedChatModel(responses=repl_script(steps=1))
+    monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+    store = get_artifact_store("stream-2", str(tmp_path))
+    store.put("extract_text_from_url", "long page " * 100)
+    assert store.root.exists()
+
+    runner = CleanGAIARunner(config={"configurable": {"artifact_dir": str(tmp_path)}})
+    events = [event async for event in runner.stream_question("What is 1 + 1?", task_id="stream-2")]
+
+    assert events[-1].output.submitted_answer == "2"
+    assert not store.root.exists()
+
+
+@pytest.mark.asyncio
+async def test_stream_deadline_does_not_interrupt_the_consumer() -> None:
+    async def chunks():
+        yield 1
+        await asyncio.sleep(10)
+        yield 2
+
+    handled: list[int] = []
+    deadline = asyncio.get_running_loop().time() + 0.05
+    with pytest.raises(TimeoutError):
+        async for item in _until_deadline(chunks(), deadline):
+            # Il lavoro del consumatore oltre la deadline arriva comunque in fondo
+            await asyncio.sleep(0.1)
+            handled.append(item)
+
+    assert handled == [1]
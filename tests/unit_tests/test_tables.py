@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from react_agent import tools
+from react_agent.artifacts import ArtifactStore, current_artifact_store
+from react_agent.resilience import HTTPResponse
+from react_agent.tables import describe_table, extract_tables
+
+PAGE = """
+<html><body>
+<table><tr><td>layout only</td></tr></table>
+<table class="wikitable">
+  <caption>Studio albums</caption>
+  <thead>
+    <tr><th rowspan="2">Title</th><th rowspan="2">Year</th><th colspan="2">Peak</th></tr>
+    <tr><th>US</th><th>UK</th></tr>
+  </thead>
+  <tbody>
+    <tr><td>First<sup class="reference">[1]</sup></td><td rowspan="2">1,999</td><td>3</td><td>—</td></tr>
+    <tr><td>Second [a]</td><td>12</td><td>7</td></tr>
+    <tr><td>Third</td><td>2004</td><td>1</td><td>2</td></tr>
+  </tbody>
+</table>
+</body></html>
+"""
+
+
+def test_tables_expand_spans_and_coerce_numbers() -> None:
+    [(title, frame)] = extract_tables(PAGE)
+
+    assert title == "Studio albums"
+    assert list(frame.columns) == ["Title", "Year", "Peak / US", "Peak / UK"]
+    assert frame["Title"].tolist() == ["First", "Second", "Third"]
+    assert frame["Year"].tolist() == [1999, 1999, 2004]
+    assert frame["Peak / US"].sum() == 16
+    # "—" non è un numero: la colonna resta testuale
+    assert frame["Peak / UK"].tolist() == ["—", "7", "2"]
+    assert describe_table(frame).startswith("3 rows x 4 columns: Title (")
+
+
+@pytest.mark.asyncio
+async def test_extract_text_from_url_registers_tables_as_artifacts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def fake_request(method: str, url: str, **kwargs) -> HTTPResponse:
+        return HTTPResponse(status=200, headers={"content-type": "text/html"}, body=PAGE.encode("utf-8"))
+
+    monkeypatch.setattr(tools, "http_request", fake_request)
+    store = ArtifactStore(str(tmp_path / "task"))
+    token = current_artifact_store.set(store)
+    try:
+        summary = await tools.extract_text_from_url("https://example.org/albums", tables=True)
+        text = await tools.extract_text_from_url("https://example.org/albums")
+    finally:
+        current_artifact_store.reset(token)
+
+    assert summary.startswith("Table 1 'Studio albums' [artifact table-")
+    assert "Peak / US (int64)" in summary
+    [handle] = store.handles()
+    assert pd.read_csv(store.path(handle))["Peak / US"].sum() == 16
+    assert str(store.path(handle)) in summary
+    assert "Studio albums" in text and "[artifact" not in text
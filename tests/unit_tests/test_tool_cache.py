@@ -0,0 +1,145 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph
+
+from react_agent import graph_v2, tool_cache
+from react_agent.graph_v2 import (
+    TrackedToolNode,
+    create_tracked_graph,
+    detect_prefetch_calls,
+)
+from react_agent.state_v2 import GAIAInternalState
+from react_agent.tool_cache import CACHED_MARKER, canonical_args, clear_task_cache
+from tests.fakes import ScriptedChatModel
+
+
+def test_canonical_args_ignores_order_and_whitespace() -> None:
+    assert canonical_args({"query": " GAIA ", "limit": 3}) == canonical_args(
+        {"limit": 3, "query": "GAIA"}
+    )
+
+
+def _state(task_id: str, *tool_calls: dict) -> GAIAInternalState:
+    return GAIAInternalState(
+        messages=[("user", "q"), AIMessage(content="", tool_calls=list(tool_calls))],
+        task_id=task_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_repeated_calls_are_memoised_per_task() -> None:
+    calls: list[str] = []
+
+    async def lookup(query: str) -> str:
+        """Lookup finto."""
+        calls.append(query)
+        return f"result for {query}"
+
+    async def python_repl(code: str) -> str:
+        """REPL finto."""
+        calls.append(code)
+        return "ok"
+
+    builder = StateGraph(GAIAInternalState)
+    builder.add_node("tools", TrackedToolNode([lookup, python_repl]))
+    builder.add_edge("__start__", "tools")
+    graph = builder.compile()
+    first = _state(
+        "task-a",
+        {"name": "lookup", "args": {"query": "gaia"}, "id": "1"},
+        {"name": "python_repl", "args": {"code": "x = 1"}, "id": "2"},
+    )
+    second = _state(
+        "task-a",
+        {"name": "lookup", "args": {"query": " gaia"}, "id": "3"},
+        {"name": "python_repl", "args": {"code": "x = 1"}, "id": "4"},
+    )
+
+    await graph.ainvoke(first)
+    result = await graph.ainvoke(second)
+
+    lookup_message, repl_message = result["messages"][-2:]
+    assert lookup_message.tool_call_id == "3"
+    assert lookup_message.content.startswith(CACHED_MARKER)
+    assert not repl_message.content.startswith(CACHED_MARKER)
+    # python_repl è dichiarato con effetti collaterali: eseguito ogni volta
+    assert sorted(calls) == ["gaia", "x = 1", "x = 1"]
+
+    # Task diversa: nessuna condivisione della cache
+    await graph.ainvoke(_state("task-b", {"name": "lookup", "args": {"query": "gaia"}, "id": "5"}))
+    assert calls.count("gaia") == 2
+
+    clear_task_cache("task-a")
+    clear_task_cache("task-b")
+
+
+@pytest.mark.asyncio
+async def test_runs_without_task_or_thread_do_not_share_the_cache(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    calls: list[str] = []
+
+    async def lookup(query: str) -> str:
+        """Lookup finto."""
+        calls.append(query)
+        return f"result for {query}"
+
+    graph = create_tracked_graph(tools=[lookup])
+    config = {"configurable": {"artifact_dir": str(tmp_path)}}
+    for _ in range(2):
+        model = ScriptedChatModel(responses=[
+            AIMessage(content="", tool_calls=[{"name": "lookup", "args": {"query": "gaia"}, "id": "1"}]),
+            AIMessage(content="FINAL ANSWER: gaia"),
+        ])
+        monkeypatch.setattr(graph_v2, "load_chat_model", lambda name: model)
+        result = await graph.ainvoke(GAIAInternalState(messages=[("user", "q")]), config)
+        assert not result["messages"][2].content.startswith(CACHED_MARKER)
+
+    # Ogni run ha il suo scope, rimosso a fine run
+    assert calls == ["gaia", "gaia"]
+    assert not [key for key in tool_cache._TASK_CACHES if key == "default" or key.startswith("run-")]
+
+
+@pytest.mark.asyncio
+async def test_eviction_keeps_caches_with_calls_in_flight(monkeypatch: pytest.MonkeyPatch) -> None:
+    import asyncio
+
+    monkeypatch.setattr(tool_cache, "MAX_CACHED_TASKS", 1)
+    running = asyncio.get_running_loop().create_future()
+    busy = tool_cache.get_task_cache("busy")
+    busy.put("lookup", {"query": "gaia"}, running)
+
+    # La cache con una chiamata in corso non viene scartata (né cancellata)
+    tool_cache.get_task_cache("other")
+    assert "busy" in tool_cache._TASK_CACHES
+    assert not running.cancelled()
+
+    # Una volta inattiva torna a essere scartabile
+    running.set_result("done")
+    tool_cache.get_task_cache("third")
+    assert "busy" not in tool_cache._TASK_CACHES
+
+    for key in ("busy", "other", "third"):
+        clear_task_cache(key)
+
+
+def test_detect_prefetch_calls() -> None:
+    state = GAIAInternalState(
+        messages=[
+            HumanMessage(
+                content="In https://www.youtube.com/watch?v=L1vXCYZAYYM, what bird appears? "
+                "See also https://en.wikipedia.org/wiki/Penguin."
+            )
+        ],
+        task_id="task-c",
+        has_file=True,
+        file_name="data.xlsx",
+    )
+
+    calls = [(call["name"], call["args"]) for call in detect_prefetch_calls(state)]
+
+    assert calls == [
+        ("download_gaia_file", {"task_id": "task-c"}),
+        ("get_youtube_transcript", {"video_url": "https://www.youtube.com/watch?v=L1vXCYZAYYM"}),
+        ("extract_text_from_url", {"url": "https://en.wikipedia.org/wiki/Penguin"}),
+    ]
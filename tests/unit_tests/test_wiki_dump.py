@@ -0,0 +1,100 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from langchain_core.runnables.config import var_child_runnable_config
+
+from react_agent import tools
+from react_agent.configuration import Configuration
+from react_agent.prompts import SYSTEM_PROMPT
+from react_agent.wiki_dump import WikiDump, normalize_title
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "wiki-pages-articles.xml"
+
+
+@pytest.fixture
+def dump_path(tmp_path: Path) -> str:
+    # Copia del fixture: l'indice viene scritto accanto al dump
+    path = tmp_path / "wiki-pages-articles.xml"
+    shutil.copy(FIXTURE, path)
+    return str(path)
+
+
+def test_index_resolves_titles_redirects_and_sections(dump_path: str) -> None:
+    dump = WikiDump(dump_path)
+    try:
+        assert not dump.is_indexed()
+        assert dump.build_index() == 4
+        assert dump.is_indexed()
+
+        article = dump.article("https://en.wikipedia.org/wiki/mercedes_Sosa")
+        assert article.title == "Mercedes Sosa" and article.redirected_from is None
+        assert article.text.startswith("Haydée Mercedes Sosa (9 July 1935 – 4 October 2009) was an Argentine singer")
+        for markup in ("{{", "<ref", "[[", "Category:", "'''"):
+            assert markup not in article.text
+        assert [(s.level, s.title) for s in article.sections()][:3] == [
+            (2, "Biography"), (3, "Early life"), (2, "Discography"),
+        ]
+        assert "Cantora 1" in article.section("discography").text
+        assert "radio station" in article.section("Biography").text
+
+        assert dump.article("Sosa").redirected_from == "Sosa"
+        redirect = dump.article("Mercedes Sosa discography")
+        assert (redirect.title, redirect.fragment) == ("Mercedes Sosa", "Discography")
+        assert dump.article("AT&T").text == "AT&T Inc. is an American telecommunications company."
+
+        assert dump.article("Mercedes") is None
+        assert dump.suggestions("Mercedes") == ["Mercedes Sosa"]
+        assert normalize_title(" at_T ") == "At T"
+    finally:
+        dump.close()
+
+
+@pytest.mark.asyncio
+async def test_wikipedia_lookup_tool_reads_dump_offline(dump_path: str) -> None:
+    token = var_child_runnable_config.set({"configurable": {"wiki_dump_path": dump_path}})
+    try:
+        missing_index = await tools.wikipedia_lookup("Sosa")
+        dump = WikiDump(dump_path)
+        dump.build_index()
+        dump.close()
+
+        section = await tools.wikipedia_lookup("Sosa", section="Early life")
+        redirected = await tools.wikipedia_lookup("Mercedes Sosa discography")
+        not_found = await tools.wikipedia_lookup("Mercedes S")
+    finally:
+        var_child_runnable_config.reset(token)
+
+    assert missing_index.startswith("Error: local Wikipedia dump not available")
+    assert section.startswith("Mercedes Sosa (redirected from Sosa) § Early life\n\nAt 15 she won")
+    assert "Misa Criolla" in redirected and "Biography" not in redirected
+    assert not_found.endswith("Similar titles: Mercedes Sosa")
+    assert (await tools.wikipedia_lookup("Sosa")).startswith("Error: no local Wikipedia dump configured")
+
+
+async def _offered(path: str) -> bool:
+    offered_tools = await tools.tools_for(Configuration(wiki_dump_path=path))
+    return "wikipedia_lookup" in {tool.__name__ for tool in offered_tools}
+
+
+@pytest.mark.asyncio
+async def test_lookup_tool_is_offered_only_with_an_indexed_dump(dump_path: str) -> None:
+    assert "wikipedia_lookup" not in SYSTEM_PROMPT
+    assert not await _offered("")
+    assert not await _offered(dump_path)
+    assert not Path(f"{dump_path}.index.sqlite").exists()
+
+    dump = WikiDump(dump_path)
+    dump.build_index()
+    dump.close()
+    assert await _offered(dump_path)
+
+
+@pytest.mark.asyncio
+async def test_truncated_dump_is_not_offered(tmp_path: Path) -> None:
+    path = tmp_path / "empty-pages-articles.xml"
+    path.write_bytes(b"")
+    Path(f"{path}.index.sqlite").write_bytes(b"")
+
+    # mmap di un file vuoto solleva ValueError: il tool non viene offerto, call_model non fallisce
+    assert not await _offered(str(path))